@@ -2,6 +2,13 @@
 A file system roaming, virus busting game that runs in the terminal!
 
 """
+import os
+
+if os.environ.get("SEEDOS_IMPORT_TIME"):
+    # Start before anything else is imported, so the report covers the whole startup
+    from game.import_report import start_import_report
+    start_import_report(print_at_exit=True)
+
 from pathlib import Path
 from os import path
 
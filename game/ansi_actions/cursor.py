@@ -3,6 +3,12 @@ Helpers for cursor manipulation and movement.
 
 TODO Consider implementing cursor pos save and auto pause on unfocus
 """
+from game.ansi_actions.styled_text import get_styled_text_length
+from game.terminal.output import write_output, write_styled_output, flush_output, get_output_mark
+from game.terminal.screen import get_screen_size, get_scroll_region
+from game.utilities import tokenize_escape_codes
+
+_cursor_state = {"position": None, "mark": None}
 
 
 def get_move_options():
@@ -55,6 +61,7 @@ def cursor_previous_line(amount=1):
     :postcondition: move the cursor up <amount> lines
     :postcondition: the cursor will return to column 1
     :postcondition: a newline will not be printed
+    :postcondition: the escape code is buffered until the next flush_output()
 
     >>> cursor_previous_line()
     \\x1b[1F
@@ -63,7 +70,7 @@ def cursor_previous_line(amount=1):
     >>> cursor_previous_line(5)
     \\x1b[5F
     """
-    print(f"\033[{amount}{get_move_options()["previous_line"]}", end="", flush=True)
+    write_output(f"\033[{amount}{get_move_options()["previous_line"]}", keep_style=True)
 
 
 def cursor_next_line(amount=1):
@@ -77,6 +84,7 @@ def cursor_next_line(amount=1):
     :postcondition: move the cursor down <amount> lines
     :postcondition: the cursor will return to column 1
     :postcondition: a newline will not be printed
+    :postcondition: the escape code is buffered until the next flush_output()
 
     >>> cursor_next_line()
     \\x1b[1E
@@ -85,7 +93,7 @@ def cursor_next_line(amount=1):
     >>> cursor_next_line(5)
     \\x1b[5E
     """
-    print(f"\033[{amount}{get_move_options()["next_line"]}", end="", flush=True)
+    write_output(f"\033[{amount}{get_move_options()["next_line"]}", keep_style=True)
 
 
 def set_cursor_visibility(show):
@@ -96,6 +104,7 @@ def set_cursor_visibility(show):
     :precondition: show must be a boolean
     :postcondition: show or hide the terminal's cursor using an ANSI escape sequence
     :postcondition: a newline will not be printed
+    :postcondition: the output is flushed right away
 
     >>> set_cursor_visibility(show=True)
     \\x1b[?25h
@@ -103,9 +112,10 @@ def set_cursor_visibility(show):
     \\x1b[?25l
     """
     if show:
-        print("\033[?25h", end="", flush=True)
+        write_output("\033[?25h", keep_style=True)
     else:
-        print("\033[?25l", end="", flush=True)
+        write_output("\033[?25l", keep_style=True)
+    flush_output()
 
 
 def cursor_set(column, row):
@@ -121,6 +131,8 @@ def cursor_set(column, row):
     :postcondition: set the cursor's position in the terminal:
                     <column> units from the left and <row> units from the top
     :postcondition: a newline will not be printed
+    :postcondition: the escape code is buffered until the next flush_output()
+    :postcondition: the cursor position is tracked for cursor_move_to()
 
     >>> cursor_set(1, 1)
     \\x1b[1;1H
@@ -129,7 +141,208 @@ def cursor_set(column, row):
     >>> cursor_set(15, 1)
     \\x1b[1;15H
     """
-    print(f"\033[{row};{column}{get_move_options()["position"]}", end="", flush=True)
+    write_output(f"\033[{row};{column}{get_move_options()["position"]}", keep_style=True)
+    track_cursor_position(clamp_cursor_position(column, row))
+
+
+def clamp_cursor_position(column, row):
+    """
+    Return the position the terminal really moves the cursor to when asked for (<column>, <row>).
+
+    Terminals treat 0 as 1 and stop the cursor at the edges of the screen.
+
+    :param column: an integer representing the 1-based column asked for
+    :param row: an integer representing the 1-based row asked for
+    :precondition: column and row must be integers
+    :postcondition: get (<column>, <row>) limited to the screen
+    :return: a tuple of two positive integers representing the column and row the cursor ends up at
+    """
+    column, row = max(1, column), max(1, row)
+    screen_size = get_screen_size()
+    if screen_size is None:
+        return column, row
+    return min(column, screen_size[0]), min(row, screen_size[1])
+
+
+def get_relative_move(amount, forward, backward):
+    """
+    Return the escape sequence that moves the cursor <amount> cells along one axis.
+
+    :param amount: an integer representing the cells to move, negative to move backward
+    :param forward: a string representing the sequence letter for moving forward
+    :param backward: a string representing the sequence letter for moving backward
+    :precondition: amount must be an integer
+    :precondition: forward and backward must be escape sequence letters from get_move_options()
+    :postcondition: get the shortest escape sequence for the move, leaving out an amount of 1
+    :return: a string representing the escape sequence, or an empty string if <amount> is 0
+
+    >>> get_relative_move(3, "C", "D")
+    '\\x1b[3C'
+    >>> get_relative_move(-1, "C", "D")
+    '\\x1b[D'
+    >>> get_relative_move(0, "B", "A")
+    ''
+    """
+    if amount == 0:
+        return ""
+    letter = forward if amount > 0 else backward
+    if abs(amount) == 1:
+        return f"\033[{letter}"
+    return f"\033[{abs(amount)}{letter}"
+
+
+def get_scroll_region_side(row, scroll_region):
+    """
+    Return which side of <scroll_region> <row> is on.
+
+    :param row: a positive integer representing the 1-based row to check
+    :param scroll_region: a tuple of two positive integers representing the first and last row of the scroll region
+    :precondition: row must be a positive integer
+    :precondition: scroll_region must be a tuple of two positive integers
+    :postcondition: get -1 above the region, 0 inside of it, and 1 below it
+    :return: an integer representing the side of the scroll region <row> is on
+
+    >>> get_scroll_region_side(1, (2, 5)), get_scroll_region_side(5, (2, 5)), get_scroll_region_side(6, (2, 5))
+    (-1, 0, 1)
+    """
+    top, bottom = scroll_region
+    return (row > bottom) - (row < top)
+
+
+def get_cursor_move(start, column, row):
+    """
+    Return the shortest escape sequence that moves the cursor from <start> to (<column>, <row>).
+
+    The candidates are no move, relative moves, a carriage return with a newline, and an absolute move.
+    Relative moves stop at the margins of a scroll region and a newline on its bottom row scrolls it,
+    so only an absolute move can cross its margins.
+
+    :param start: a tuple of two positive integers representing the 1-based column and row the cursor is at,
+                  or None if the cursor position is unknown
+    :param column: a positive integer representing the 1-based column to move to
+    :param row: a positive integer representing the 1-based row to move to
+    :precondition: start must be a tuple of two positive integers within the terminal or None
+    :precondition: column and row must be positive integers within the terminal
+    :postcondition: get the fewest characters that move the cursor to (<column>, <row>)
+    :postcondition: an absolute move is used when <start> is None or no relative move is shorter
+    :return: a string representing the escape sequence for the move
+
+    >>> get_cursor_move(None, 5, 3)
+    '\\x1b[3;5H'
+    >>> get_cursor_move(None, 1, 1)
+    '\\x1b[H'
+    >>> get_cursor_move((5, 3), 5, 3)
+    ''
+    >>> get_cursor_move((5, 3), 6, 3)
+    '\\x1b[C'
+    >>> get_cursor_move((40, 3), 1, 4)
+    '\\r\\n'
+    >>> get_cursor_move((40, 3), 40, 2)
+    '\\x1b[A'
+    """
+    if column == 1:
+        absolute = "\033[H" if row == 1 else f"\033[{row}H"
+    else:
+        absolute = f"\033[{row};{column}H"
+    if start is None:
+        return absolute
+    start_column, start_row = start
+    if (start_column, start_row) == (column, row):
+        return ""
+    scroll_region = get_scroll_region()
+    if scroll_region and get_scroll_region_side(start_row, scroll_region) != get_scroll_region_side(row, scroll_region):
+        return absolute
+    candidates = [absolute]
+    vertical = get_relative_move(row - start_row, "B", "A")
+    if column == start_column:
+        candidates.append(vertical)
+    else:
+        candidates.append(vertical + get_relative_move(column - start_column, "C", "D"))
+        candidates.append(vertical + f"\033[{column}G")
+        if column == 1:
+            candidates.append(vertical + "\r")
+    if row == start_row + 1:
+        candidates.append("\r\n" + get_relative_move(column - 1, "C", "D"))
+    return min(candidates, key=len)
+
+
+def get_cursor_position():
+    """
+    Return where the cursor is, if it is known.
+
+    The position is only known right after cursor_set(), cursor_move_to(), or cursor_write(),
+    and becomes unknown as soon as anything else is output or flushed.
+
+    :postcondition: get the tracked cursor position
+    :return: a tuple of two positive integers representing the 1-based column and row of the cursor,
+             or None if the position is unknown
+    """
+    if _cursor_state["mark"] != get_output_mark():
+        return None
+    return _cursor_state["position"]
+
+
+def track_cursor_position(position):
+    """
+    Remember that the cursor is at <position> after the output written so far.
+
+    :param position: a tuple of two positive integers representing the 1-based column and row of the cursor,
+                     or None if the position is unknown
+    :precondition: position must be a tuple of two positive integers or None
+    :postcondition: get_cursor_position() returns <position> until something else is output
+    """
+    _cursor_state["position"] = position
+    _cursor_state["mark"] = get_output_mark()
+
+
+def cursor_move_to(column, row):
+    """
+    Move the cursor to (<column>, <row>) with the shortest escape sequence.
+
+    :param column: an integer representing the 1-based column to move to
+    :param row: an integer representing the 1-based row to move to
+    :precondition: column and row must be integers
+    :postcondition: move the cursor to (<column>, <row>) limited to the screen, writing nothing if it is already there
+    :postcondition: the escape code is buffered until the next flush_output()
+    """
+    column, row = clamp_cursor_position(column, row)
+    move = get_cursor_move(get_cursor_position(), column, row)
+    if move:
+        write_output(move, keep_style=True)
+    track_cursor_position((column, row))
+
+
+def cursor_write(text, width=None):
+    """
+    Write <text> at the cursor and keep tracking the cursor position.
+
+    Styled text only switches the style attributes that differ from what the terminal already has.
+
+    :param text: a string or styled text representing the text to write,
+                 which may have style codes but no newlines or moves
+    :param width: (default None) an integer representing the visible width of <text>,
+                  or None to measure it without the escape codes
+    :precondition: text must be a string or styled text without newlines or cursor movement codes
+    :precondition: width must be a positive integer or None
+    :postcondition: <text> is buffered until the next flush_output()
+    :postcondition: the cursor position stays known unless <text> reaches the right edge of the terminal
+    """
+    position = get_cursor_position()
+    if isinstance(text, str):
+        write_output(text)
+    else:
+        write_styled_output(text)
+    if position is None:
+        return
+    if width is None:
+        width = len(tokenize_escape_codes(text)[0]) if isinstance(text, str) else get_styled_text_length(text)
+    column = position[0] + width
+    screen_size = get_screen_size()
+    # At the right edge the terminal holds the cursor in a pending wrap, so relative moves are unreliable
+    if screen_size is None or column > screen_size[0]:
+        track_cursor_position(None)
+    else:
+        track_cursor_position((column, position[1]))
 
 
 def cursor_shift(direction, amount=1):
@@ -144,6 +357,7 @@ def cursor_shift(direction, amount=1):
     :precondition: amount must be a positive integer
     :postcondition: shift the cursor's position in the terminal by <amount> in <direction>
     :postcondition: a newline will not be printed
+    :postcondition: the escape code is buffered until the next flush_output()
 
     >>> cursor_shift("down")
     \\x1b[1B
@@ -152,7 +366,7 @@ def cursor_shift(direction, amount=1):
     >>> cursor_shift("left", 20)
     \\x1b[20D
     """
-    print(f"\033[{amount}{get_move_options()[direction]}", end="", flush=True)
+    write_output(f"\033[{amount}{get_move_options()[direction]}", keep_style=True)
 
 
 def main():
@@ -164,24 +378,28 @@ def main():
     set_cursor_visibility(show=True)
     input("visible cursor")
     cursor_set(17, 5)
-    print("set pos", end="", flush=True)
+    write_output("set pos")
     cursor_shift("down", 1)
+    flush_output()
     input("shift pos")
     cursor_next_line()
+    flush_output()
     input("next_line")
     cursor_set(1, 1)
-    print("staircase")
+    write_output("staircase\n")
     for _ in range(10):
-        print("#", end="")
+        write_output("#")
         cursor_shift("right")
         cursor_shift("down")
+    flush_output()
     input()
     cursor_shift("left", 10000)
-    print("ladder")
+    write_output("ladder\n")
     for _ in range(10):
-        print("#", end="")
+        write_output("#")
         cursor_shift("right")
         cursor_next_line()
+    flush_output()
     input()
 
 
@@ -1,6 +1,46 @@
 """
 Helpers for visual customization like text colour and emphasis.
 """
+from functools import lru_cache
+from timeit import timeit
+from types import MappingProxyType
+
+from game.terminal.output import write_output, flush_output
+
+_STYLE_CODES = MappingProxyType({
+    "reset": "\033[0m",
+    "bold": "\033[1m",
+    "dim": "\033[2m",
+    "italic": "\033[3m",
+    "underline": "\033[4m",
+    # <-Usually only for Windows Powershell->
+    "slow_blink": "\033[5m",
+    "rapid_blink": "\033[6m",
+    "strike": "\033[9m",
+    # <------------------------------------->
+    "normal_intensity": "\033[22m",
+    "not_italic": "\033[23m",
+    "not_underlined": "\033[24m",
+    "not_blinking": "\033[25m",
+    # Foreground Colours
+    "black": "\033[30m",
+    "red": "\033[31m",
+    "green": "\033[32m",
+    "yellow": "\033[33m",
+    "blue": "\033[34m",
+    "magenta": "\033[35m",
+    "cyan": "\033[36m",
+    "white": "\033[37m",
+    # Background Colours
+    "background_black": "\033[40m",
+    "background_red": "\033[41m",
+    "background_green": "\033[42m",
+    "background_yellow": "\033[43m",
+    "background_blue": "\033[44m",
+    "background_magenta": "\033[45m",
+    "background_cyan": "\033[46m",
+    "background_white": "\033[47m"
+})
 
 
 def get_styles():
@@ -42,40 +82,28 @@ def get_styles():
     ...     "background_white": "\\033[47m"}
     True
     """
-    return {
-        "reset": "\033[0m",
-        "bold": "\033[1m",
-        "dim": "\033[2m",
-        "italic": "\033[3m",
-        "underline": "\033[4m",
-        # <-Usually only for Windows Powershell->
-        "slow_blink": "\033[5m",
-        "rapid_blink": "\033[6m",
-        "strike": "\033[9m",
-        # <------------------------------------->
-        "normal_intensity": "\033[22m",
-        "not_italic": "\033[23m",
-        "not_underlined": "\033[24m",
-        "not_blinking": "\033[25m",
-        # Foreground Colours
-        "black": "\033[30m",
-        "red": "\033[31m",
-        "green": "\033[32m",
-        "yellow": "\033[33m",
-        "blue": "\033[34m",
-        "magenta": "\033[35m",
-        "cyan": "\033[36m",
-        "white": "\033[37m",
-        # Background Colours
-        "background_black": "\033[40m",
-        "background_red": "\033[41m",
-        "background_green": "\033[42m",
-        "background_yellow": "\033[43m",
-        "background_blue": "\033[44m",
-        "background_magenta": "\033[45m",
-        "background_cyan": "\033[46m",
-        "background_white": "\033[47m"
-    }
+    return dict(_STYLE_CODES)
+
+
+@lru_cache(maxsize=256)
+def compile_styles(styles):
+    """
+    Return the combined ANSI escape sequence for a tuple of style names.
+
+    Results are memoized, so each combination of styles is only built once.
+
+    :param styles: a tuple of strings representing the names of the styles to combine
+    :precondition: styles must be a tuple of strings found in get_styles()
+    :postcondition: get the escape sequences of <styles> joined in order
+    :raises KeyError: if a name in <styles> is not a defined style
+    :return: a string representing the combined escape sequence of <styles>
+
+    >>> compile_styles(("bold", "blue"))
+    '\\x1b[1m\\x1b[34m'
+    >>> compile_styles(())
+    ''
+    """
+    return "".join(map(_STYLE_CODES.__getitem__, styles))
 
 
 def style(text, *styles, reset=True):
@@ -100,10 +128,9 @@ def style(text, *styles, reset=True):
     >>> style("This is bold and blue and not reset", "bold", "blue", reset=False)
     '\\x1b[1m\\x1b[34mThis is bold and blue and not reset'
     """
-    codes = "".join(map(lambda name: get_styles()[name], styles))
-    new_text = codes + text
+    new_text = compile_styles(styles) + text
     if reset:
-        new_text += get_styles()["reset"]
+        new_text += _STYLE_CODES["reset"]
     return new_text
 
 
@@ -117,7 +144,8 @@ def reset_style():
     >>> reset_style()
     \\x1b[0m
     """
-    print(get_styles()["reset"], end="", flush=True)
+    write_output(_STYLE_CODES["reset"])
+    flush_output()
 
 
 def main():
@@ -140,6 +168,10 @@ def main():
 
     print(style("I have one last secret...", "strike"))
 
+    calls = 100000
+    seconds = timeit(lambda: style("P", "bold", "green"), number=calls)
+    print(f"style() takes {seconds / calls * 1e9:.0f} ns per call")
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,407 @@
+"""
+Styled text: text stored as runs of characters that share one style.
+
+A styled text is a tuple of runs, where each run is a tuple of form (<style>, <text>):
+    <style> is the string of ANSI style codes applied to the run, or "" for no style
+    <text> is the visible text of the run
+
+Styled texts can be sliced, padded, and joined without breaking their styles,
+and are only turned back into an ANSI string when they are written to the terminal.
+"""
+import re
+from functools import lru_cache
+from types import MappingProxyType
+
+from game.utilities import tokenize_escape_codes
+
+
+_SGR_CODE = re.compile(r"\033\[([0-9;:]*)m")
+# Attribute slots of a style, in the order their codes are written
+_ATTRIBUTE_SLOTS = ("bold", "dim", "italic", "underline", "blink", "reverse", "hidden", "strike", "foreground", "background")
+_ATTRIBUTE_ON_CODES = MappingProxyType({
+    "1": "bold", "2": "dim", "3": "italic", "4": "underline", "5": "blink", "6": "blink",
+    "7": "reverse", "8": "hidden", "9": "strike"})
+_ATTRIBUTE_OFF_CODES = MappingProxyType({
+    "22": ("bold", "dim"), "23": ("italic",), "24": ("underline",), "25": ("blink",),
+    "27": ("reverse",), "28": ("hidden",), "29": ("strike",), "39": ("foreground",), "49": ("background",)})
+_SLOT_OFF_CODES = MappingProxyType({
+    "bold": "22", "dim": "22", "italic": "23", "underline": "24", "blink": "25",
+    "reverse": "27", "hidden": "28", "strike": "29", "foreground": "39", "background": "49"})
+
+
+@lru_cache(maxsize=1024)
+def get_style_attributes(style):
+    """
+    Return the terminal attributes that the SGR codes in <style> leave switched on.
+
+    :param style: a string representing ANSI style codes
+    :precondition: style must be a string of ANSI escape codes
+    :postcondition: get one value per attribute slot, in the order "bold", "dim", "italic", "underline",
+                    "blink", "reverse", "hidden", "strike", "foreground", "background"
+    :postcondition: each value is the SGR parameter that switched the attribute on, or "" if it is off
+    :return: a tuple of strings representing the attributes of <style>
+
+    >>> get_style_attributes("\\033[31m\\033[1m\\033[1m")
+    ('1', '', '', '', '', '', '', '', '31', '')
+    >>> get_style_attributes("\\033[4;38;5;208m\\033[24m")
+    ('', '', '', '', '', '', '', '', '38;5;208', '')
+    >>> get_style_attributes("\\033[1m\\033[0m")
+    ('', '', '', '', '', '', '', '', '', '')
+    """
+    attributes = dict.fromkeys(_ATTRIBUTE_SLOTS, "")
+    for match in _SGR_CODE.finditer(style):
+        parameters = match.group(1).replace(":", ";").split(";")
+        index = 0
+        while index < len(parameters):
+            parameter = parameters[index].lstrip("0") or "0"
+            if parameter == "0":
+                attributes = dict.fromkeys(_ATTRIBUTE_SLOTS, "")
+            elif parameter in _ATTRIBUTE_ON_CODES:
+                attributes[_ATTRIBUTE_ON_CODES[parameter]] = parameter
+            elif parameter in _ATTRIBUTE_OFF_CODES:
+                for slot in _ATTRIBUTE_OFF_CODES[parameter]:
+                    attributes[slot] = ""
+            elif parameter in ("38", "48"):
+                # Extended colours take 2 more parameters for a palette index or 4 more for an RGB value
+                length = 3 if index + 1 < len(parameters) and parameters[index + 1] == "5" else 5
+                slot = "foreground" if parameter == "38" else "background"
+                attributes[slot] = ";".join(parameters[index:index + length])
+                index += length - 1
+            elif 30 <= int(parameter) <= 37 or 90 <= int(parameter) <= 97:
+                attributes["foreground"] = parameter
+            elif 40 <= int(parameter) <= 47 or 100 <= int(parameter) <= 107:
+                attributes["background"] = parameter
+            index += 1
+    return tuple(attributes[slot] for slot in _ATTRIBUTE_SLOTS)
+
+
+@lru_cache(maxsize=1024)
+def normalize_style(style):
+    """
+    Return <style> as a single SGR code with each switched on attribute listed once.
+
+    Styles that leave the same attributes switched on always normalize to the same string.
+
+    :param style: a string representing ANSI style codes
+    :precondition: style must be a string of ANSI escape codes
+    :postcondition: get the shortest equivalent of <style>
+    :return: a string representing <style> as one SGR code, or "" if no attribute is switched on
+
+    >>> normalize_style("\\033[31m\\033[1m\\033[1m")
+    '\\x1b[1;31m'
+    >>> normalize_style("\\033[1m\\033[0m")
+    ''
+    """
+    parameters = [parameter for parameter in get_style_attributes(style) if parameter]
+    if not parameters:
+        return ""
+    return f"\033[{";".join(parameters)}m"
+
+
+@lru_cache(maxsize=1024)
+def get_style_transition(current_style, target_style):
+    """
+    Return the shortest SGR code that changes the terminal from <current_style> to <target_style>.
+
+    Only the attributes that differ are switched, unless resetting everything first is shorter.
+
+    :param current_style: a string representing the ANSI style codes the terminal currently has applied
+    :param target_style: a string representing the ANSI style codes to apply
+    :precondition: current_style and target_style must be strings of ANSI escape codes
+    :postcondition: get an SGR code that leaves exactly the attributes of <target_style> switched on
+    :return: a string representing the transition, or "" if the styles are already the same
+
+    >>> get_style_transition("\\033[1m", "\\033[1m\\033[31m")
+    '\\x1b[31m'
+    >>> get_style_transition("\\033[1;31m", "\\033[31m")
+    '\\x1b[22m'
+    >>> get_style_transition("\\033[2;31m", "\\033[1;31m")
+    '\\x1b[22;1m'
+    >>> get_style_transition("\\033[1;4;31m", "")
+    '\\x1b[0m'
+    >>> get_style_transition("\\033[1m", "\\033[1m")
+    ''
+    """
+    current_attributes = get_style_attributes(current_style)
+    target_attributes = get_style_attributes(target_style)
+    if current_attributes == target_attributes:
+        return ""
+    if not any(target_attributes):
+        return "\033[0m"
+    off_codes = []
+    on_codes = []
+    for slot, current, target in zip(_ATTRIBUTE_SLOTS, current_attributes, target_attributes):
+        if current == target:
+            continue
+        if current and not target and not _SLOT_OFF_CODES[slot] in off_codes:
+            off_codes.append(_SLOT_OFF_CODES[slot])
+        if target:
+            on_codes.append(target)
+    if "22" in off_codes:
+        # 22 switches off both bold and dim, so whichever is kept has to be switched back on
+        on_codes += [target for target in target_attributes[:2] if target and not target in on_codes]
+    # Off codes go first, so they never switch off an attribute that was just switched on
+    changed = f"\033[{";".join(off_codes + on_codes)}m"
+    reset = f"\033[0;{normalize_style(target_style)[2:]}"
+    return min(changed, reset, key=len)
+
+
+def apply_style_code(current_style, code):
+    """
+    Return the style that results from applying the escape code <code> to <current_style>.
+
+    :param current_style: a string representing the ANSI style codes that are currently applied
+    :param code: a string representing an ANSI escape code
+    :precondition: current_style must be a string of ANSI style codes
+    :precondition: code must be a string representing an ANSI escape code
+    :postcondition: get the normalized style after <code>, where reset codes clear the style
+    :postcondition: non-style codes are ignored
+    :return: a string representing the ANSI style codes applied after <code>
+
+    >>> apply_style_code("", "\\033[1m")
+    '\\x1b[1m'
+    >>> apply_style_code("\\033[1m", "\\033[0m")
+    ''
+    >>> apply_style_code("\\033[1m", "\\033[5;3H")
+    '\\x1b[1m'
+    >>> apply_style_code("\\033[31m", "\\033[1m")
+    '\\x1b[1;31m'
+    """
+    if not code.endswith("m"):
+        return current_style
+    if code in ("\033[0m", "\033[m"):
+        return ""
+    return normalize_style(current_style + code)
+
+
+@lru_cache(maxsize=1024)
+def create_styled_text(text):
+    """
+    Return the styled text for a string with ANSI escape codes.
+
+    Results are cached by <text>, so repeated strings are only parsed once.
+
+    :param text: a string representing the text to convert, possibly with ANSI escape codes
+    :precondition: text must be a string
+    :postcondition: get the runs of <text> that share a style
+    :postcondition: escape codes that are not style codes are dropped
+    :return: a tuple of runs representing the styled text of <text>
+
+    >>> create_styled_text("plain")
+    (('', 'plain'),)
+    >>> create_styled_text("\\033[1mbold\\033[0m and \\033[31mred")
+    (('\\x1b[1m', 'bold'), ('', ' and '), ('\\x1b[31m', 'red'))
+    >>> create_styled_text("")
+    ()
+    """
+    visible_text, codes = tokenize_escape_codes(text)
+    runs = []
+    current_style = ""
+    run_start = 0
+    for index, code in codes:
+        if index > run_start:
+            runs.append((current_style, visible_text[run_start:index]))
+            run_start = index
+        current_style = apply_style_code(current_style, code)
+    if len(visible_text) > run_start:
+        runs.append((current_style, visible_text[run_start:]))
+    return concatenate_styled_text(tuple(runs))
+
+
+def as_styled_text(text):
+    """
+    Return <text> as styled text.
+
+    :param text: a string or styled text representing the text to convert
+    :precondition: text must be a string or a well-formed styled text tuple
+    :postcondition: get <text> unchanged if it is already styled text, otherwise convert it
+    :return: a tuple of runs representing the styled text of <text>
+
+    >>> as_styled_text("\\033[32mok\\033[0m")
+    (('\\x1b[32m', 'ok'),)
+    >>> as_styled_text((('', 'already styled'),))
+    (('', 'already styled'),)
+    """
+    if isinstance(text, str):
+        return create_styled_text(text)
+    return text
+
+
+def get_styled_text_length(styled_text):
+    """
+    Return the number of visible characters in <styled_text>.
+
+    :param styled_text: a tuple of runs representing the styled text to measure
+    :precondition: styled_text must be a well-formed styled text tuple
+    :postcondition: get the visible length of <styled_text>
+    :return: an integer representing the number of visible characters in <styled_text>
+
+    >>> get_styled_text_length(create_styled_text("\\033[1mbold\\033[0m text"))
+    9
+    >>> get_styled_text_length(())
+    0
+    """
+    return sum(len(run_text) for _, run_text in styled_text)
+
+
+def slice_styled_text(styled_text, start, stop=None):
+    """
+    Return the visible characters from <start> to <stop> of <styled_text>, keeping their styles.
+
+    :param styled_text: a tuple of runs representing the styled text to slice
+    :param start: an integer greater than or equal to 0 representing the first visible index to keep
+    :param stop: (default None) an integer greater than or equal to 0 representing the visible index to stop at,
+                 or None to keep everything after <start>
+    :precondition: styled_text must be a well-formed styled text tuple
+    :precondition: start must be an integer greater than or equal to 0
+    :precondition: stop must be an integer greater than or equal to 0, or None
+    :postcondition: get the part of <styled_text> between <start> and <stop>
+    :return: a tuple of runs representing the sliced styled text
+
+    >>> bold_and_plain = create_styled_text("\\033[1mbold\\033[0m text")
+    >>> slice_styled_text(bold_and_plain, 2, 6)
+    (('\\x1b[1m', 'ld'), ('', ' t'))
+    >>> slice_styled_text(bold_and_plain, 5)
+    (('', 'text'),)
+    >>> slice_styled_text(bold_and_plain, 20)
+    ()
+    """
+    sliced = []
+    run_start = 0
+    for run_style, run_text in styled_text:
+        run_stop = run_start + len(run_text)
+        if stop is not None and run_start >= stop:
+            break
+        if run_stop > start:
+            cut_start = max(0, start - run_start)
+            cut_stop = len(run_text) if stop is None else min(len(run_text), stop - run_start)
+            sliced.append((run_style, run_text[cut_start:cut_stop]))
+        run_start = run_stop
+    return tuple(sliced)
+
+
+def pad_styled_text(styled_text, width):
+    """
+    Return <styled_text> padded with unstyled spaces to <width> visible characters.
+
+    :param styled_text: a tuple of runs representing the styled text to pad
+    :param width: an integer representing the visible width to pad to
+    :precondition: styled_text must be a well-formed styled text tuple
+    :precondition: width must be an integer
+    :postcondition: get <styled_text> with spaces added until it is <width> characters long
+    :postcondition: <styled_text> is unchanged if it is already <width> characters or longer
+    :return: a tuple of runs representing the padded styled text
+
+    >>> pad_styled_text(create_styled_text("\\033[1mhi\\033[0m"), 4)
+    (('\\x1b[1m', 'hi'), ('', '  '))
+    >>> pad_styled_text((('', 'hi'),), 4)
+    (('', 'hi  '),)
+    """
+    padding = width - get_styled_text_length(styled_text)
+    if padding <= 0:
+        return styled_text
+    return concatenate_styled_text(styled_text, (("", " " * padding),))
+
+
+def concatenate_styled_text(*styled_texts):
+    """
+    Return <styled_texts> joined into one styled text.
+
+    Neighbouring runs with the same style are merged and empty runs are dropped.
+
+    :param styled_texts: tuples of runs representing the styled texts to join
+    :precondition: styled_texts must be well-formed styled text tuples
+    :postcondition: get one styled text holding every run of <styled_texts> in order
+    :return: a tuple of runs representing the joined styled text
+
+    >>> concatenate_styled_text((('', 'a'), ('\\033[1m', '')), (('', 'b'),), (('\\033[1m', 'c'),))
+    (('', 'ab'), ('\\x1b[1m', 'c'))
+    """
+    runs = []
+    for styled_text in styled_texts:
+        for run_style, run_text in styled_text:
+            if not run_text:
+                continue
+            if runs and runs[-1][0] == run_style:
+                runs[-1] = (run_style, runs[-1][1] + run_text)
+            else:
+                runs.append((run_style, run_text))
+    return tuple(runs)
+
+
+@lru_cache(maxsize=1024)
+def split_styled_text(styled_text, separator="\n"):
+    """
+    Return <styled_text> split at each <separator>, keeping the style of every part.
+
+    :param styled_text: a tuple of runs representing the styled text to split
+    :param separator: (default "\\n") a non-empty string representing where to split <styled_text>
+    :precondition: styled_text must be a well-formed styled text tuple
+    :precondition: separator must be a non-empty string
+    :postcondition: get the parts of <styled_text> between each <separator>
+    :return: a tuple of styled texts representing the parts of <styled_text>
+
+    >>> split_styled_text(create_styled_text("\\033[31mone\\ntwo\\033[0m three"))
+    ((('\\x1b[31m', 'one'),), (('\\x1b[31m', 'two'), ('', ' three')))
+    >>> split_styled_text(())
+    ((),)
+    """
+    lines = [[]]
+    for run_style, run_text in styled_text:
+        parts = run_text.split(separator)
+        for part_index, part in enumerate(parts):
+            if part_index > 0:
+                lines.append([])
+            if part:
+                lines[-1].append((run_style, part))
+    return tuple(tuple(line) for line in lines)
+
+
+def join_styled_text(separator, styled_texts):
+    """
+    Return <styled_texts> joined into one styled text with <separator> between each.
+
+    :param separator: a string or styled text representing what to put between each styled text
+    :param styled_texts: an iterable of strings or styled texts representing the texts to join
+    :precondition: separator must be a string or a well-formed styled text tuple
+    :precondition: styled_texts must be an iterable of strings or well-formed styled text tuples
+    :postcondition: get one styled text of <styled_texts> separated by <separator>
+    :return: a tuple of runs representing the joined styled text
+
+    >>> join_styled_text("\\n", ("a", create_styled_text("\\033[1mb\\033[0m")))
+    (('', 'a\\n'), ('\\x1b[1m', 'b'))
+    """
+    separator = as_styled_text(separator)
+    joined = []
+    for index, styled_text in enumerate(styled_texts):
+        if index > 0:
+            joined.append(separator)
+        joined.append(as_styled_text(styled_text))
+    return concatenate_styled_text(*joined)
+
+
+@lru_cache(maxsize=1024)
+def render_styled_text(styled_text):
+    """
+    Return the ANSI string for <styled_text>.
+
+    :param styled_text: a tuple of runs representing the styled text to render
+    :precondition: styled_text must be a well-formed styled text tuple
+    :postcondition: get a string with the escape codes needed to print <styled_text>
+    :postcondition: only the attributes that change between runs are switched
+    :postcondition: the string ends with the style reset if any run is styled
+    :return: a string representing <styled_text> with ANSI escape codes
+
+    >>> render_styled_text(create_styled_text("\\033[1mbold\\033[0m and plain"))
+    '\\x1b[1mbold\\x1b[0m and plain'
+    >>> render_styled_text((('', 'plain'),))
+    'plain'
+    """
+    output = []
+    current_style = ""
+    for run_style, run_text in styled_text:
+        output.append(get_style_transition(current_style, run_style))
+        current_style = run_style
+        output.append(run_text)
+    output.append(get_style_transition(current_style, ""))
+    return "".join(output)
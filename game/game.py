@@ -1,11 +1,17 @@
 """
 The entry point for the game.
 """
+import argparse
+import asyncio
+
 from game.ansi_actions.cursor import set_cursor_visibility
 from game.ansi_actions.style import style
 from game.save import get_user_data_folder
-from game.scene.scene import get_scenes
+from game.scene.scene import get_scene, is_scene_registered, run_scene_step
 from game.terminal import input as terminal_input
+from game.terminal.latency import format_latency_stats
+from game.terminal.output import set_output_scene, flush_output, format_output_stats
+from game.terminal.screen import set_scroll_region
 
 
 def setup_game():
@@ -30,51 +36,108 @@ def setup_game():
         "key_input": terminal_input.init_key_input(),
         "saves_path": get_user_data_folder(),
         "previous_scene": None,
-        "active_scene": get_scenes()["startup"],
+        "active_scene": get_scene("startup"),
         "seed_system": None,
         "progress": set()}
     return game_data
 
 
-def game_loop(game_data):
+async def game_loop(game_data):
     """
     Drive the main game loop.
 
+    Scenes run one after another in the asyncio event loop, so scenes written as coroutines can
+    await input, timers and animations together, while plain scenes run as before.
+
     :param game_data: a dictionary representing the data needed to run the game
     :precondition: game_data must be a well-formed dictionary of game data
+    :precondition: must be awaited inside a running asyncio event loop
     :postcondition: run the game
     """
     while True:
+        set_output_scene(game_data["active_scene"]["name"])
         # Start the scene
-        if not game_data["active_scene"]["open"] is None:
-            game_data["active_scene"]["open"](game_data)
+        await run_scene_step(game_data["active_scene"]["open"], game_data)
         # Run the scene
-        next_scene = game_data["active_scene"]["update"](game_data)
+        next_scene = await run_scene_step(game_data["active_scene"]["update"], game_data)
         # Close the scene
-        if not game_data["active_scene"]["exit"] is None:
-            game_data["active_scene"]["exit"](game_data)
+        await run_scene_step(game_data["active_scene"]["exit"], game_data)
         # Switch the scene
         if next_scene is None:
             return
-        game_data["previous_scene"] = game_data["active_scene"]
-        try:
-            game_data["active_scene"] = get_scenes()[next_scene]
-        except KeyError:
+        if not is_scene_registered(next_scene):
             print(style(f"Scene is not defined: {next_scene}", "red"))
             return
+        game_data["previous_scene"] = game_data["active_scene"]
+        game_data["active_scene"] = get_scene(next_scene)
+
+
+def parse_arguments(arguments=None):
+    """
+    Return the command line options for the game.
+
+    :param arguments: (default None) a list of strings representing the command line arguments,
+                      or None to read them from sys.argv
+    :precondition: arguments must be a list of strings or None
+    :postcondition: get the parsed command line options
+    :return: an argparse.Namespace representing the command line options
+
+    >>> parse_arguments([]).output_stats
+    False
+    >>> parse_arguments(["--output-stats"]).output_stats
+    True
+    >>> parse_arguments(["--latency-stats"]).latency_stats
+    True
+    >>> options = parse_arguments(["--replay", "run.keys", "--replay-speed", "0"])
+    >>> options.record, options.replay, options.replay_speed
+    (None, 'run.keys', 0.0)
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m game.game", description="Play SeedOS in the terminal.",
+        epilog="Set SEEDOS_IMPORT_TIME=1 to print how long each module took to import on exit.")
+    parser.add_argument(
+        "--output-stats", action="store_true",
+        help="print the bytes, writes, and flushes sent to the terminal by each scene on exit")
+    parser.add_argument(
+        "--latency-stats", action="store_true",
+        help="print the p50, p95 and p99 time from each key press to the frame showing it, by scene, on exit")
+    parser.add_argument(
+        "--record", metavar="FILE",
+        help="write every key press, with its timing, to FILE for replaying later")
+    parser.add_argument(
+        "--replay", metavar="FILE",
+        help="play the key presses recorded in FILE, then read the keyboard once they run out")
+    parser.add_argument(
+        "--replay-speed", metavar="SPEED", type=float, default=1.0,
+        help="replay key presses SPEED times faster than recorded, or without waiting if 0 (default: 1)")
+    return parser.parse_args(arguments)
 
 
 def main():
     """
     Drive the program.
     """
+    options = parse_arguments()
     game_data = setup_game()
     set_cursor_visibility(show=False)
+    if options.replay is not None:
+        terminal_input.start_input_replay(game_data["key_input"], options.replay, options.replay_speed)
+    if options.record is not None:
+        terminal_input.start_input_recording(game_data["key_input"], options.record)
+    terminal_input.start_input_reader(game_data["key_input"])
     try:
-        game_loop(game_data)
+        asyncio.run(game_loop(game_data))
     finally:
+        terminal_input.stop_input_reader(game_data["key_input"])
+        terminal_input.stop_input_recording(game_data["key_input"])
+        set_scroll_region()
+        flush_output()
         print(style("Finished!", "reset"))
         set_cursor_visibility(show=True)
+        if options.output_stats:
+            print(format_output_stats())
+        if options.latency_stats:
+            print(format_latency_stats())
 
 
 if __name__ == "__main__":
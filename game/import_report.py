@@ -0,0 +1,136 @@
+"""
+Time how long each module takes to import, like "python -X importtime", to catch slow startups.
+
+Set the SEEDOS_IMPORT_TIME environment variable to print the report to stderr when the game exits.
+"""
+import atexit
+import sys
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader
+from time import perf_counter
+from types import SimpleNamespace
+
+_report_state = {
+    "records": [],
+    "stack": [],
+    "finder": None}
+
+
+def start_import_report(print_at_exit=False):
+    """
+    Start timing every module imported from a file after this call.
+
+    :param print_at_exit: (default False) a boolean representing whether to print the report to stderr on exit
+    :precondition: print_at_exit must be a boolean
+    :postcondition: modules imported from now on are timed into the import report
+    :postcondition: nothing changes if the report was already started
+    """
+    if _report_state["finder"] is not None:
+        return
+    _report_state["finder"] = SimpleNamespace(find_spec=find_timed_spec)
+    sys.meta_path.insert(0, _report_state["finder"])
+    if print_at_exit:
+        atexit.register(lambda: print(format_import_report(), file=sys.stderr))
+
+
+def stop_import_report():
+    """
+    Stop timing module imports.
+
+    :postcondition: modules imported from now on are not added to the import report
+    """
+    if _report_state["finder"] in sys.meta_path:
+        sys.meta_path.remove(_report_state["finder"])
+    _report_state["finder"] = None
+
+
+def find_timed_spec(name, path, target=None):
+    """
+    Find the module spec of <name> with the other import finders and time the module when it is executed.
+
+    This is the find_spec() of the meta path finder installed by start_import_report().
+
+    :param name: a string representing the absolute name of the module being imported
+    :param path: a list of strings representing the package search path, or None for top-level modules
+    :param target: (default None) a module object that is being reloaded, or None
+    :precondition: the import report must be started
+    :postcondition: the spec found by the following meta path finders is returned unchanged,
+                    except that executing a module loaded from a file is timed
+    :return: a ModuleSpec representing how to import <name>, or None if no finder can import it
+    """
+    finders = sys.meta_path[sys.meta_path.index(_report_state["finder"]) + 1:]
+    for finder in finders:
+        find_spec = getattr(finder, "find_spec", None)
+        spec = None if find_spec is None else find_spec(name, path, target)
+        if spec is None:
+            continue
+        # Only file loaders are made per module, so timing them cannot mix up two modules
+        if isinstance(spec.loader, (ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader)):
+            spec.loader.exec_module = time_module(spec.loader, name)
+        return spec
+    return None
+
+
+def time_module(loader, name):
+    """
+    Return a version of <loader>.exec_module() that adds the import time of <name> to the import report.
+
+    :param loader: an importlib loader representing the loader of module <name>
+    :param name: a string representing the absolute name of the module
+    :precondition: loader must be an importlib loader made for module <name> only
+    :postcondition: get a function that executes the module with <loader> and records its self and cumulative time
+    :return: a function that takes a module object and executes it
+    """
+    exec_module = loader.exec_module
+
+    def exec_timed_module(module):
+        del loader.exec_module
+        _report_state["stack"].append(0.0)
+        start = perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            cumulative = perf_counter() - start
+            nested = _report_state["stack"].pop()
+            if _report_state["stack"]:
+                _report_state["stack"][-1] += cumulative
+            _report_state["records"].append((name, cumulative - nested, cumulative, len(_report_state["stack"])))
+
+    return exec_timed_module
+
+
+def get_import_records():
+    """
+    Return the modules timed so far, in the order their imports finished.
+
+    Each record is a tuple of form:
+    (<module name>, <seconds spent in the module itself>, <seconds including its imports>, <nesting depth>)
+
+    :postcondition: get the records of every timed module import
+    :return: a list of tuples representing the timed module imports
+    """
+    return _report_state["records"]
+
+
+def format_import_report(records=None):
+    """
+    Return the import times in the same layout as "python -X importtime".
+
+    :param records: (default None) a list of import record tuples from get_import_records(),
+                    or None for every module timed so far
+    :precondition: records must be a list of well-formed import records or None
+    :postcondition: get one line per module with its self and cumulative time in microseconds,
+                    indented by how deeply it was imported
+    :return: a string representing the import time report
+
+    >>> print(format_import_report([("game.child", 0.001, 0.001, 1), ("game.parent", 0.0005, 0.0015, 0)]))
+    import time: self [us] | cumulative | imported package
+    import time:      1000 |       1000 |   game.child
+    import time:       500 |       1500 | game.parent
+    """
+    if records is None:
+        records = _report_state["records"]
+    lines = ["import time: self [us] | cumulative | imported package"]
+    for name, self_seconds, cumulative_seconds, depth in records:
+        lines.append(
+            f"import time: {round(self_seconds * 1e6):>9} | {round(cumulative_seconds * 1e6):>10} | {'  ' * depth}{name}")
+    return "\n".join(lines)
@@ -4,9 +4,9 @@ Option menus.
 from collections import deque
 
 from game.sound.effects import get_effects
-from game.terminal.draw import create_text_area, draw_text_box
-from game.terminal.input import init_key_input, pull_input
+from game.terminal.input import init_key_input, poll_key_repeat
 from game.terminal.screen import clear_screen, get_screen_size
+from game.terminal.widget import create_menu_widget, draw_widgets, set_menu_options
 from game.utilities import longest_string, remove_escape_codes
 
 
@@ -37,27 +37,30 @@ def create_menu(column, row, *options, default=0):
     :return: a dictionary representing a menu's control functions
     """
     selected_index = len(options) // 2
-    longest_option = longest_string(options)[1]
+    longest_option = longest_string(tuple(map(remove_escape_codes, options)))[1]
     options = deque(options)
     options.rotate(selected_index - default)
-    text_area = create_text_area(
-        column=min(column, get_screen_size()[0] - longest_option - 4),
-        row=min(row, get_screen_size()[1] - len(options)),
-        width=longest_option + 4, height=len(options) + 1,
-        text="")
+    screen_width, screen_height = get_screen_size()
+    menu_area = (
+        min(column, screen_width - longest_option - 4), min(row, screen_height - len(options)),
+        longest_option + 4, len(options) + 1)
+    menu_widget = create_menu_widget(lambda parent, _: menu_area, options, selected_index)
 
-    def update_menu(key_press):
+    def update_menu(key_press, count=1):
         """
         Update the menu based on the input.
 
+        :param key_press: a string representing the key code of the pressed key input
+        :param count: (default 1) a positive integer representing how many times <key_press> was pressed
         :precondition: the menu must be well-formed
         :postcondition: update the menu
+        :postcondition: moving several options at once draws the menu only once
         :postcondition: draw the menu to the terminal
         """
         if key_press == "up":
-            previous_option()
+            previous_option(count)
         elif key_press == "down":
-            next_option()
+            next_option(count)
         elif key_press in (" ", "enter"):
             return options[selected_index]
         else:
@@ -72,34 +75,34 @@ def create_menu(column, row, *options, default=0):
         :precondition: the menu must be well-formed
         :postcondition: draw the menu to terminal
         :postcondition: menu is vertical
+        :postcondition: nothing is drawn if the menu already shows the same selection
         """
-        nonlocal text_area
-        options_draw = options.copy()
-        options_draw[selected_index] = f"< {options_draw[selected_index]} >"
-        text_area["text"] = '\n'.join(map(lambda option: option.ljust(longest_option + 4), options_draw))
-        draw_text_box(text_area=text_area, overwrite=True)
+        set_menu_options(menu_widget, options, selected_index)
+        draw_widgets(menu_widget)
 
-    def next_option():
+    def next_option(amount=1):
         """
-        Shift the selected menu option to one forward.
+        Shift the selected menu option to <amount> forward.
 
+        :param amount: (default 1) a positive integer representing how many options to shift by
         :precondition: the menu must be well-formed
-        :postcondition: shift the selected menu option to one forward
+        :postcondition: shift the selected menu option to <amount> forward
         :postcondition: the selected menu option cycles
         """
         nonlocal options
-        options.rotate(-1)
+        options.rotate(-amount)
 
-    def previous_option():
+    def previous_option(amount=1):
         """
-        Shift the selected menu option to one previous.
+        Shift the selected menu option to <amount> previous.
 
+        :param amount: (default 1) a positive integer representing how many options to shift by
         :precondition: the menu must be well-formed
-        :postcondition: shift the selected menu option to one previous
+        :postcondition: shift the selected menu option to <amount> previous
         :postcondition: the selected menu option cycles
         """
         nonlocal options
-        options.rotate(1)
+        options.rotate(amount)
 
     return {
         "next_option": next_option,
@@ -110,8 +113,9 @@ def create_menu(column, row, *options, default=0):
 
 def get_centered_menu_position(*options):
     options = list(map(remove_escape_codes, options))
-    menu_column = get_screen_size()[0] // 2 - longest_string(options)[1] - 4
-    menu_row = (get_screen_size()[1] - len(options)) // 2
+    screen_width, screen_height = get_screen_size()
+    menu_column = screen_width // 2 - longest_string(options)[1] - 4
+    menu_row = (screen_height - len(options)) // 2
     return (menu_column, menu_row)
 
 
@@ -126,10 +130,10 @@ def main():
     clear_screen()
     test_menu["draw_menu"]()
     while True:
-        if key_input["key_get"](key_input) in ("escape", "tab"):
+        event = poll_key_repeat(key_input, ("up", "down"))
+        if event["key"] in ("escape", "tab"):
             return
-        inputted = pull_input(key_input, flush=True)[0]
-        selected = test_menu["update_menu"](inputted)
+        selected = test_menu["update_menu"](event["key"], event["count"])
         if selected == "Exit":
             return
         elif selected == "Say Hi":
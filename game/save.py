@@ -2,11 +2,11 @@
 Save files.
 """
 import pathlib
-import dill as pickle
 from sys import stderr
 
 from game import relative_path
 from game.ansi_actions.cursor import cursor_set
+from game.terminal.output import write_output, flush_output
 from game.terminal.screen import get_screen_size
 
 
@@ -37,7 +37,8 @@ def get_user_data_folder(print_status=False):
     finally:
         if print_status:
             cursor_set(get_screen_size()[0] - len(status), get_screen_size()[1])
-            print(status, end="")
+            write_output(status)
+            flush_output()
         return save_folder
 
 
@@ -63,7 +64,8 @@ def load_saves_file_paths(game_data, print_status=False):
     finally:
         if print_status:
             cursor_set(get_screen_size()[0] - len(status), get_screen_size()[1])
-            print(status, end="")
+            write_output(status)
+            flush_output()
         return files
 
 
@@ -80,6 +82,8 @@ def load_save_from_file(file_path, print_status=False):
     :return: an object representing th data loaded from <file_path>,
              or None if no data could be loaded
     """
+    import dill as pickle
+
     status = "success"
     save_data = None
     try:
@@ -92,6 +96,7 @@ def load_save_from_file(file_path, print_status=False):
     finally:
         if print_status:
             cursor_set(get_screen_size()[0] - len(status), get_screen_size()[1])
+            flush_output()
             print(status, end="", file=stderr)
         return save_data
 
@@ -107,6 +112,8 @@ def save_data_to_file(game_data):
     :postcondition: attempt to save "progress" and "seed_system" from <game_data> to a pkl file
     :return: a string representing the success status of the file save
     """
+    import dill as pickle
+
     file_path = game_data["saves_path"] / f"{game_data["seed_system"]["aphid"]["name"].replace(" ", "_")}.pkl"
     status = "success"
     data = {"seed_system": game_data["seed_system"], "progress": game_data["progress"]}
@@ -1,58 +1,147 @@
 """
 Main scene manager.
 """
-from game.scene.scenes import (
-    startup, main_menu, quit,
-    seedos_signup, seedos_login, seedos_console, seedos_shutdown, seedos_look, seedos_burrow
-)
-
-
-def init_scenes():
-    """
-    Return a dictionary of scene data dictionaries for the game.
-
-    :postcondition: get a dictionary of well-formed scene data dictionaries
-    :return: a dictionary of scene data dictionaries representing the game's scenes
-    """
-    return {
-        "startup": startup.get_startup_scene(),
-        "main_menu": main_menu.get_main_menu_scene(),
-        "quit": quit.qet_quit_scene(),
-        "seedos_login": seedos_login.get_seedos_login_scene(),
-        "seedos_signup": seedos_signup.get_seedos_signup_scene(),
-        "seedos_console": seedos_console.get_seedos_console_scene(),
-        "seedos_shutdown": seedos_shutdown.get_seedos_shutdown_scene(),
-        "seedos_look": seedos_look.get_seedos_look_scene(),
-        "seedos_burrow": seedos_burrow.get_seedos_burrow_scene(),
-        # "seedos_unlock": seedos_look.get_seedos_look_scene()
-    }
+import importlib
+import inspect
+
+
+_scene_registry = {
+    "factories": {},
+    "scenes": {}}
+
 
+def register_scene(name, factory):
+    """
+    Register <factory> to build the scene called <name> the first time it is needed.
+
+    :param name: a string representing the name of the scene
+    :param factory: a function with no parameters that returns the scene data dictionary
+    :precondition: name must be a string
+    :precondition: factory must be a function that returns a well-formed scene data dictionary
+    :postcondition: get_scene(<name>) builds its scene with <factory>
+    :postcondition: a scene already built under <name> is dropped, so the new factory is used
+
+    >>> from unittest.mock import patch
+    >>> with patch.dict(_scene_registry["factories"]), patch.dict(_scene_registry["scenes"]):
+    ...     register_scene("doctest", lambda: {"name": "doctest"})
+    ...     scene = get_scene("doctest")
+    >>> scene, is_scene_registered("doctest")
+    ({'name': 'doctest'}, False)
+    """
+    _scene_registry["factories"][name] = factory
+    _scene_registry["scenes"].pop(name, None)
 
 
-def get_scenes(scenes={}):
+def get_scene(name):
     """
-     Return a dictionary of scene data dictionaries.
+    Return the scene data dictionary of the scene called <name>.
 
-    Initializes persistent scene data if <scenes> is empty from:
+    Each scene is built by its factory on first use and the same dictionary is returned afterwards,
+    so switching scenes costs the same however many scenes are registered.
+
+    Scene data dictionaries have the form:
     {
-        "startup",
-        "main_menu",
-        "seedos_login"
-        "seedos_console",
+        "name": <string>,
+        "open": <function or None>,
+        "update": <function or None>,
+        "exit": <function or None>
     }
 
-    :param scenes: a dictionary representing the game's scenes
-    :precondition: scenes must be a dictionary
-    :postcondition: get <scenes> updated with predefined scene dictionaries if they don't already exist
-    :return: a dictionary representing the combined group of sound effects
+    :param name: a string representing the name of a registered scene
+    :precondition: name must be a string
+    :postcondition: build the scene with its registered factory if it was not built before
+    :postcondition: errors raised while the scene is built, including KeyError, are passed on unchanged
+    :raises KeyError: if no scene is registered under <name>
+    :return: a dictionary representing the scene data of <name>
+
+    >>> from unittest.mock import patch
+    >>> build_count = []
+    >>> with patch.dict(_scene_registry["factories"]), patch.dict(_scene_registry["scenes"]):
+    ...     register_scene("counted", lambda: build_count.append(1) or {"name": "counted"})
+    ...     same_scene = get_scene("counted") is get_scene("counted")
+    >>> same_scene, len(build_count)
+    (True, 1)
+    """
+    if not is_scene_registered(name):
+        raise KeyError(name)
+    if name not in _scene_registry["scenes"]:
+        _scene_registry["scenes"][name] = _scene_registry["factories"][name]()
+    return _scene_registry["scenes"][name]
+
 
-    >>> get_scenes() == init_scenes()
-    True
-    >>> existing_scenes = {"scene_1": {"name": "scene_1"}}
-    >>> get_scenes(existing_scenes) == existing_scenes.update(init_scenes())
-    True
+def is_scene_registered(name):
     """
-    if not set(init_scenes()) <= set(scenes):
-        scenes.update(init_scenes())
-    return scenes
+    Return whether a scene is registered under <name>.
+
+    :param name: a string representing the name of a scene
+    :precondition: name must be a string
+    :postcondition: get whether get_scene(<name>) has a factory to build the scene with
+    :return: True if a scene is registered under <name>, else False
+
+    >>> is_scene_registered("startup"), is_scene_registered("not_a_scene")
+    (True, False)
+    """
+    return name in _scene_registry["factories"]
+
 
+def import_factory(module_name, factory_name):
+    """
+    Return a scene factory that imports <module_name> only when the scene is first built.
+
+    Scene modules pull in the seedOS commands, saving and sound, so they are not imported at startup.
+
+    :param module_name: a string representing the absolute name of the module holding the factory
+    :param factory_name: a string representing the name of the factory function in the module
+    :precondition: module_name must be the name of an importable module
+    :precondition: factory_name must be the name of a function in that module returning a scene data dictionary
+    :postcondition: get a function that imports <module_name> and returns the scene built by <factory_name>
+    :return: a function with no parameters representing the scene factory
+
+    >>> factory = import_factory("game.scene.scenes.quit", "qet_quit_scene")
+    >>> factory()["name"]
+    'quit'
+    """
+    def build_scene():
+        return getattr(importlib.import_module(module_name), factory_name)()
+
+    return build_scene
+
+
+register_scene("startup", import_factory("game.scene.scenes.startup", "get_startup_scene"))
+register_scene("main_menu", import_factory("game.scene.scenes.main_menu", "get_main_menu_scene"))
+register_scene("quit", import_factory("game.scene.scenes.quit", "qet_quit_scene"))
+register_scene("seedos_login", import_factory("game.scene.scenes.seedos_login", "get_seedos_login_scene"))
+register_scene("seedos_signup", import_factory("game.scene.scenes.seedos_signup", "get_seedos_signup_scene"))
+register_scene("seedos_console", import_factory("game.scene.scenes.seedos_console", "get_seedos_console_scene"))
+register_scene("seedos_shutdown", import_factory("game.scene.scenes.seedos_shutdown", "get_seedos_shutdown_scene"))
+register_scene("seedos_look", import_factory("game.scene.scenes.seedos_look", "get_seedos_look_scene"))
+register_scene("seedos_burrow", import_factory("game.scene.scenes.seedos_burrow", "get_seedos_burrow_scene"))
+
+
+async def run_scene_step(step, game_data):
+    """
+    Run the <step> of a scene, whether it is a plain function or a coroutine function.
+
+    Scene "open", "update" and "exit" functions may be plain functions, which block the event loop
+    until they return, or coroutine functions, which await input, timers and animations.
+
+    :param step: a function or coroutine function that takes <game_data>, or None
+    :param game_data: a dictionary representing the data needed to run the game
+    :precondition: step must be a function, a coroutine function or None
+    :precondition: game_data must be a well-formed dictionary of game data
+    :precondition: must be awaited inside a running asyncio event loop
+    :postcondition: run <step> with <game_data> to the end
+    :return: the value returned by <step>, or None if <step> is None
+
+    >>> import asyncio
+    >>> async def update_async(_):
+    ...     return "main_menu"
+    >>> asyncio.run(run_scene_step(update_async, {})), asyncio.run(run_scene_step(lambda _: "quit", {}))
+    ('main_menu', 'quit')
+    """
+    if step is None:
+        return None
+    result = step(game_data)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
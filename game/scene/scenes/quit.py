@@ -1,9 +1,9 @@
 """
 Pre quit scene.
 """
-from time import sleep
-
 from game.ansi_actions.style import style
+from game.terminal.draw import play_animation
+from game.terminal.output import write_output, flush_output
 from game.terminal.screen import clear_screen
 
 
@@ -35,14 +35,14 @@ def qet_quit_scene():
                  or None to signify game exit
         """
         # save data
-        # play quit animation
         clear_screen()
-        print(style("Shutting down...", "red"))
-        sleep(1)
-        print("See you next time!")
+        play_animation((style("Shutting down" + "." * dots, "red") for dots in range(4)), 4)
+        write_output("\nSee you next time!\n")
+        flush_output()
         return None
 
     return {
+        "name": "quit",
         "open": None,
         "update": update_quit,
         "exit": None
@@ -9,12 +9,16 @@ from sys import stderr
 from game.ansi_actions.style import style
 from game.seedOS.burrow.burrow import load_board_from_file, draw_board, spawn_entity, get_entity_types
 from game.seedOS.burrow.drivers import targeted_action, get_drivers
-from game.terminal.draw import draw_text_box, draw_rectangle
-from game.terminal.input import poll_key_press
-from game.terminal.screen import clear_screen, get_screen_size
+from game.terminal.frame import begin_frame, present
+from game.terminal.input import is_key_waiting, poll_key_press
+from game.terminal.screen import clear_screen
+from game.terminal.widget import create_box, draw_widgets, set_widget_content
 from game.seedOS.console import display_message_history, send_message, send_messages
 from game.utilities import get_direction_vectors, sum_vectors, longest_string
 
+_player_stats_box = create_box(
+    lambda parent, text: (3, parent[3] - 7, longest_string(text.split("\n"))[1] + 4, 10))
+
 
 def get_seedos_burrow_scene():
     """
@@ -106,7 +110,6 @@ def get_seedos_burrow_scene():
             if status:
                 send_message(game_data["seed_system"], style("|An error occurred|", "red"))
                 return "seedos_console"
-            clear_screen()
             player_turn(game_data, board, aphid_entity, max_moves_left)
             environment_turn(board, aphid_entity, aphid_entity["position"])
             if aphid_entity["state"] != "alive":
@@ -123,8 +126,12 @@ def player_turn(game_data, board, player, max_moves):
     moves_left = max_moves
     while moves_left > 0:
         current_action = next(player["moves"])
-        draw_board(board, (3, 1))
-        display_player_stats(player, current_action, moves_left)
+        # Each move is its own action, so held keys are not merged, but only the last one is drawn
+        if not is_key_waiting(game_data["key_input"]):
+            begin_frame()
+            draw_board(board, (3, 1))
+            display_player_stats(player, current_action, moves_left)
+            present()
         inputted = poll_key_press(game_data["key_input"])
         try:
             action_direction = get_direction_vectors()[inputted]
@@ -163,8 +170,8 @@ def display_player_stats(player, move, moves_left):
     :precondition: move must be a string
     :precondition: moves_left must be an integer
     :postcondition: display the player's stats to the screen
+    :postcondition: the stats box is only laid out again when its text or the screen size changes
     """
-    window = get_screen_size()
     text = (
         f"Goal: End your turn on the {style('G', 'yellow')}\n"
         f"Current Action: {style(move, 'blue')}\n"
@@ -172,6 +179,6 @@ def display_player_stats(player, move, moves_left):
         f"Actions Left: {moves_left}\n"
         f"APHID HP: {
         style(str(player['health']), 'green' if player['health'] > 5 else 'red')}/{player['max_health']}")
-    draw_rectangle(column=3, row=window[1] - 7, width=longest_string(text.split("\n"))[1] + 4, height=10)
-    draw_text_box(column=4, row=window[1] - 6, width=window[0], height=6, text=text)
+    set_widget_content(_player_stats_box, text)
+    draw_widgets(_player_stats_box)
 
@@ -6,6 +6,7 @@ from game.ansi_actions.style import style
 from game.save import load_saves_file_paths, load_save_from_file
 from game.menu import get_centered_menu_position
 from game.seedOS.console import do_menu_prompt
+from game.terminal.output import write_output
 from game.terminal.screen import clear_screen
 
 
@@ -45,7 +46,7 @@ def get_seedos_login_scene():
         menu_column, menu_row = get_centered_menu_position(*options)
         clear_screen()
         cursor_set(menu_column, menu_row - 1)
-        print("Choose a save:", end="", flush=False)
+        write_output("Choose a save:")
 
     def exit_seedos_login(game_data):
         """
@@ -4,8 +4,10 @@ Looking inside a txt file.
 from sys import stderr
 
 from game.ansi_actions.style import style
+from game.ansi_actions.styled_text import as_styled_text, join_styled_text
 from game.terminal.draw import draw_text_box
-from game.terminal.input import poll_key_press
+from game.terminal.frame import begin_frame, present
+from game.terminal.input import poll_key_repeat
 from game.terminal.screen import clear_screen, get_screen_size
 from game.seedOS.console import display_message_history, send_message, send_messages
 
@@ -25,10 +27,10 @@ def get_seedos_look_scene():
     :postcondition: get data for the seedOS look scene
     :return: a dictionary representing the data for the seedOS look scene
     """
-    hints_text = (
-            style('Up/Down to scroll through lines', 'yellow') +
-            f"\n{style('q to quit', 'red')}")
-    file_text = "Nothing's here..."
+    hints_text = join_styled_text("\n", (
+        style('Up/Down to scroll through lines', 'yellow'),
+        style('q to quit', 'red')))
+    file_text = [as_styled_text("Nothing's here...")]
     read_index = 0
 
     def open_seedos_look(game_data: dict) -> None:
@@ -45,10 +47,10 @@ def get_seedos_look_scene():
         actual_file_path = game_data["seed_system"]["active_file"]["data"]["text_src"]
         try:
             with open(actual_file_path, "r") as actual_file:
-                file_text = actual_file.readlines()
+                file_text = [as_styled_text(line.rstrip("\n")) for line in actual_file]
         except FileNotFoundError:
             print(f"|System Error|\nCannot find text file: {actual_file_path}", file=stderr)
-            file_text = "File Corrupted"
+            file_text = [as_styled_text("File Corrupted")]
         read_index = 0
         send_messages(game_data["seed_system"], (
             f"Opening: {style(game_data['seed_system']['active_file']['name'], 'yellow')}",
@@ -80,24 +82,27 @@ def get_seedos_look_scene():
         """
         nonlocal read_index
         while True:
-            clear_screen()
+            screen_width, screen_height = get_screen_size()
+            begin_frame()
             # Hints text box
             draw_text_box(
-                column=4, row=get_screen_size()[1] - 3, width=get_screen_size()[0], height=3,
+                column=4, row=screen_height - 3, width=screen_width, height=3,
                 text=hints_text, overwrite=True)
             # Messages text box
-            messages_height = get_screen_size()[1] - 5
+            messages_height = screen_height - 5
             displayed_text = file_text[read_index:min(read_index + messages_height, len(file_text))]
             draw_text_box(
-                column=4, row=1, width=get_screen_size()[0], height=messages_height,
-                text="".join(displayed_text), overwrite=True)
+                column=4, row=1, width=screen_width, height=messages_height,
+                text=join_styled_text("\n", displayed_text), overwrite=True)
+            present()
             # Input
-            inputted = poll_key_press(game_data["key_input"])
-            if inputted == "up":
-                read_index = max(0, read_index - 1)
-            if inputted == "down":
-                read_index = max(0, min(len(file_text) - messages_height, read_index + 1))
-            if inputted == "q":
+            # Held keys are merged, so a scroll of many lines is drawn once
+            event = poll_key_repeat(game_data["key_input"], ("up", "down"))
+            if event["key"] == "up":
+                read_index = max(0, read_index - event["count"])
+            if event["key"] == "down":
+                read_index = max(0, min(len(file_text) - messages_height, read_index + event["count"]))
+            if event["key"] == "q":
                 return "seedos_console"
 
     return {
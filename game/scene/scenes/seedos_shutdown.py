@@ -1,11 +1,13 @@
 """
 Save and shutdown seedOS, then return to main menu.
 """
+import asyncio
+
 from game.ansi_actions.style import style
 from game.save import save_data_to_file
 from game.seedOS.console import (
     display_message_history, draw_user_prompt,
-    send_message, send_messages, do_validated_prompt)
+    send_message, send_messages, send_messages_async, do_validated_prompt_async, skip_on_key_press)
 
 
 def get_seedos_shutdown_scene():
@@ -35,11 +37,12 @@ def get_seedos_shutdown_scene():
         draw_user_prompt()
         display_message_history(game_data["seed_system"])
 
-    def update_seedos_shutdown(game_data):
+    async def update_seedos_shutdown(game_data):
         """
         Return the next scene to run after the seedOS shutdown.
 
         None is returned to signify program exit.
+        Each question keeps typing while the user types their answer.
 
         :param game_data: a dictionary representing the data needed to run the game
         :precondition game_data: must be a well-formed dictionary of game data
@@ -47,29 +50,29 @@ def get_seedos_shutdown_scene():
                  or None to signify game exit
         """
         # Get save preference
-        send_messages(game_data["seed_system"], (
+        typing = asyncio.create_task(send_messages_async(game_data["seed_system"], (
             "Getting ready to shutdown system...",
-            style("Save game to file (this will overwrite the existing save data)? (yes/no)", "red")))
-        confirm_save = do_validated_prompt(
+            style("Save game to file (this will overwrite the existing save data)? (yes/no)", "red"))))
+        confirm_save = (await do_validated_prompt_async(
             game_data,
-            lambda choice: choice.strip().lower() in ("yes", "no")).strip().lower()
+            lambda choice: choice.strip().lower() in ("yes", "no"), typing)).strip().lower()
         if confirm_save == "yes":
             send_message(game_data["seed_system"], save_data_to_file(game_data))
         else:
             send_message(game_data["seed_system"], "Did not save data.")
         # Confirm shutdown
-        send_messages(game_data["seed_system"], (
+        typing = asyncio.create_task(send_messages_async(game_data["seed_system"], (
             "Choice confirmed.",
-            style("Are you sure you want to shut down SeedOS? (yes/no)", "red")))
-        confirm_shutdown = do_validated_prompt(
+            style("Are you sure you want to shut down SeedOS? (yes/no)", "red"))))
+        confirm_shutdown = (await do_validated_prompt_async(
             game_data,
-            lambda choice: choice.strip().lower() in ("yes", "no")).strip().lower()
+            lambda choice: choice.strip().lower() in ("yes", "no"), typing)).strip().lower()
         if confirm_shutdown == "yes":
             return "main_menu"
         else:
             send_messages(game_data["seed_system"], (
                 "Canceling shutdown...",
-                "Done!"))
+                "Done!"), should_cancel=skip_on_key_press(game_data))
             return "seedos_console"
 
     return {
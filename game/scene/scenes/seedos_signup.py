@@ -5,7 +5,7 @@ from game.ansi_actions.style import style
 from game.save import save_data_to_file
 from game.seedOS import init_seed_system, init_aphid
 from game.seedOS.console import (
-    send_messages, do_validated_prompt, do_menu_prompt, press_any_key_to_continue)
+    send_messages, do_validated_prompt, do_menu_prompt, press_any_key_to_continue, skip_on_key_press)
 from game.terminal.screen import clear_screen
 
 
@@ -65,7 +65,7 @@ def get_seedos_signup_scene():
             "Installing seedOS...",
             "Hatching APHID...",
             style("Done!", "green"),
-            "Enter your name:"))
+            "Enter your name:"), should_cancel=skip_on_key_press(game_data))
         name = do_validated_prompt(
             game_data,
             lambda name_output: len(name_output.strip()) != 0 and not "\033" in name_output)
@@ -96,7 +96,7 @@ def get_seedos_signup_scene():
             "Watching grass grow...",
             "Building ShellSpace...",
             "Done!",
-        ), 1)
+        ), 1, should_cancel=skip_on_key_press(game_data))
         press_any_key_to_continue(game_data)
 
         return "seedos_console"
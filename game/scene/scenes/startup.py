@@ -1,6 +1,10 @@
 """
 Startup boot sequence and cool stuff.
 """
+from math import ceil
+
+from game.terminal.input import poll_key_event, start_text_input
+from game.terminal.output import write_output
 from game.terminal.screen import get_screen_size, clear_screen
 
 
@@ -20,12 +24,15 @@ def get_startup_scene():
     :return: a dictionary representing the data for the startup scene
     """
 
-    def update_startup(_):
+    def update_startup(game_data):
         """
         Return the next scene to run after the startup.
 
         None is returned to signify program exit.
+        The answer is typed through the input reader, which owns the keyboard once the game starts.
 
+        :param game_data: a dictionary representing the data needed to run the game
+        :precondition: game_data must be a well-formed dictionary of game data that has "key_input"
         :postcondition: run the startup scene
         :postcondition: return the next scene to run, or None for game exit
         :return: a string representing the name of the next scene to run,
@@ -33,12 +40,18 @@ def get_startup_scene():
         """
         while True:
             clear_screen()
-            print(
-                f"Current size: {get_screen_size()} | Adjust to at least (100, 35) for the best experience.\n"
-                "Enter 'y' to continue, 'n' to exit, and any key to reload screen size.\n")
-            choice = input("> ")
-            if choice is None:
-                continue
+            lines = (
+                f"Current size: {get_screen_size()} | Adjust to at least (100, 35) for the best experience.",
+                "Enter 'y' to continue, 'n' to exit, and any key to reload screen size.",
+                "")
+            write_output("\n".join(lines) + "\n> ")
+            # Lines wider than the screen wrap, so the prompt is below every row they take up
+            prompt_row = 1 + sum(max(1, ceil(len(line) / get_screen_size()[0])) for line in lines)
+            text_input = start_text_input(column=3, row=prompt_row)
+            choice = text_input("end", flush=True)
+            while choice is None:
+                event = poll_key_event(game_data["key_input"])
+                choice = text_input(event["key"], flush=True, pasted=event.get("text", ""))
             choice = choice.lower()
             if choice == "y":
                 return "main_menu"
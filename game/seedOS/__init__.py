@@ -15,7 +15,7 @@ def init_seed_system():
         "aphid": <dictionary of aphid data or None>,
         "command_root": <dictionary of command data>,
         "file_tree": <dictionary of file tree data>,
-        "message_history": <list of string outputs to seedOS console>,
+        "message_history": <list of styled text outputs to seedOS console>,
         "active_program": <string program (scene) name or None for seedos_console>,
         "active_file": <dictionary of file data or None for active program>
     }
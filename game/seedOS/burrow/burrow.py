@@ -6,8 +6,12 @@ from io import StringIO
 from sys import stderr
 from typing import TextIO
 
-from game.ansi_actions.cursor import cursor_set
+from game.ansi_actions.cursor import cursor_move_to, cursor_write
 from game.ansi_actions.style import style
+from game.ansi_actions.styled_text import as_styled_text
+from game.terminal.draw import get_draw_batch
+from game.terminal.frame import get_active_frame, get_presented_frame, write_to_frame
+from game.terminal.output import flush_output
 from game.terminal.screen import point_within_screen
 from game.utilities import targets_have_key, targets_with_key, remove_escape_codes, sum_vectors
 
@@ -76,21 +80,33 @@ def draw_board(board: dict, position_offset=(0, 0), flush=True):
     :param board: a dictionary of entity dictionaries representing the board to draw
     :param position_offset: a tuple of 2 integers larger than or equal to 0,
            representing the position to offset drawing <board> by
-    :param flush: (default True) a boolean representing whether to flush the output to stdout
+    :param flush: (default True) a boolean representing whether to flush the buffered output to the terminal
     :precondition: board must be a dictionary of dictionaries with key-value pair: "icon": <string>
     :precondition: position_offset must be a tuple of 2 integers larger than or equal to 0
     :precondition: flush_output must be a boolean
     :postcondition: draw <board> to the screen, offset by <position_offset>
     :postcondition: the entity most recently added to the tile is drawn
+    :postcondition: if a frame is being composited, <board> is written into the frame instead
+    :postcondition: if a draw_batch() is open, <board> is written into the batch instead and nothing is flushed
     """
-    for entities_position, entities in board.items():
-        if entities_position == "entity_id":
-            continue
+    active_frame = get_active_frame()
+    batch = None if active_frame else get_draw_batch()
+    target_frame = active_frame or get_presented_frame()
+    positions = sorted(
+        (position for position in board if position != "entity_id"), key=lambda position: (position[1], position[0]))
+    # Drawing row by row lets neighbouring cells follow each other without any cursor moves
+    for entities_position in positions:
+        entities = board[entities_position]
         terminal_position = sum_vectors(entities_position, position_offset)
-        if all(point_within_screen(terminal_position)):
-            cursor_set(*terminal_position)
-            print(entities[-1]["icon"], end="")
-    print(end="", flush=flush)
+        if target_frame:
+            write_to_frame(target_frame, *terminal_position, entities[-1]["icon"], width=1)
+        if batch:
+            write_to_frame(batch, *terminal_position, entities[-1]["icon"], width=1)
+        elif not active_frame and all(point_within_screen(terminal_position)):
+            cursor_move_to(*terminal_position)
+            cursor_write(as_styled_text(entities[-1]["icon"]), 1)
+    if flush and not batch:
+        flush_output()
 
 
 def get_entities_at_position(board, position):
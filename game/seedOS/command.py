@@ -2,6 +2,7 @@
 User interaction with SeedOS.
 """
 from game.ansi_actions import style
+from game.ansi_actions.styled_text import as_styled_text, split_styled_text
 from game.seedOS.console import send_messages, send_message
 
 
@@ -57,7 +58,7 @@ def send_command(seed_system, command_string):
     tokens = command_string.strip().split()
     status = status_report(
         *run_command(seed_system, seed_system["command_root"], tokens))
-    send_messages(seed_system, status["message"].split("\n"))
+    send_messages(seed_system, split_styled_text(as_styled_text(status["message"])))
     send_message(seed_system, "")
     return status
 
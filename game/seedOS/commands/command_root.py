@@ -7,6 +7,7 @@ from game.seedOS.commands.cd import get_cd_command
 from game.seedOS.commands.clear import get_clear_command
 from game.seedOS.commands.do import get_do_command
 from game.seedOS.commands.help import get_help_command
+from game.seedOS.commands.latency import get_latency_command
 from game.seedOS.commands.look import get_look_command
 from game.seedOS.commands.ls import get_ls_command
 from game.seedOS.commands.shutdown import get_shutdown_command
@@ -25,6 +26,7 @@ def create_command_root():
             "cd": get_cd_command(),
             "look": get_look_command(),
             "do": get_do_command(),
-            "aphid": get_aphid_command()
+            "aphid": get_aphid_command(),
+            "latency": get_latency_command()
         }
     )
\ No newline at end of file
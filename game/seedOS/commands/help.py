@@ -5,6 +5,7 @@ import json
 
 from game import relative_path
 from game.ansi_actions.style import style
+from game.ansi_actions.styled_text import as_styled_text, render_styled_text, split_styled_text
 from game.seedOS.command import create_command
 from game.seedOS.console import display_message_history, send_messages, send_message
 
@@ -54,7 +55,7 @@ def run_help(seed_system, tokens):
             status = "syntax_error"
             status_message = "|Could not find help document|\n" + tokens[0]
         else:
-            send_messages(seed_system, format_long_description(command_help).split("\n"))
+            send_messages(seed_system, split_styled_text(as_styled_text(format_long_description(command_help))))
             status_message = f"|Showed help documentation|\n{tokens[0]}"
     else:
         for command_help in command_documents.values():
@@ -133,7 +134,7 @@ def main():
         }
     }
     print(run_help(mock_seed_system, ["help"]))
-    print(*mock_seed_system["message_history"], sep="\n")
+    print(*map(render_styled_text, mock_seed_system["message_history"]), sep="\n")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,40 @@
+"""
+Show how long key presses take to reach the screen.
+"""
+from game.seedOS import create_command
+from game.seedOS.console import send_messages
+from game.terminal.latency import format_latency_stats
+
+
+def get_latency_command():
+    """
+    Get the dictionary data for the latency command.
+
+    :postcondition: get the data for the latency command
+    :return: a dictionary representing the data for the latency command
+    """
+    return create_command(
+        name="latency",
+        run=run_latency,
+        privilege_required=0)
+
+
+def run_latency(seed_system, tokens):
+    """
+    Run the latency command.
+
+    :param seed_system: a dictionary representing the currently active seedOS system
+    :param tokens: a list of strings representing the arguments passed in to the command
+    :precondition: seed_system must be a well-formed seed_system dictionary
+    :precondition: tokens must be a list of strings
+    :postcondition: show the input-to-photon latency percentiles of every scene so far
+    :return: a tuple of 2 strings representing the success status and a status message
+    """
+    status = "success"
+    if tokens:
+        status = "argument_error"
+        status_message = f"|'latency' expects no arguments|\n{len(tokens)} > 0"
+    else:
+        send_messages(seed_system, format_latency_stats().split("\n"), 0)
+        status_message = "|Showed input latency|"
+    return (status, status_message)
@@ -1,21 +1,34 @@
 """
 Main user interaction with the system via a console.
 """
+import asyncio
 from collections.abc import Callable
+from functools import lru_cache
 from time import sleep
 
 from game.ansi_actions.style import style
+from game.ansi_actions.styled_text import as_styled_text, get_styled_text_length, join_styled_text, slice_styled_text
 from game.menu import create_menu, get_centered_menu_position
 from game.sound.effects import get_effects
-from game.terminal.draw import create_text_area, draw_text_box, draw_rectangle
-from game.terminal.input import start_text_input, init_key_input, poll_key_press
-from game.terminal.screen import get_screen_size, clear_screen
+from game.terminal.draw import create_text_area, draw_text_box, play_animation, play_animation_async
+from game.terminal.input import (
+    start_text_input, init_key_input, is_key_waiting,
+    poll_key_event, poll_key_event_async, poll_key_press, poll_key_repeat)
+from game.terminal.output import flush_output
+from game.terminal.screen import get_screen_size, clear_screen, set_scroll_region
+from game.terminal.widget import (
+    create_box, create_text_widget, draw_widgets, get_screen_area, get_widget_area, mark_widget_dirty,
+    scroll_text_widget, set_widget_content)
+
+_console_state = {"scroll_mode": True}
 
 
 def get_console_dimensions():
     """
     Get the dimensions of the SeedOS simulation console parts within the actual terminal.
 
+    The dimensions are only computed again when the terminal size changes.
+
     Sizes are in form: (<columns AKA width>, <rows AKA height>)
     The dictionary's keys are as follows:
         "output":  message history (top left)
@@ -29,69 +42,205 @@ def get_console_dimensions():
     :postcondition: the dictionary will have tuples of form (<columns AKA width>, <rows AKA height>)
     :return: a dictionary of SeedOS simulation console part names as strings and their sizes as tuples
     """
+    return get_console_dimensions_for_size(get_screen_size())
+
+
+@lru_cache
+def get_console_dimensions_for_size(screen_size):
+    """
+    Get the dimensions of the SeedOS simulation console parts within a terminal of <screen_size>.
+
+    :param screen_size: a tuple of two positive integers representing the width and height of the terminal
+    :precondition: screen_size must be a tuple of two positive integers
+    :postcondition: get a dictionary of SeedOS simulation console parts and their sizes, as get_console_dimensions()
+    :return: a dictionary of SeedOS simulation console part names as strings and their sizes as tuples
+
+    >>> get_console_dimensions_for_size((100, 30)) == {"output": (80, 26), "input": (80, 3), "clippy": (20, 26)}
+    True
+    """
+    screen_width, screen_height = screen_size
     return {
-        "output": (max(10, min(4 * get_screen_size()[0] // 4, get_screen_size()[0] - 20)),
-                   max(1, get_screen_size()[1] - 4)),
-        "input": (max(10, min(80, get_screen_size()[0] - 2)), 3),
-        "clippy": (max(14, min(20, get_screen_size()[0] // 4)), max(20, get_screen_size()[1] - 4))
+        "output": (max(10, min(4 * screen_width // 4, screen_width - 20)),
+                   max(1, screen_height - 4)),
+        "input": (max(10, min(80, screen_width - 2)), 3),
+        "clippy": (max(14, min(20, screen_width // 4)), max(20, screen_height - 4))
     }
 
 
+_console_widgets = {
+    "history": create_text_widget(
+        lambda parent, _: (4, 2, *get_console_dimensions_for_size(parent[2:])["output"])),
+    "prompt": create_box(
+        lambda parent, _: (1, parent[3] - 2, get_console_dimensions_for_size(parent[2:])["input"][0], 3))}
+
+
+def set_console_scroll_mode(enabled):
+    """
+    Choose whether new messages scroll the console output with a terminal scroll region.
+
+    In scroll mode, a message that moves the output up by one row costs one row of output
+    instead of repainting the whole console output.
+
+    :param enabled: a boolean representing whether to scroll the console output when possible
+    :precondition: enabled must be a boolean
+    :precondition: terminal must support the DECSTBM escape sequence if <enabled> is True
+    :postcondition: the message history is scrolled when possible if <enabled> is True,
+                    and repainted otherwise
+    """
+    _console_state["scroll_mode"] = enabled
+
+
 def send_message(seed_system, message):
     """
     Write message(s) to the message history of <seed_system>.
 
     Split <message> into multiple lines if larger than console output width.
+    Messages are stored as styled text, so splitting never breaks their styles.
 
     :param seed_system: a dictionary representing the currently active seedOS system
-    :param message: a string representing the message to write to the message history
-    :precondition: seed_system must be a dictionary with the key-value pair, "message_history": <list of strings>
-    :precondition: message must be a string
-    :postcondition: append <message> to the message history of <seed_system>
+    :param message: a string or styled text representing the message to write to the message history
+    :precondition: seed_system must be a dictionary with the key-value pair,
+                   "message_history": <list of strings or styled texts>
+    :precondition: message must be a string or styled text
+    :postcondition: append <message> to the message history of <seed_system> as styled text
     :postcondition: the message may be split up if longer than the console output width
     """
-    width = get_console_dimensions()["output"][0]
-    if len(message) > width:
-        seed_system["message_history"].append(message[:width])
-        send_message(seed_system, message[width:])
-    else:
-        seed_system["message_history"].append(message)
+    append_message(seed_system, message)
     display_message_history(seed_system)
 
 
-def send_messages(seed_system, messages, delay=0.5):
+def append_message(seed_system, message):
+    """
+    Add message(s) to the message history of <seed_system> without displaying them.
+
+    :param seed_system: a dictionary representing the currently active seedOS system
+    :param message: a string or styled text representing the message to add to the message history
+    :precondition: seed_system must be a dictionary with the key-value pair,
+                   "message_history": <list of strings or styled texts>
+    :precondition: message must be a string or styled text
+    :postcondition: append <message> to the message history of <seed_system> as styled text
+    :postcondition: the message may be split up if longer than the console output width
+    """
+    width = get_console_dimensions()["output"][0]
+    message = as_styled_text(message)
+    while get_styled_text_length(message) > width:
+        seed_system["message_history"].append(slice_styled_text(message, 0, width))
+        message = slice_styled_text(message, width)
+    seed_system["message_history"].append(message)
+
+
+def send_messages(seed_system, messages, delay=0.5, should_cancel=None):
     """
     Send multiple messages to the console, <delay> seconds apart.
 
+    The messages are played as an animation, so a slow terminal skips ahead instead of falling behind.
+
     :param seed_system: a dictionary representing the currently active seedOS system
-    :param messages: an iterable of strings representing the messages to write to the console
+    :param messages: an iterable of strings or styled texts representing the messages to write to the console
     :param delay: (default 0.5) a float greater than or equal to 0,
                   representing the seconds to wait between each message write
-    :precondition: seed_system must be a dictionary with the key-value pair, "message_history": <list of strings>
+    :param should_cancel: (default None) a function with no parameters that returns True to skip to the last message,
+                          or None to always show every message
+    :precondition: seed_system must be a dictionary with the key-value pair,
+                   "message_history": <list of strings or styled texts>
     :precondition: message must be a string
     :precondition: delay must be a float greater than or equal to 0
+    :precondition: should_cancel must be a function or None
     :postcondition: send and display each string in <messages>, <delay> seconds apart
     :postcondition: append the contents of each string in <messages> to the message history of <seed_system>
     """
+    frames = []
     for message in messages:
-        send_message(seed_system, message)
+        append_message(seed_system, message)
+        frames.append(get_message_history_text(seed_system))
+    if delay <= 0 or not play_animation(
+            frames, 1 / delay, text_area=get_message_history_area(), should_cancel=should_cancel,
+            draw_frame=(lambda frame_index: show_message_history_text(frames[frame_index]))
+            if _console_state["scroll_mode"] else None):
         display_message_history(seed_system)
-        sleep(delay)
+    elif not _console_state["scroll_mode"]:
+        # The animation was drawn over the message history without going through its widget
+        mark_widget_dirty(_console_widgets["history"])
 
 
-def display_message_history(seed_system, offset=0):
+async def send_messages_async(seed_system, messages, delay=0.5):
     """
-    Display the message history of <seed_system> to the terminal.
+    Send multiple messages to the console, <delay> seconds apart, awaiting between them.
+
+    Run it as a task to keep typing the messages while the scene does something else, like reading keys,
+    and cancel the task with finish_messages() to skip to the last message.
+
+    :param seed_system: a dictionary representing the currently active seedOS system
+    :param messages: an iterable of strings or styled texts representing the messages to write to the console
+    :param delay: (default 0.5) a float greater than or equal to 0,
+                  representing the seconds to wait between each message write
+    :precondition: seed_system must be a dictionary with the key-value pair,
+                   "message_history": <list of strings or styled texts>
+    :precondition: delay must be a float greater than or equal to 0
+    :precondition: must be awaited inside a running asyncio event loop
+    :postcondition: send and display each string in <messages>, <delay> seconds apart
+    :postcondition: append the contents of each string in <messages> to the message history of <seed_system>
+    :postcondition: the whole message history is displayed if the task is cancelled
+    """
+    frames = []
+    for message in messages:
+        append_message(seed_system, message)
+        frames.append(get_message_history_text(seed_system))
+    if delay <= 0:
+        display_message_history(seed_system)
+        return
+    try:
+        await play_animation_async(
+            frames, 1 / delay, text_area=get_message_history_area(),
+            draw_frame=(lambda frame_index: show_message_history_text(frames[frame_index]))
+            if _console_state["scroll_mode"] else None)
+    except asyncio.CancelledError:
+        display_message_history(seed_system)
+        raise
+    if not _console_state["scroll_mode"]:
+        # The animation was drawn over the message history without going through its widget
+        mark_widget_dirty(_console_widgets["history"])
+
+
+async def finish_messages(typing):
+    """
+    Skip the messages still being typed by <typing> to the last one.
+
+    :param typing: an asyncio.Task running send_messages_async(), or None
+    :precondition: typing must be an asyncio.Task or None
+    :precondition: must be awaited inside a running asyncio event loop
+    :postcondition: cancel <typing> and wait for it to display the whole message history
+    :postcondition: nothing happens if <typing> is None or already done
+    """
+    if typing is None or typing.done():
+        return
+    typing.cancel()
+    await asyncio.wait((typing,))
+
+
+def get_message_history_area():
+    """
+    Return the text area that the message history is displayed in.
+
+    :postcondition: get a text area covering the console output
+    :return: a dictionary representing the text area of the message history
+    """
+    return create_text_area(*get_widget_area(_console_widgets["history"], get_screen_area()))
+
+
+def get_message_history_text(seed_system, offset=0):
+    """
+    Return the styled text of the message history of <seed_system> as it fits in the console output.
 
     :param seed_system: a dictionary representing the currently active seedOS system
     :param offset: (default 0) an integer greater than or equal to 0,
                    representing the message offset from the latest to start displaying from
-    :precondition: seed_system must be a dictionary with the key-value pair, "message_history": <list of strings>
+    :precondition: seed_system must be a dictionary with the key-value pair,
+                   "message_history": <list of strings or styled texts>
     :precondition: offset must be an integer greater than or equal to 0
     :precondition: string in the history must not have newline characters (\n)
-    :postcondition: display the message history of <seed_system> to the terminal
-    :postcondition: the first message displayed is <offset> from the most recent message
-    :postcondition: messages are displayed bottom to top
+    :postcondition: get one row per console output row, with the most recent message at the bottom
+    :return: a tuple of runs representing the styled text of the visible message history
     """
     size = get_console_dimensions()["output"]
     message_count = min(
@@ -102,26 +251,81 @@ def display_message_history(seed_system, offset=0):
     messages = seed_system["message_history"][-offset - 1:- offset - message_count - 1:-1]
     messages.reverse()
     messages = ["" for _ in range(size[1] - message_count)] + messages
-    text_area = create_text_area(
-        column=4, row=2, width=size[0], height=size[1],
-        text="\n".join(messages))
-    draw_text_box(text_area=text_area, overwrite=True)
+    return join_styled_text("\n", messages)
+
+
+def display_message_history(seed_system, offset=0):
+    """
+    Display the message history of <seed_system> to the terminal.
+
+    :param seed_system: a dictionary representing the currently active seedOS system
+    :param offset: (default 0) an integer greater than or equal to 0,
+                   representing the message offset from the latest to start displaying from
+    :precondition: seed_system must be a dictionary with the key-value pair,
+                   "message_history": <list of strings or styled texts>
+    :precondition: offset must be an integer greater than or equal to 0
+    :precondition: string in the history must not have newline characters (\n)
+    :postcondition: display the message history of <seed_system> to the terminal
+    :postcondition: the first message displayed is <offset> from the most recent message
+    :postcondition: messages are displayed bottom to top
+    :postcondition: nothing is drawn if the same messages are already displayed
+    """
+    show_message_history_text(get_message_history_text(seed_system, offset))
+
+
+def show_message_history_text(text):
+    """
+    Show <text> in the console output, scrolling it in scroll mode when <text> is the shown text moved up.
+
+    :param text: a string or styled text representing the message history text from get_message_history_text()
+    :precondition: text must be a string or styled text with one line per console output row
+    :postcondition: display <text> in the console output
+    :postcondition: nothing is drawn if <text> is already displayed
+    """
+    history = _console_widgets["history"]
+    if _console_state["scroll_mode"] and scroll_text_widget(history, text):
+        return
+    set_widget_content(history, text)
+    draw_widgets(history)
+
+
+def skip_on_key_press(game_data):
+    """
+    Return a function that reports whether the user pressed a key to skip an animation.
+
+    :param game_data: a dictionary representing the data needed to run the game
+    :precondition: game_data must be a well-formed dictionary of game data that has "key_input"
+    :postcondition: get a function that reads the waiting key press and returns True, or returns False if none is waiting
+    :return: a function representing the skip check for play_animation() and send_messages()
+    """
+    def is_skipped():
+        if is_key_waiting(game_data["key_input"]):
+            poll_key_press(game_data["key_input"])
+            return True
+        return False
+
+    return is_skipped
 
 
 def draw_user_prompt():
-    size = get_console_dimensions()["input"]
-    draw_rectangle(
-        column=0, row=get_screen_size()[1] - size[1] + 1, width=size[0], height=size[1] + 1,
-        flush_output=False)
-    draw_text_box(column=1, row=get_screen_size()[1] - 1, width=size[0] - 2, height=1, text="", overwrite=True)
+    """
+    Draw the empty user prompt box at the bottom of the console.
+
+    :postcondition: draw the border of the user prompt and clear the text inside of it
+    """
+    mark_widget_dirty(_console_widgets["prompt"])
+    draw_widgets(_console_widgets["prompt"])
 
 
-def start_prompt_user():
+def start_prompt_user(asynchronous=False):
     """
     Return a function for prompting the user for a command in the SeedOS console.
 
+    :param asynchronous: (default False) a boolean representing whether to return a coroutine function,
+                         which awaits the key click instead of sleeping through it
+    :precondition: asynchronous must be a boolean
     :postcondition: start a new user prompt in the console
-    :return: a function representing the update call for the prompt
+    :return: a function, or a coroutine function if <asynchronous> is True, representing the update call for the prompt
     """
     text_input = start_text_input(
         column=3, row=get_screen_size()[1] - 1, max_width=get_console_dimensions()["input"][0] - 4)
@@ -129,29 +333,46 @@ def start_prompt_user():
     get_effects()["mouse_click"].play(loop=True)
     get_effects()["mouse_click"].pause()
 
-    def update_prompt(key_press, flush=False):
+    def update_text_input(key_press, flush, pasted):
+        """
+        Update the text_input for the prompt after its key click, and draw the empty prompt once it is finished.
+        """
+        get_effects()["mouse_click"].pause()
+        result = text_input(key_press, flush, pasted)
+        if not result is None:
+            get_effects()["mouse_click"].stop()
+            draw_user_prompt()
+        return result
+
+    def update_prompt(key_press, flush=False, pasted=""):
         """
         Update the text_input for the prompt and draws it's border.
 
         :param key_press: a string representing the key code of the pressed key input
         :param flush: (default False) a boolean representing to flush the changes to output right away
+        :param pasted: (default "") a string representing the text of a "paste" key press
         :precondition: key_press must be a valid key code string
         :precondition: flush must be a boolean
+        :precondition: pasted must be a string
         :postcondition: update the text input prompt for the user
+        :postcondition: a paste clicks and redraws once, however long it is
         :postcondition: the text_input will return a string of the user input or None
         :return: a string representing the result of the text input from the user,
                  or None if the input is unfinished
         """
         get_effects()["mouse_click"].resume()
         sleep(0.05)
-        get_effects()["mouse_click"].pause()
-        result = text_input(key_press, flush)
-        if not result is None:
-            get_effects()["mouse_click"].stop()
-            draw_user_prompt()
-        return result
+        return update_text_input(key_press, flush, pasted)
+
+    async def update_prompt_async(key_press, flush=False, pasted=""):
+        """
+        Update the prompt like update_prompt(), letting other tasks run during the key click.
+        """
+        get_effects()["mouse_click"].resume()
+        await asyncio.sleep(0.05)
+        return update_text_input(key_press, flush, pasted)
 
-    return update_prompt
+    return update_prompt_async if asynchronous else update_prompt
 
 
 def do_validated_prompt(game_data: dict, is_valid: Callable | None) -> str:
@@ -170,7 +391,8 @@ def do_validated_prompt(game_data: dict, is_valid: Callable | None) -> str:
     prompt_user = start_prompt_user()
     prompt_user("escape", flush=True)
     while True:
-        output = prompt_user(poll_key_press(game_data["key_input"]), flush=True)
+        event = poll_key_event(game_data["key_input"])
+        output = prompt_user(event["key"], flush=True, pasted=event.get("text", ""))
         if output is None:
             continue
         if is_valid is None or is_valid(output):
@@ -181,6 +403,38 @@ def do_validated_prompt(game_data: dict, is_valid: Callable | None) -> str:
     return output
 
 
+async def do_validated_prompt_async(game_data, is_valid, typing=None):
+    """
+    Run a validated user prompt in the console, awaiting key presses so other tasks keep running.
+
+    :param game_data: a dictionary representing the data needed to run the game
+    :param is_valid: a callable function representing the acceptance condition,
+           or None if all results are accepted
+    :param typing: (default None) an asyncio.Task running send_messages_async() to keep typing while the
+                   user types, or None
+    :precondition: game_data must be a well-formed dictionary of game data that has "key_input"
+    :precondition: is_valid must be a callable function that returns a boolean or Truthy/Falsy value,
+                   or None
+    :precondition: typing must be an asyncio.Task or None
+    :precondition: must be awaited inside a running asyncio event loop
+    :postcondition: the messages of <typing> are finished with finish_messages() once the user enters a result
+    :postcondition: get the result of the user prompt
+    :return: a string representing the result of the prompt
+    """
+    prompt_user = start_prompt_user(asynchronous=True)
+    await prompt_user("escape", flush=True)
+    while True:
+        event = await poll_key_event_async(game_data["key_input"])
+        output = await prompt_user(event["key"], flush=True, pasted=event.get("text", ""))
+        if output is None:
+            continue
+        await finish_messages(typing)
+        if is_valid is None or is_valid(output):
+            return output
+        send_message(game_data["seed_system"], "Invalid Input")
+        prompt_user = start_prompt_user(asynchronous=True)
+
+
 def do_menu_prompt(game_data: dict, *options: str, style_name="prompt") -> str:
     """
     Run a menu.
@@ -213,9 +467,12 @@ def do_menu_prompt(game_data: dict, *options: str, style_name="prompt") -> str:
     menu = create_menu(*position, *options)
     menu["draw_menu"]()
     while True:
-        result = menu["update_menu"](poll_key_press(game_data["key_input"]))
+        event = poll_key_repeat(game_data["key_input"], ("up", "down"))
+        result = menu["update_menu"](event["key"], event["count"])
         if not result is None:
             if style_name == "prompt":
+                # The menu was drawn over the message history, so it cannot just be scrolled away
+                mark_widget_dirty(_console_widgets["history"])
                 send_message(game_data["seed_system"], result)
             return result
 
@@ -249,11 +506,11 @@ def main():
     key_input = init_key_input()
     update_console_prompt = start_prompt_user()
     while True:
-        inputted = poll_key_press(key_input)
-        if inputted == "tab":
+        event = poll_key_event(key_input)
+        if event["key"] == "tab":
             break
-        result = update_console_prompt(inputted)
-        print("", end="", flush=True)
+        result = update_console_prompt(event["key"], pasted=event.get("text", ""))
+        flush_output()
         if result is None:
             continue
         draw_text_box(
@@ -262,6 +519,8 @@ def main():
         if result == "quit":
             break
         update_console_prompt = start_prompt_user()
+    set_scroll_region()
+    flush_output()
 
 
 if __name__ == '__main__':
@@ -3,8 +3,6 @@ Play preset sound effects.
 """
 import random
 
-from audioplayer import AudioPlayer
-
 from game import relative_path
 
 
@@ -41,6 +39,8 @@ def init_effects(path="assets"):
     :raise FileNotFoundError: if effect file doesn't exist
     :return: a dictionary with <sound effect name>: <AudioPlayer object> pairs
     """
+    from audioplayer import AudioPlayer
+
     return {
         effect_name: AudioPlayer(relative_path(f"{path}/{effect_name}.wav"))
         for effect_name in get_effect_names()}
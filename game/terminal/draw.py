@@ -1,9 +1,20 @@
 """
 Drawing and animating to the terminal.
 """
+import asyncio
+from contextlib import contextmanager
+from time import monotonic, sleep
+
 from game.ansi_actions import cursor
-from game.terminal.screen import clear_screen
-from game.utilities import remove_escape_codes, get_escape_codes_indices
+from game.ansi_actions.styled_text import (
+    as_styled_text, get_styled_text_length, pad_styled_text, slice_styled_text, split_styled_text)
+from game.terminal import output
+from game.terminal.frame import (
+    create_frame_buffer, get_active_frame, get_presented_frame, render_frame, render_frame_changes,
+    render_frame_layer, write_to_frame)
+from game.terminal.screen import clear_screen, get_screen_size
+
+_draw_state = {"batch": None}
 
 
 def create_text_area(column, row, width, height, text=""):
@@ -45,6 +56,8 @@ def draw_text_box(
     """
     Draw a text box to the terminal.
 
+    If a frame is being composited with begin_frame(), the text box is written into the frame instead.
+
     A text area dictionary has the form:
     {"column": <int>, "row": <int>, "width": <int>, "height": <int>, text: <str>}
 
@@ -54,17 +67,17 @@ def draw_text_box(
                 representing the 1-based vertical origin of the text area
     :param width: (default None) a positive integer greater than 0 representing the columns of the text area
     :param height: (default None) a positive integer greater than 0 representing the rows of the text area
-    :param text: (default None) a string representing the text to draw in the terminal
+    :param text: (default None) a string or styled text representing the text to draw in the terminal
     :param text_area: (default None) a dictionary representing a text area's data
     :param overwrite: (default False) a boolean representing whether to replace all existing text within the text area
-    :param flush_output: (default True) a boolean representing whether to flush the output to stdout
+    :param flush_output: (default True) a boolean representing whether to flush the buffered output to the terminal
     :precondition: column must be a positive integer greater than 0 within the bounds of the terminal
     :precondition: row must be a positive integer greater than 0 within the bounds of the terminal
     :precondition: width must be a positive integer greater than 0,
                    and small enough to avoid causing the text area to exceed the bounds of the terminal
     :precondition: height must be a positive integer greater than 0,
                    and small enough to avoid causing the text area to exceed the bounds of the terminal
-    :precondition: text must be a string with "\n" to indicate a new row
+    :precondition: text must be a string or styled text with "\n" to indicate a new row
     :precondition: the number of newlines in <text> must be less than <height>
     :precondition: text_area must be a dictionary holding valid text area data
     :precondition: overwrite must be a boolean
@@ -74,38 +87,53 @@ def draw_text_box(
     :postcondition: draw a text box to the terminal based on the <text_area> or the preceding parameters
     :postcondition: existing text within the bounds of the text area will be overwritten with a space
                     if <overwrite> is True
+    :postcondition: if a draw_batch() is open, the text box is written into the batch instead
 
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> terminal = use_virtual_terminal(20, 3)
     >>> my_text_area = create_text_area(1, 1, 20, 1, "Hello, World")
-    >>> draw_text_box(text_area=my_text_area)
-    \\x1b[1;1HHello, World
-    >>> # Do same but without predefined text area
-    >>> draw_text_box(1, 1, 20, 1, "Hello, World")
-    \\x1b[1;1HHello, World
-    >>> draw_text_box(1, 2, 20, 2, "Hello, World", overwrite=True)
-    \\x1b[2;1HHello, World        \\x1b[3;1
+    >>> _ = draw_text_box(text_area=my_text_area)
+    >>> get_virtual_screen_rows(terminal)
+    ['Hello, World', '', '']
+    >>> # Do same but without predefined text area, clipped to the width
+    >>> _ = draw_text_box(1, 2, 5, 1, "Hello, World")
+    >>> get_virtual_screen_rows(terminal)
+    ['Hello, World', 'Hello', '']
+    >>> _ = draw_text_box(1, 1, 20, 2, "Bye", overwrite=True)
+    >>> get_virtual_screen_rows(terminal)
+    ['Bye', '', '']
+    >>> stop_virtual_terminal()
     """
     if not text_area:
         text_area = create_text_area(column, row, width, height, text)
-    text_rows = text_area["text"].split("\n")
-    clip_row_text = lambda row_text: remove_escape_codes(row_text)[:min(len(row_text), text_area["width"])]
-    text_ansi = tuple(map(get_escape_codes_indices, text_rows))
-    text_rows = tuple(map(clip_row_text, text_rows))
+    text_rows = split_styled_text(as_styled_text(text_area["text"]))
+    active_frame = get_active_frame()
+    batch = None if active_frame else get_draw_batch()
+    # Draws outside of a frame are mirrored into the presented frame so the next frame can still be diffed
+    for target_frame in (active_frame or get_presented_frame(), batch):
+        if not target_frame:
+            continue
+        for row_index in range(text_area["height"]):
+            if row_index == len(text_rows) and not overwrite:
+                break
+            write_to_frame(
+                target_frame, text_area["column"], text_area["row"] + row_index,
+                text_rows[row_index] if row_index < len(text_rows) else (),
+                width=text_area["width"], pad=overwrite)
+    if active_frame or batch:
+        return text_area
     for row_index in range(text_area["height"]):
         if row_index == len(text_rows) and not overwrite:
             break
-        to_draw = ""
-        cursor.cursor_set(text_area["column"], text_area["row"] + row_index)
+        to_draw = ()
+        cursor.cursor_move_to(text_area["column"], text_area["row"] + row_index)
         if row_index < len(text_rows):
-            ansi_insert = text_rows[row_index]
-            # print(text_ansi, end="")
-            for ansi_code in reversed(text_ansi[row_index]):
-                if ansi_code[0] <= len(text_rows[row_index]):
-                    ansi_insert = ansi_insert[:ansi_code[0]] + ansi_code[1] + ansi_insert[ansi_code[0]:]
-            to_draw = ansi_insert
+            to_draw = slice_styled_text(text_rows[row_index], 0, text_area["width"])
         if overwrite:
-            to_draw = to_draw.ljust(text_area["width"])
-        print(to_draw, end="")
-    print("", end="", flush=flush_output)
+            to_draw = pad_styled_text(to_draw, text_area["width"])
+        cursor.cursor_write(to_draw)
+    if flush_output:
+        output.flush_output()
     return text_area
 
 
@@ -120,7 +148,7 @@ def draw_rectangle(
     :param width: a positive integer greater than 1 representing the columns of the text area
     :param height: a positive integer greater than 1 representing the rows of the text area
     :param text_area: (default None) a dictionary representing a text area's data
-    :param flush_output: (default True) a boolean representing whether to flush the output to stdout
+    :param flush_output: (default True) a boolean representing whether to flush the buffered output to the terminal
     :precondition: column must be a positive integer greater than 0 within the bounds of the terminal
     :precondition: row must be a positive integer greater than 0 within the bounds of the terminal
     :precondition: width must be a positive integer greater than 0,
@@ -133,10 +161,15 @@ def draw_rectangle(
                    or parameter, text_area must be given
     :postcondition: draw a text box to the terminal based on the <text_area> or the preceding parameters
 
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> terminal = use_virtual_terminal(4, 3)
     >>> draw_rectangle(1, 1, 2, 2)
-    \\x1b[1;1H..\\x1b[2;1H..
+    >>> get_virtual_screen_rows(terminal)
+    ['..', '`´', '']
     >>> draw_rectangle(1, 1, 3, 3)
-    \\x1b[1;1H._.\\x1b[2;1H| |\\x1b[3;1H` ´
+    >>> get_virtual_screen_rows(terminal)
+    ['.-.', '| |', '`-´']
+    >>> stop_virtual_terminal()
     """
     if not text_area:
         text_area = create_text_area(column, row, width, height)
@@ -149,8 +182,268 @@ def draw_rectangle(
     draw_text_box(text_area=text_area, flush_output=flush_output)
 
 
-def play_animation(frames, frames_per_second, loop=False):
-    pass
+def get_draw_batch():
+    """
+    Return the layer that draw calls are being collected into by draw_batch().
+
+    :postcondition: get the open draw batch
+    :return: a dictionary representing the frame buffer layer of the open batch, or None if no batch is open
+    """
+    return _draw_state["batch"]
+
+
+@contextmanager
+def draw_batch():
+    """
+    Collect the text boxes, rectangles, and boards drawn inside the with block and draw them with one flush.
+
+    Overlapping draws are merged, so every cell is sent to the terminal once with the last thing drawn there.
+    Batches can be nested, the outermost one writes everything when it closes.
+    Inside of a frame started with begin_frame() the frame already collects the draws, so nothing is batched.
+
+    :precondition: only drawing functions of the game.terminal package are batched,
+                   other output is written before the batch
+    :postcondition: draws inside the with block are not written to the terminal until the block ends
+    :postcondition: write every collected cell with the shortest cursor moves and flush the output once,
+                    or write nothing if nothing was drawn
+    :return: a context manager that yields the layer being drawn into, or None if no batch was started
+
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> terminal = use_virtual_terminal(8, 3)
+    >>> with draw_batch():
+    ...     draw_rectangle(1, 1, 8, 3)
+    ...     _ = draw_text_box(2, 2, 6, 1, "Batch", overwrite=True)
+    ...     get_virtual_screen_rows(terminal)
+    ['', '', '']
+    >>> get_virtual_screen_rows(terminal)
+    ['.------.', '|Batch |', '`------´']
+    >>> stop_virtual_terminal()
+    """
+    if get_active_frame() or _draw_state["batch"]:
+        yield None
+        return
+    screen_width, screen_height = get_screen_size() or (80, 24)
+    _draw_state["batch"] = create_frame_buffer(screen_width, screen_height, blank=None)
+    try:
+        yield _draw_state["batch"]
+    finally:
+        batch_output = render_frame_layer(_draw_state["batch"])
+        _draw_state["batch"] = None
+        if batch_output:
+            output.write_output(batch_output)
+            output.flush_output()
+
+
+def load_animation_frames(frames, width, height):
+    """
+    Return <frames> written ahead of time into frame buffers of <width> by <height> cells.
+
+    :param frames: an iterable of strings or styled texts representing the animation frames, with "\n" between rows
+    :param width: a positive integer greater than 0 representing the columns of each frame
+    :param height: a positive integer greater than 0 representing the rows of each frame
+    :precondition: frames must be an iterable of strings or styled texts
+    :precondition: width and height must be positive integers greater than 0
+    :postcondition: get one frame buffer per frame, clipped to <width> by <height>
+    :return: a tuple of dictionaries representing the frame buffers of the animation
+
+    >>> loaded = load_animation_frames(["ab\\ncd", "e"], 2, 2)
+    >>> [["".join(glyph for glyph, _ in cells) for cells in frame["cells"]] for frame in loaded]
+    [['ab', 'cd'], ['e ', '  ']]
+    """
+    loaded = []
+    for frame_text in frames:
+        frame = create_frame_buffer(width, height)
+        for row_index, line in enumerate(split_styled_text(as_styled_text(frame_text))[:height], 1):
+            write_to_frame(frame, 1, row_index, line)
+        loaded.append(frame)
+    return tuple(loaded)
+
+
+def play_animation(
+        frames, frames_per_second, loop=False,
+        text_area=None, should_cancel=None, clock=monotonic, wait=sleep, draw_frame=None):
+    """
+    Play <frames> in the terminal at a fixed <frames_per_second>.
+
+    Frames are loaded into frame buffers before the first one is drawn, and each frame is sent
+    with a single write of only the cells that changed. Frames whose time has already passed
+    when the terminal falls behind are skipped, so the animation always ends on time.
+
+    :param frames: an iterable of strings or styled texts representing the animation frames, with "\n" between rows
+    :param frames_per_second: a positive number representing how many frames to show each second
+    :param loop: (default False) a boolean representing whether to start over after the last frame
+    :param text_area: (default None) a dictionary representing the text area to play the animation in,
+                      or None to play it at (1, 1) with the size of the largest frame
+    :param should_cancel: (default None) a function with no parameters that returns True to stop the animation,
+                          or None to always play it to the end
+    :param clock: (default time.monotonic) a function with no parameters that returns the current time in seconds
+    :param wait: (default time.sleep) a function that waits for the given number of seconds
+    :param draw_frame: (default None) a function that takes the index of a frame and draws it,
+                       or None to draw the frames into <text_area>
+    :precondition: frames must be an iterable of strings or styled texts
+    :precondition: frames_per_second must be a number greater than 0
+    :precondition: loop must be a boolean
+    :precondition: text_area must be a dictionary holding valid text area data or None
+    :precondition: should_cancel must be a function or None, and must eventually return True if <loop> is True
+    :precondition: draw_frame must be a function or None
+    :postcondition: draw each frame that is due to the terminal, each for 1 / <frames_per_second> seconds
+    :postcondition: stop early if <should_cancel> returns True after a frame is drawn
+    :return: True if the animation played to the end, or False if it was cancelled
+
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> terminal = use_virtual_terminal(4, 1)
+    >>> now = [0.0]
+    >>> shown = []
+    >>> def fall_behind(seconds):
+    ...     now[0] += seconds + 0.1
+    >>> play_animation(
+    ...     "1234", 10, should_cancel=lambda: shown.append(get_virtual_screen_rows(terminal)[0]),
+    ...     clock=lambda: now[0], wait=fall_behind)
+    True
+    >>> shown
+    ['1', '3']
+    >>> play_animation(
+    ...     "-|", 10, loop=True, should_cancel=lambda: now[0] > 1,
+    ...     clock=lambda: now[0], wait=fall_behind)
+    False
+    >>> stop_virtual_terminal()
+    """
+    frame_texts = tuple(frames)
+    if not draw_frame and frame_texts:
+        draw_frame = create_frame_drawer(frame_texts, text_area)
+    for frame_index, next_frame_time in schedule_animation(len(frame_texts), frames_per_second, loop, clock):
+        draw_frame(frame_index)
+        if should_cancel and should_cancel():
+            return False
+        wait(max(0.0, next_frame_time - clock()))
+    return True
+
+
+async def play_animation_async(frames, frames_per_second, loop=False, text_area=None, draw_frame=None):
+    """
+    Play <frames> like play_animation(), awaiting between frames so other tasks keep running.
+
+    Cancel the task playing the animation to stop it early.
+
+    :param frames: an iterable of strings or styled texts representing the animation frames, with "\n" between rows
+    :param frames_per_second: a positive number representing how many frames to show each second
+    :param loop: (default False) a boolean representing whether to start over after the last frame
+    :param text_area: (default None) a dictionary representing the text area to play the animation in,
+                      or None to play it at (1, 1) with the size of the largest frame
+    :param draw_frame: (default None) a function that takes the index of a frame and draws it,
+                       or None to draw the frames into <text_area>
+    :precondition: frames must be an iterable of strings or styled texts
+    :precondition: frames_per_second must be a number greater than 0
+    :precondition: loop must be a boolean
+    :precondition: text_area must be a dictionary holding valid text area data or None
+    :precondition: draw_frame must be a function or None
+    :precondition: must be awaited inside a running asyncio event loop
+    :postcondition: draw each frame that is due to the terminal, each for 1 / <frames_per_second> seconds
+    :postcondition: each frame is flushed when it is drawn, since the next await may be a long one
+
+    >>> import asyncio
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> terminal = use_virtual_terminal(4, 1)
+    >>> asyncio.run(play_animation_async(["ab", "cd"], 100))
+    >>> get_virtual_screen_rows(terminal)
+    ['cd']
+    >>> stop_virtual_terminal()
+    """
+    frame_texts = tuple(frames)
+    if not draw_frame and frame_texts:
+        draw_frame = create_frame_drawer(frame_texts, text_area)
+    for frame_index, next_frame_time in schedule_animation(len(frame_texts), frames_per_second, loop, monotonic):
+        draw_frame(frame_index)
+        output.flush_output()
+        await asyncio.sleep(max(0.0, next_frame_time - monotonic()))
+
+
+def schedule_animation(frame_count, frames_per_second, loop, clock):
+    """
+    Yield the index of each frame of an animation that is due, with the time the frame after it is due.
+
+    Frames whose time has already passed when the caller falls behind are skipped.
+
+    :param frame_count: an integer greater than or equal to 0 representing the number of frames
+    :param frames_per_second: a positive number representing how many frames to show each second
+    :param loop: a boolean representing whether to start over after the last frame
+    :param clock: a function with no parameters that returns the current time in seconds
+    :precondition: frame_count must be an integer greater than or equal to 0
+    :precondition: frames_per_second must be a number greater than 0
+    :precondition: loop must be a boolean
+    :precondition: clock must be a function
+    :postcondition: get tuples of the frame index to show and the <clock> time to show the next one at
+    :postcondition: stop once the last frame's time is over, unless <loop> is True
+    :return: a generator of tuples of form (<frame index>, <next frame time>)
+
+    >>> now = [0.0]
+    >>> schedule = schedule_animation(3, 10, False, lambda: now[0])
+    >>> next(schedule)
+    (0, 0.1)
+    >>> now[0] = 0.25
+    >>> next(schedule)
+    (2, 0.30000000000000004)
+    >>> now[0] = 0.35
+    >>> list(schedule)
+    []
+    """
+    if not frame_count:
+        return
+    frame_duration = 1 / frames_per_second
+    start = clock()
+    while True:
+        frame_index = int((clock() - start) / frame_duration)
+        if frame_index >= frame_count and not loop:
+            return
+        yield frame_index % frame_count, start + (frame_index + 1) * frame_duration
+
+
+def create_frame_drawer(frame_texts, text_area=None):
+    """
+    Return a function that draws the frame of <frame_texts> at an index, sending only the cells that changed.
+
+    :param frame_texts: a tuple of strings or styled texts representing the animation frames, with "\n" between rows
+    :param text_area: (default None) a dictionary representing the text area to draw the frames in,
+                      or None to draw them at (1, 1) with the size of the largest frame
+    :precondition: frame_texts must be a non-empty tuple of strings or styled texts
+    :precondition: text_area must be a dictionary holding valid text area data or None
+    :postcondition: get a function that draws a frame with one flush, loading every frame ahead of time
+    :postcondition: each drawn frame is mirrored into the presented frame
+    :return: a function that takes the integer index of a frame and draws it
+    """
+    if not text_area:
+        frame_rows = [split_styled_text(as_styled_text(frame_text)) for frame_text in frame_texts]
+        text_area = create_text_area(
+            1, 1,
+            max(1, max(get_styled_text_length(line) for rows in frame_rows for line in rows)),
+            max(len(rows) for rows in frame_rows))
+    loaded = load_animation_frames(frame_texts, text_area["width"], text_area["height"])
+    shown = None
+
+    def draw_frame(frame_index):
+        """
+        Draw the loaded frame at <frame_index>.
+
+        :param frame_index: an integer representing the index of the frame to draw
+        :precondition: frame_index must be a valid index of the loaded frames
+        :postcondition: draw the cells that differ from the last drawn frame, or every cell for the first frame
+        """
+        nonlocal shown
+        frame = loaded[frame_index]
+        if shown is None:
+            output.write_output(render_frame(frame, text_area["column"], text_area["row"]))
+        else:
+            output.write_output(render_frame_changes(shown, frame, text_area["column"], text_area["row"]))
+        output.flush_output()
+        shown = frame
+        presented = get_presented_frame()
+        if presented:
+            for row_offset, cells in enumerate(frame["cells"]):
+                write_to_frame(
+                    presented, text_area["column"], text_area["row"] + row_offset,
+                    tuple((cell_style, glyph) for glyph, cell_style in cells))
+
+    return draw_frame
 
 
 def main():
@@ -0,0 +1,363 @@
+"""
+In-memory frame buffers for compositing terminal output.
+"""
+from game.ansi_actions.cursor import get_cursor_move
+from game.ansi_actions.styled_text import as_styled_text, get_style_transition, slice_styled_text
+from game.terminal.output import write_output, flush_output
+from game.terminal.screen import get_screen_size, add_screen_listener
+
+_frame_state = {"active": None, "presented": None}
+
+
+def create_frame_buffer(width, height, blank=(" ", "")):
+    """
+    Return a blank frame buffer dictionary of <width> by <height> cells.
+
+    A frame buffer dictionary has the form:
+    {"width": <int>, "height": <int>, "cells": <list of rows of (<glyph>, <style>) tuples>}
+
+    :param width: a positive integer greater than 0 representing the columns of the frame
+    :param height: a positive integer greater than 0 representing the rows of the frame
+    :param blank: (default (" ", "")) a (<glyph>, <style>) tuple representing the starting value of every cell,
+                  or None for a layer whose unwritten cells are left alone when it is rendered
+    :precondition: width must be a positive integer greater than 0
+    :precondition: height must be a positive integer greater than 0
+    :precondition: blank must be a tuple of two strings or None
+    :postcondition: get a frame buffer where every cell is <blank>
+    :return: a dictionary representing a blank frame buffer
+
+    >>> frame = create_frame_buffer(3, 2)
+    >>> frame["width"], frame["height"]
+    (3, 2)
+    >>> frame["cells"]
+    [[(' ', ''), (' ', ''), (' ', '')], [(' ', ''), (' ', ''), (' ', '')]]
+    >>> create_frame_buffer(2, 1, blank=None)["cells"]
+    [[None, None]]
+    """
+    return {
+        "width": width,
+        "height": height,
+        "cells": [[blank for _ in range(width)] for _ in range(height)]}
+
+
+def write_to_frame(frame, column, row, text, width=None, pad=False):
+    """
+    Write one line of <text> into <frame> starting at (<column>, <row>).
+
+    ANSI style codes in <text> are kept with the cells they apply to, other escape codes are dropped.
+
+    :param frame: a dictionary representing the frame buffer to write to
+    :param column: an integer representing the 1-based horizontal origin of the text
+    :param row: an integer representing the 1-based vertical origin of the text
+    :param text: a string or styled text representing the text to write, without newlines
+    :param width: (default None) a positive integer representing the most cells to write,
+                  or None to write until the edge of <frame>
+    :param pad: (default False) a boolean representing whether to fill the rest of <width> with spaces
+    :precondition: frame must be a well-formed frame buffer dictionary
+    :precondition: column and row must be integers
+    :precondition: text must be a string or styled text without newlines
+    :precondition: width must be a positive integer or None
+    :precondition: pad must be a boolean
+    :postcondition: the cells covered by <text> hold its characters and styles
+    :postcondition: cells outside of <frame> are clipped
+
+    >>> frame = create_frame_buffer(4, 1)
+    >>> write_to_frame(frame, 2, 1, "\\033[1mHey\\033[0m!")
+    >>> frame["cells"][0]
+    [(' ', ''), ('H', '\\x1b[1m'), ('e', '\\x1b[1m'), ('y', '\\x1b[1m')]
+    >>> write_to_frame(frame, 1, 1, "ab", width=3, pad=True)
+    >>> "".join(glyph for glyph, _ in frame["cells"][0])
+    'ab y'
+    """
+    if not 0 < row <= frame["height"]:
+        return
+    if width is None:
+        width = frame["width"] - column + 1
+    cells = frame["cells"][row - 1]
+    offset = 0
+    for run_style, run_text in slice_styled_text(as_styled_text(text), 0, max(0, width)):
+        for glyph in run_text:
+            if 0 < column + offset <= frame["width"]:
+                cells[column + offset - 1] = (glyph, run_style)
+            offset += 1
+    if pad:
+        for pad_offset in range(offset, width):
+            if 0 < column + pad_offset <= frame["width"]:
+                cells[column + pad_offset - 1] = (" ", "")
+
+
+def scroll_frame(frame, top, bottom, lines):
+    """
+    Move the rows of <frame> from <top> to <bottom> up by <lines>, like a terminal scroll region.
+
+    :param frame: a dictionary representing the frame buffer to scroll
+    :param top: a positive integer representing the 1-based first row that scrolls
+    :param bottom: a positive integer representing the 1-based last row that scrolls
+    :param lines: a positive integer representing how many rows to scroll by
+    :precondition: frame must be a well-formed frame buffer dictionary
+    :precondition: top and bottom must be positive integers with <top> less than <bottom>
+    :precondition: lines must be a positive integer
+    :postcondition: rows scrolled past <top> are dropped and blank rows come in at <bottom>
+    :postcondition: rows outside of the region and outside of <frame> are left alone
+
+    >>> frame = create_frame_buffer(1, 4)
+    >>> for row_number in range(1, 5):
+    ...     write_to_frame(frame, 1, row_number, str(row_number))
+    >>> scroll_frame(frame, 2, 3, 1)
+    >>> [cells[0][0] for cells in frame["cells"]]
+    ['1', '3', ' ', '4']
+    """
+    bottom = min(bottom, frame["height"])
+    for _ in range(min(lines, bottom - top + 1)):
+        del frame["cells"][top - 1]
+        frame["cells"].insert(bottom - 1, [(" ", "") for _ in range(frame["width"])])
+
+
+def render_frame(frame, column=1, row=1):
+    """
+    Return the escape code string that draws every cell of <frame> to the terminal.
+
+    :param frame: a dictionary representing the frame buffer to render
+    :param column: (default 1) a positive integer representing the 1-based terminal column of the frame's left edge
+    :param row: (default 1) a positive integer representing the 1-based terminal row of the frame's top edge
+    :precondition: frame must be a well-formed frame buffer dictionary
+    :precondition: column and row must be positive integers greater than 0
+    :postcondition: get a string that positions the cursor at each row and draws its styled cells
+    :return: a string representing the full terminal output for <frame>
+
+    >>> frame = create_frame_buffer(3, 2)
+    >>> write_to_frame(frame, 1, 2, "\\033[31mok\\033[0m")
+    >>> render_frame(frame)
+    '\\x1b[H   \\x1b[2H\\x1b[31mok\\x1b[0m '
+    >>> render_frame(frame, 4, 3)
+    '\\x1b[3;4H   \\x1b[4;4H\\x1b[31mok\\x1b[0m '
+    """
+    output = []
+    for row_index, cells in enumerate(frame["cells"], row):
+        # Each row ends at the frame's right edge, where the terminal may hold the cursor in a pending wrap
+        output.append(get_cursor_move(None, column, row_index))
+        current_style = ""
+        for glyph, cell_style in cells:
+            output.append(get_style_transition(current_style, cell_style))
+            current_style = cell_style
+            output.append(glyph)
+        output.append(get_style_transition(current_style, ""))
+    return "".join(output)
+
+
+def render_frame_changes(previous, frame, column=1, row=1):
+    """
+    Return the escape code string that redraws only the cells of <frame> that differ from <previous>.
+
+    :param previous: a dictionary representing the frame buffer currently on the terminal
+    :param frame: a dictionary representing the frame buffer to draw
+    :param column: (default 1) a positive integer representing the 1-based terminal column of the frame's left edge
+    :param row: (default 1) a positive integer representing the 1-based terminal row of the frame's top edge
+    :precondition: previous and frame must be well-formed frame buffer dictionaries of the same size
+    :precondition: column and row must be positive integers greater than 0
+    :postcondition: get a string that moves the cursor to each run of changed cells with the shortest moves
+    :postcondition: draw the changed cells
+    :postcondition: unchanged cells are not part of the string
+    :return: a string representing the terminal output that turns <previous> into <frame>
+
+    >>> old_frame = create_frame_buffer(5, 2)
+    >>> write_to_frame(old_frame, 1, 1, "P....")
+    >>> new_frame = create_frame_buffer(5, 2)
+    >>> write_to_frame(new_frame, 1, 1, ".P...")
+    >>> render_frame_changes(old_frame, new_frame)
+    '\\x1b[H.P'
+    >>> next_frame = create_frame_buffer(5, 2)
+    >>> write_to_frame(next_frame, 1, 1, ".P.P.")
+    >>> render_frame_changes(old_frame, next_frame)
+    '\\x1b[H.P\\x1b[CP'
+    >>> render_frame_changes(new_frame, new_frame)
+    ''
+    >>> render_frame_changes(old_frame, new_frame, 3, 2)
+    '\\x1b[2;3H.P'
+    """
+    changed_cells = (
+        (column_index, row_index, cell)
+        for row_index, (old_cells, cells) in enumerate(zip(previous["cells"], frame["cells"]), row)
+        if old_cells != cells
+        for column_index, (old_cell, cell) in enumerate(zip(old_cells, cells), column)
+        if old_cell != cell)
+    return render_cells(changed_cells, column + frame["width"] - 1)
+
+
+def render_frame_layer(layer, column=1, row=1):
+    """
+    Return the escape code string that draws only the written cells of <layer>.
+
+    :param layer: a dictionary representing a frame buffer created with blank=None
+    :param column: (default 1) a positive integer representing the 1-based terminal column of the layer's left edge
+    :param row: (default 1) a positive integer representing the 1-based terminal row of the layer's top edge
+    :precondition: layer must be a well-formed frame buffer dictionary whose cells are None where nothing was written
+    :precondition: column and row must be positive integers greater than 0
+    :postcondition: get a string that draws every written cell once, with the shortest cursor moves between them
+    :return: a string representing the terminal output for <layer>
+
+    >>> layer = create_frame_buffer(6, 2, blank=None)
+    >>> write_to_frame(layer, 1, 1, "abc")
+    >>> write_to_frame(layer, 2, 1, "XY")
+    >>> write_to_frame(layer, 6, 2, "z")
+    >>> render_frame_layer(layer)
+    '\\x1b[HaXY\\x1b[2;6Hz'
+    """
+    written_cells = (
+        (column_index, row_index, cell)
+        for row_index, cells in enumerate(layer["cells"], row)
+        for column_index, cell in enumerate(cells, column)
+        if cell is not None)
+    return render_cells(written_cells, column + layer["width"] - 1)
+
+
+def render_cells(cells, right_edge):
+    """
+    Return the escape code string that draws each of <cells> at its position.
+
+    :param cells: an iterable of (<column>, <row>, (<glyph>, <style>)) tuples in row by row order,
+                  representing the cells to draw
+    :param right_edge: a positive integer representing the last terminal column cells can be drawn in
+    :precondition: cells must be an iterable of tuples of two positive integers and a cell tuple
+    :precondition: right_edge must be a positive integer greater than 0
+    :postcondition: get a string that moves the cursor to each run of cells with the shortest moves
+    :postcondition: style changes are only sent where neighbouring cells differ in style
+    :return: a string representing the terminal output that draws <cells>
+
+    >>> render_cells([(2, 1, ("a", "")), (3, 1, ("b", "\\033[1m"))], 10)
+    '\\x1b[1;2Ha\\x1b[1mb\\x1b[0m'
+    """
+    output = []
+    current_style = ""
+    position = None
+    for column_index, row_index, (glyph, cell_style) in cells:
+        output.append(get_cursor_move(position, column_index, row_index))
+        # The terminal may hold the cursor in a pending wrap at the right edge, so its position is unknown
+        position = (column_index + 1, row_index) if column_index < right_edge else None
+        output.append(get_style_transition(current_style, cell_style))
+        current_style = cell_style
+        output.append(glyph)
+    output.append(get_style_transition(current_style, ""))
+    return "".join(output)
+
+
+def begin_frame(width=None, height=None):
+    """
+    Start compositing a new frame that draw calls will write into.
+
+    :param width: (default None) a positive integer representing the columns of the frame,
+                  or None to use the terminal width
+    :param height: (default None) a positive integer representing the rows of the frame,
+                   or None to use the terminal height
+    :precondition: width and height must be positive integers or None
+    :postcondition: a blank frame buffer becomes the active frame
+    :return: a dictionary representing the new active frame buffer
+
+    >>> frame = begin_frame(2, 2)
+    >>> get_active_frame() is frame
+    True
+    >>> _frame_state["active"] = None
+    """
+    if width is None or height is None:
+        screen_width, screen_height = get_screen_size() or (80, 24)
+        width, height = width or screen_width, height or screen_height
+    _frame_state["active"] = create_frame_buffer(width, height)
+    return _frame_state["active"]
+
+
+def get_active_frame():
+    """
+    Return the frame buffer currently being composited.
+
+    :postcondition: get the active frame buffer
+    :return: a dictionary representing the active frame buffer, or None if no frame is active
+    """
+    return _frame_state["active"]
+
+
+def get_presented_frame():
+    """
+    Return the frame buffer that mirrors what is currently on the terminal.
+
+    :postcondition: get the last presented frame buffer, kept up to date by draws outside of frames
+    :return: a dictionary representing the presented frame buffer, or None if the terminal contents are unknown
+    """
+    return _frame_state["presented"]
+
+
+def forget_presented_frame():
+    """
+    Mark the terminal contents as unknown so the next frame is drawn in full.
+
+    :postcondition: the next call to present() redraws every cell
+    """
+    _frame_state["presented"] = None
+
+
+def handle_screen_event(event_name):
+    """
+    Keep the presented frame in sync with screen wide changes.
+
+    :param event_name: a string representing the screen event that happened
+    :precondition: event_name must be a string
+    :postcondition: the presented frame is blanked if the screen was cleared
+    :postcondition: the presented frame is forgotten for any other event
+
+    >>> _frame_state["presented"] = create_frame_buffer(2, 1)
+    >>> write_to_frame(_frame_state["presented"], 1, 1, "ab")
+    >>> handle_screen_event("clear")
+    >>> _frame_state["presented"]["cells"]
+    [[(' ', ''), (' ', '')]]
+    >>> handle_screen_event("resize")
+    >>> get_presented_frame() is None
+    True
+    """
+    presented = _frame_state["presented"]
+    if event_name == "clear" and presented is not None:
+        _frame_state["presented"] = create_frame_buffer(presented["width"], presented["height"])
+    else:
+        forget_presented_frame()
+
+
+def present(diff=True):
+    """
+    Send the active frame to the terminal with a single write.
+
+    When <diff> is True and the terminal contents are known, only the changed cells are sent.
+
+    :param diff: (default True) a boolean representing whether to send only the cells that changed
+    :precondition: a frame must have been started with begin_frame()
+    :precondition: diff must be a boolean
+    :postcondition: draw the active frame to the terminal and flush the output
+    :postcondition: the active frame becomes the presented frame
+    :postcondition: no frame is active afterward
+    """
+    frame = _frame_state["active"]
+    _frame_state["active"] = None
+    if frame is None:
+        return
+    previous = _frame_state["presented"]
+    if diff and previous and (previous["width"], previous["height"]) == (frame["width"], frame["height"]):
+        output = render_frame_changes(previous, frame)
+    else:
+        output = render_frame(frame)
+    _frame_state["presented"] = frame
+    write_output(output)
+    flush_output()
+
+
+add_screen_listener(handle_screen_event)
+
+
+def main():
+    """
+    Drive the program.
+    """
+    frame = begin_frame()
+    write_to_frame(frame, 3, 2, "\033[32mHello\033[0m, frame")
+    present()
+    input()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,154 +1,760 @@
 """
-OS dependent inputs with getch and msvcrt.
+OS dependent inputs with termios and msvcrt.
 """
+import asyncio
+import json
 import os
+import select
+import sys
+import threading
+from codecs import getincrementaldecoder
+from collections import deque
 from collections.abc import Callable
-from string import printable
+from contextlib import contextmanager
+from string import printable, whitespace
+from time import monotonic, sleep
 from game.ansi_actions import cursor
 from game.ansi_actions.style import style
+from game.ansi_actions.styled_text import as_styled_text
 from game.sound import effects
 from game.terminal.screen import get_screen_size, clear_screen
-from game.terminal.draw import draw_text_box, create_text_area
+from game.terminal.draw import draw_text_box
+from game.terminal.latency import discard_input_times, mark_input_time
+from game.terminal.line_editor import (
+    create_gap_buffer, delete_from_gap_buffer, find_next_word_end, find_previous_word_start, get_gap_buffer_character,
+    get_gap_buffer_length, get_gap_buffer_text, insert_into_gap_buffer, move_gap)
+from game.terminal.output import write_output, flush_output
 
 
 def get_key_codes(system=os.name):
     """
-    Get dictionary of key code names and their corresponding key code for the operating system.
+    Get dictionary of key codes and their corresponding key names for the operating system.
 
     Supported systems are "nt" for Windows and "posix" for Unix based systems.
+    Key codes are the whole sequence of characters a key press produces, such as "\\033[A" for the up arrow.
 
     :param system: a string representing the name of operating system to get the key codes for
     :precondition: system must be a string
-    :postcondition: get a dictionary of key code names and their OS dependent key codes,
+    :postcondition: get a dictionary of OS dependent key codes and their key names,
                     or None if <system> is unsupported or invalid
     :postcondition: print error message if <system> is invalid or unsupported
-    :return: a dictionary of key code names and their OS dependent key codes,
+    :return: a dictionary of OS dependent key codes and their key names,
              or None if <system> is unsupported or invalid
 
-    >>> get_key_codes("posix") == {
-    ...     "enter": "\\n",
-    ...     "backspace": "\\x7f",
-    ...     "tab": "\\t",
-    ...     "escape": "\\x1b",
-    ...     "up": "A",
-    ...     "left": "D",
-    ...     "right": "C",
-    ...     "down": "B"}
-    True
-    >>> get_key_codes("nt") == {
-    ...     "enter": "\\r",
-    ...     "backspace": "\\x08",
-    ...     "tab": "\\t",
-    ...     "escape": "\\x1b",
-    ...     "extend": "\\xe0",
-    ...     "up": "H",
-    ...     "left": "K",
-    ...     "right": "M",
-    ...     "down": "P"}
-    True
+    >>> posix_codes = get_key_codes("posix")
+    >>> posix_codes["\\n"], posix_codes["\\r"], posix_codes["\\x1b"], posix_codes["\\x1b[A"], posix_codes["\\x1bOD"]
+    ('enter', 'enter', 'escape', 'up', 'left')
+    >>> posix_codes["\\x1b[5~"], posix_codes["\\x1b[1;5C"], posix_codes["\\x1bOP"], posix_codes["\\x1b[24~"]
+    ('page_up', 'ctrl_right', 'f1', 'f12')
+    >>> posix_codes["\\x1b[200~"]
+    'paste_start'
+    >>> nt_codes = get_key_codes("nt")
+    >>> nt_codes["\\r"], nt_codes["\\xe0H"], nt_codes["\\x00;"], nt_codes["\\xe0t"]
+    ('enter', 'up', 'f1', 'ctrl_right')
     """
     if system == "posix":
-        return {
-            "enter": "\n",
-            "backspace": "\x7f",
-            "tab": "\t",
-            # Require 1-2 extra getch() calls to confirm
-            "escape": "\x1b",
-            # Notice that these are the same as the ANSI escape sequences
-            "up": "escapeA",
-            "left": "escapeD",
-            "right": "escapeC",
-            "down": "escapeB"
-        }
+        # Python 3.12's tty.setcbreak() turns off ICRNL, so Enter arrives as "\r" instead of "\n"
+        key_codes = {"\n": "enter", "\r": "enter", "\x7f": "backspace", "\t": "tab", "\x1b": "escape"}
+        cursor_keys = {"A": "up", "B": "down", "C": "right", "D": "left", "H": "home", "F": "end"}
+        for letter, key_name in cursor_keys.items():
+            # Terminals send either CSI or SS3 sequences depending on their cursor key mode
+            key_codes[f"\033[{letter}"] = key_name
+            key_codes[f"\033O{letter}"] = key_name
+            for modifier, modifier_name in ((2, "shift"), (3, "alt"), (5, "ctrl")):
+                key_codes[f"\033[1;{modifier}{letter}"] = f"{modifier_name}_{key_name}"
+        for letter, key_name in zip("PQRS", ("f1", "f2", "f3", "f4")):
+            key_codes[f"\033O{letter}"] = key_name
+        tilde_keys = {
+            1: "home", 2: "insert", 3: "delete", 4: "end", 5: "page_up", 6: "page_down", 7: "home", 8: "end",
+            11: "f1", 12: "f2", 13: "f3", 14: "f4", 15: "f5", 17: "f6", 18: "f7", 19: "f8", 20: "f9", 21: "f10",
+            23: "f11", 24: "f12", 200: "paste_start", 201: "paste_end"}
+        for number, key_name in tilde_keys.items():
+            key_codes[f"\033[{number}~"] = key_name
+        return key_codes
     elif system == "nt":
-        return {
-            "enter": "\r",
-            "backspace": "\x08",
-            "escape": "\x1b",
-            "tab": "\t",
-            # Require 1 extra getch() call after yielding \xe0
-            "extend": "\xe0",
-            # H: \x48, K: \x4B, M: \x4D, P: \x50
-            "up": "extendH",
-            "left": "extendK",
-            "right": "extendM",
-            "down": "extendP"
-        }
+        key_codes = {"\r": "enter", "\x08": "backspace", "\t": "tab", "\x1b": "escape"}
+        extended_keys = {
+            "H": "up", "P": "down", "K": "left", "M": "right", "G": "home", "O": "end",
+            "I": "page_up", "Q": "page_down", "R": "insert", "S": "delete",
+            "\x8d": "ctrl_up", "\x91": "ctrl_down", "s": "ctrl_left", "t": "ctrl_right",
+            "\x85": "f11", "\x86": "f12"}
+        # Special keys are sent as "\xe0" or "\x00" followed by a second character
+        for prefix in ("\xe0", "\x00"):
+            for letter, key_name in extended_keys.items():
+                key_codes[prefix + letter] = key_name
+        for number in range(1, 11):
+            key_codes["\x00" + chr(58 + number)] = f"f{number}"
+        return key_codes
     else:
         print("Unsupported operating system")
         return None
 
 
+def build_key_trie(key_codes):
+    """
+    Return a prefix trie of <key_codes> for decoding key presses one character at a time.
+
+    Each node of the trie is a dictionary of the next characters and their nodes,
+    where the None key holds the name of the key whose code ends at that node.
+
+    :param key_codes: a dictionary of key codes and their key names from get_key_codes()
+    :precondition: key_codes must be a dictionary of non-empty strings and their string names
+    :postcondition: get a trie holding every key code in <key_codes>
+    :return: a dictionary representing the root of the trie
+
+    >>> build_key_trie({"\\x1b": "escape", "\\x1b[A": "up"})
+    {'\\x1b': {None: 'escape', '[': {'A': {None: 'up'}}}}
+    """
+    key_trie = {}
+    for key_code, key_name in key_codes.items():
+        node = key_trie
+        for character in key_code:
+            node = node.setdefault(character, {})
+        node[None] = key_name
+    return key_trie
+
+
+def decode_key(key_trie, read_character, unread="", timeout=0.05):
+    """
+    Read one key press with <read_character> and return its name.
+
+    The longest key code in <key_trie> that the read characters start with is the key press.
+    After the first character, <read_character> only waits <timeout> seconds for each next one,
+    so a lone Escape press resolves as soon as no sequence follows it.
+    Control sequences that are not in <key_trie> are read to their end and returned whole.
+
+    :param key_trie: a dictionary representing the root of a trie from build_key_trie()
+    :param read_character: a function that takes a timeout in seconds, or None to block,
+                           and returns the next character, or None if the timeout passed
+    :param unread: (default "") a string representing characters already read that belong to the next key presses
+    :param timeout: (default 0.05) a float greater than 0 representing the most seconds to wait between
+                    the characters of one key code
+    :precondition: key_trie must be a well-formed key trie dictionary
+    :precondition: read_character must be a function
+    :precondition: unread must be a string
+    :precondition: timeout must be a float greater than 0
+    :postcondition: get the name of the key press, or the characters themselves if they are not a key code
+    :postcondition: get the characters read past the key press, to pass back as <unread> for the next key
+    :return: a tuple of form (<key name string>, <unread string>)
+
+    >>> trie = build_key_trie(get_key_codes("posix"))
+    >>> def reader(text):
+    ...     characters = list(text)
+    ...     return lambda timeout: characters.pop(0) if characters else None
+    >>> decode_key(trie, reader("\\x1b[1;5A"))
+    ('ctrl_up', '')
+    >>> decode_key(trie, reader("\\x1b"))
+    ('escape', '')
+    >>> decode_key(trie, reader("\\x1bx"))
+    ('escape', 'x')
+    >>> decode_key(trie, reader("\\x1b[99;2~a"))
+    ('\\x1b[99;2~', '')
+    >>> decode_key(trie, reader(""), unread="hi")
+    ('h', 'i')
+    """
+    def read_next(wait):
+        nonlocal unread
+        if unread:
+            character, unread = unread[0], unread[1:]
+            return character
+        return read_character(wait)
+
+    sequence = read_next(None)
+    node = key_trie.get(sequence, {})
+    match_name, match_length = node.get(None, sequence), 1
+    while len(node) > (None in node):
+        character = read_next(timeout)
+        if character is None:
+            break
+        sequence += character
+        node = node.get(character, {})
+        if None in node:
+            match_name, match_length = node[None], len(sequence)
+    if len(sequence) > max(2, match_length) and sequence.startswith(("\033[", "\033O")):
+        # Unknown control sequences end with a character from "@" to "~", and are never typed text
+        while sequence.startswith("\033[") and not "@" <= sequence[-1] <= "~" and \
+                (character := read_next(timeout)) is not None:
+            sequence += character
+        return sequence, unread
+    return match_name, sequence[match_length:] + unread
+
+
+def read_paste(read_character, unread=""):
+    """
+    Read the text of a bracketed paste with <read_character>, up to the sequence that ends it.
+
+    :param read_character: a function that takes a timeout in seconds, or None to block,
+                           and returns the next character
+    :param unread: (default "") a string representing characters already read that belong to the paste
+    :precondition: read_character must be a function
+    :precondition: unread must be a string
+    :precondition: the "paste_start" key was just read
+    :postcondition: get the pasted text, with its line breaks as "\\n"
+    :postcondition: get the characters read past the end of the paste, to pass back as <unread> for the next key
+    :return: a tuple of form (<pasted text string>, <unread string>)
+
+    >>> characters = list("there\\r\\n!\\x1b[201~")
+    >>> read_paste(lambda timeout: characters.pop(0), unread="hi ")
+    ('hi there\\n!', '')
+    >>> read_paste(lambda timeout: None, unread="a\\x1b[201~b")
+    ('a', 'b')
+    """
+    paste_end = "\033[201~"
+    text = unread
+    if paste_end not in text:
+        characters = [unread]
+        while characters[-1] != "~" or not "".join(characters[-len(paste_end):]).endswith(paste_end):
+            characters.append(read_character(None))
+        text = "".join(characters)
+    text, unread = text.split(paste_end, 1)
+    return text.replace("\r\n", "\n").replace("\r", "\n"), unread
+
+
+def set_bracketed_paste(enabled):
+    """
+    Turn the terminal's bracketed paste mode on or off.
+
+    While it is on, pasted text is wrapped in the "paste_start" and "paste_end" key codes,
+    so it can be read as one paste instead of as typed keys.
+
+    :param enabled: a boolean representing whether to turn bracketed paste mode on
+    :precondition: enabled must be a boolean
+    :postcondition: write the escape sequence that turns bracketed paste mode on or off
+
+    >>> set_bracketed_paste(True); flush_output()
+    \x1b[?2004h
+    """
+    write_output("\033[?2004h" if enabled else "\033[?2004l", keep_style=True)
+
+
+@contextmanager
+def read_mode():
+    """
+    Let single key presses be read without echoing them, while the with block runs.
+
+    :postcondition: on POSIX terminals, turn off line buffering and echo until the block ends, like getch()
+    :postcondition: nothing changes on Windows or when standard input is not a terminal
+    :return: a context manager for reading key presses
+    """
+    if os.name != "posix" or not sys.stdin.isatty():
+        yield
+        return
+    import termios
+    import tty
+    attributes = termios.tcgetattr(sys.stdin)
+    try:
+        tty.setcbreak(sys.stdin, termios.TCSANOW)
+        yield
+    finally:
+        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, attributes)
+
+
+def read_character(timeout=None):
+    """
+    Return the next character typed into the terminal, waiting at most <timeout> seconds for it.
+
+    :param timeout: (default None) a float greater than or equal to 0 representing the most seconds to wait,
+                    or None to wait until a character is typed
+    :precondition: timeout must be a float greater than or equal to 0 or None
+    :precondition: on POSIX, the terminal should be in the mode set by read_mode()
+    :postcondition: get the next typed character, decoding multibyte UTF-8 characters whole
+    :return: a string representing the typed character, or None if <timeout> passed first
+    """
+    if timeout is not None and not is_key_waiting(timeout=timeout):
+        return None
+    if os.name == "nt":
+        from msvcrt import getwch
+        return getwch()
+    decoder = getincrementaldecoder("utf-8")(errors="replace")
+    character = ""
+    while not character:
+        character = decoder.decode(os.read(sys.stdin.fileno(), 1))
+    return character
+
+
 def init_key_input():
     """
     Return a dictionary representing the info needed for "keyboard" input in the terminal
 
     The key input dictionary has the following key-value pairs:
-        "key_codes": <os dependent dictionary of key codes and their names>\n
-        "key_get": <os dependent function for adding the next key press to "input_queue">\n
-        "input_queue": <list backlog of inputs>
-
-    :return: a dictionary representing the info needed for "keyboard" input in the terminal
+        "key_codes": <os dependent dictionary of key codes and their names>\\n
+        "key_trie": <prefix trie of "key_codes" from build_key_trie()>\\n
+        "unread": <string of characters read past the last key press>\\n
+        "pastes": <deque of pasted text strings, one for each "paste" key returned by "key_get">\\n
+        "key_get": <function that blocks until the next key press and returns its name>\\n
+        "input_queue": <deque backlog of inputs>\\n
+        "events": <deque of input event dictionaries read by the input reader thread>\\n
+        "event_ready": <threading.Condition notified when an event is added to "events">\\n
+        "reader": <threading.Thread reading key presses, or None if the reader is not running>\\n
+        "stop_reading": <threading.Event set to stop the reader>\\n
+        "terminal_attributes": <termios attributes to restore when the reader stops, or None>\\n
+        "recording": <dictionary of the input recording started by start_input_recording(), or None>
+
+    :return: a dictionary representing the info needed for "keyboard" input in the terminal,
+             or None if the operating system is unsupported
     """
-    if os.name == "posix":
-        try:
-            from getch import getch
-        except ImportError:
-            print("'getch' module not found: do 'pip install'")
-            return None
-        key_codes = get_key_codes("posix")
-
-        def key_get(input_info):
-            code = getch()
-            if code == input_info["key_codes"]["escape"]:
-                code = getch()
-                if code != input_info["key_codes"]["escape"]:
-                    code = "escape" + getch()
-            for key_name, key_code in input_info["key_codes"].items():
-                if code == key_code:
-                    input_info["input_queue"].append(key_name)
-                    return key_name
-            # Normal characters and undefined actions
-            return code
-
-    elif os.name == "nt":
-        from msvcrt import getwch
-        key_codes = get_key_codes("nt")
-
-        def key_get(input_info):
-            code = getwch()
-            if code == input_info["key_codes"]["extend"]:
-                code = "extend" + getwch()
-            for key_name, key_code in input_info["key_codes"].items():
-                if code == key_code:
-                    input_info["input_queue"].append(key_name)
-                    return key_name
-            # Normal characters and undefined actions
-            return code
-    else:
+    key_codes = get_key_codes()
+    if key_codes is None:
         print("Unsupported operating system: use Windows or Unix system")
         return None
 
+    def key_get(input_info):
+        with read_mode():
+            key_name, input_info["unread"] = decode_key(input_info["key_trie"], read_character, input_info["unread"])
+            if key_name == "paste_start":
+                text, input_info["unread"] = read_paste(read_character, input_info["unread"])
+                input_info["pastes"].append(text)
+                key_name = "paste"
+        return key_name
+
     return {
         "key_codes": key_codes,
+        "key_trie": build_key_trie(key_codes),
+        "unread": "",
+        "pastes": deque(),
         "key_get": key_get,
-        "input_queue": []
+        "input_queue": deque(),
+        "events": deque(),
+        "event_ready": threading.Condition(),
+        "reader": None,
+        "stop_reading": threading.Event(),
+        "terminal_attributes": None,
+        "recording": None
     }
 
 
+def create_input_event(key, time=None, text=None):
+    """
+    Return an input event dictionary for a press of <key>.
+
+    An input event dictionary has the form:
+    {"key": <string name of the key>, "time": <float of the time.monotonic() seconds when it was read>}\\n
+    Events of the "paste" key also have a "text" key holding the pasted text.
+
+    :param key: a string representing the name or character of the pressed key
+    :param time: (default None) a float representing when the key was read, or None for now
+    :param text: (default None) a string representing the pasted text of a "paste" key, or None for other keys
+    :precondition: key must be a string
+    :precondition: time must be a float or None
+    :precondition: text must be a string or None
+    :postcondition: get an input event for <key>
+    :return: a dictionary representing the input event
+
+    >>> create_input_event("enter", 1.5)
+    {'key': 'enter', 'time': 1.5}
+    >>> create_input_event("paste", 2.0, "hello")
+    {'key': 'paste', 'time': 2.0, 'text': 'hello'}
+    """
+    event = {"key": key, "time": monotonic() if time is None else time}
+    if text is not None:
+        event["text"] = text
+    return event
+
+
+def read_input_event(input_info):
+    """
+    Read the next key press with <input_info["key_get"]> and return its input event.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :postcondition: wait for the next key press
+    :postcondition: the text of a "paste" key is taken from <input_info["pastes"]>
+    :return: a dictionary representing the input event
+    """
+    key = input_info["key_get"](input_info)
+    return create_input_event(key, text=input_info["pastes"].popleft() if key == "paste" else None)
+
+
+def read_input_events(input_info):
+    """
+    Read key presses into <input_info["events"]> until the reader is stopped.
+
+    This is the body of the input reader thread started by start_input_reader().
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :postcondition: append an input event for every key press and notify <input_info["event_ready"]>
+    :postcondition: the key press read after the reader is stopped is dropped
+    """
+    while not input_info["stop_reading"].is_set():
+        event = read_input_event(input_info)
+        if input_info["stop_reading"].is_set():
+            return
+        with input_info["event_ready"]:
+            input_info["events"].append(event)
+            input_info["event_ready"].notify_all()
+
+
+def start_input_reader(input_info):
+    """
+    Start reading key presses on a background thread, so the game does not stall while waiting for keys.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :postcondition: key presses are read into <input_info["events"]> by a daemon thread
+    :postcondition: the terminal attributes are saved so stop_input_reader() can restore them,
+                    since the thread may still be waiting on a key press when the game exits
+    :postcondition: bracketed paste mode is turned on, so pastes are read as one "paste" key
+    :postcondition: nothing happens if the reader is already running
+    """
+    if input_info["reader"] is not None:
+        return
+    if os.name == "posix" and sys.stdin.isatty():
+        import termios
+        input_info["terminal_attributes"] = termios.tcgetattr(sys.stdin)
+        set_bracketed_paste(True)
+    input_info["stop_reading"].clear()
+    input_info["reader"] = threading.Thread(
+        target=read_input_events, args=(input_info,), name="input_reader", daemon=True)
+    input_info["reader"].start()
+
+
+def stop_input_reader(input_info):
+    """
+    Stop the background thread started by start_input_reader().
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :postcondition: the reader stops after the key press it is waiting on, which is discarded
+    :postcondition: the terminal attributes saved by start_input_reader() are restored
+    :postcondition: bracketed paste mode is turned off
+    :postcondition: key presses are read on the calling thread again
+    """
+    input_info["stop_reading"].set()
+    input_info["reader"] = None
+    if input_info["terminal_attributes"] is not None:
+        import termios
+        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, input_info["terminal_attributes"])
+        input_info["terminal_attributes"] = None
+        set_bracketed_paste(False)
+
+
+def poll_input(input_info, timeout=None):
+    """
+    Return the next input event, waiting at most <timeout> seconds for one.
+
+    Without a running input reader, the key press is read on the calling thread.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param timeout: (default None) a float greater than or equal to 0 representing the most seconds to wait,
+                    or None to wait until a key is pressed
+    :precondition: input_info must be a well-formed dictionary of input info
+    :precondition: timeout must be a float greater than or equal to 0 or None
+    :postcondition: get and remove the oldest input event, or None if no key was pressed in time
+    :return: a dictionary representing the input event, or None if the wait timed out
+
+    >>> info = {"events": deque([create_input_event("a", 0.0)]), "event_ready": threading.Condition(),
+    ...         "reader": "running"}
+    >>> poll_input(info, 0)
+    {'key': 'a', 'time': 0.0}
+    >>> poll_input(info, 0.01) is None
+    True
+    """
+    if input_info["reader"] is None:
+        if timeout is not None and not is_key_waiting(timeout=timeout):
+            return None
+        return read_input_event(input_info)
+    with input_info["event_ready"]:
+        if not input_info["event_ready"].wait_for(lambda: input_info["events"], timeout):
+            return None
+        return input_info["events"].popleft()
+
+
+def drain_input(input_info):
+    """
+    Return every input event that is waiting, without blocking.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :postcondition: get and remove all waiting input events, oldest first
+    :return: a list of dictionaries representing the input events
+
+    >>> info = {"events": deque([create_input_event("a", 0.0), create_input_event("b", 0.1)]),
+    ...         "event_ready": threading.Condition()}
+    >>> [event["key"] for event in drain_input(info)], len(info["events"])
+    (['a', 'b'], 0)
+    """
+    with input_info["event_ready"]:
+        events = list(input_info["events"])
+        input_info["events"].clear()
+    return events
+
+
+def poll_key_event(input_info):
+    """
+    Poll the next key press and return its input event.
+
+    Buffered output is flushed first, so the user sees the prompt they are answering.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info with the keys "key_get" and "input_queue"
+    :postcondition: flush the buffered terminal output
+    :postcondition: earlier inputs that drew nothing stop waiting for a frame to measure their latency
+    :postcondition: wait for the next key press from the input reader, or via <input_info["key_get"]>
+                    if the reader is not running
+    :postcondition: inputted key code will be appended to <input_info["input_queue"]>
+    :postcondition: the input event is written to the recording, if one was started with start_input_recording()
+    :return: a dictionary representing the input event of the polled input
+    """
+    flush_output()
+    discard_input_times()
+    event = poll_input(input_info)
+    accept_input_event(input_info, event)
+    return event
+
+
+async def poll_key_event_async(input_info, interval=0.01):
+    """
+    Await the next key press and return its input event, letting other tasks run while waiting.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param interval: (default 0.01) a float greater than 0 representing the seconds between checks for a key press
+    :precondition: input_info must be a well-formed dictionary of input info with the keys "key_get" and "input_queue"
+    :precondition: must be awaited inside a running asyncio event loop
+    :postcondition: flush the buffered terminal output, and again before each check,
+                    so output drawn by other tasks is seen while waiting
+    :postcondition: earlier inputs that drew nothing stop waiting for a frame to measure their latency
+    :postcondition: the input event is queued and recorded as by poll_key_event()
+    :postcondition: cancelling the task while it waits takes no key press
+    :return: a dictionary representing the input event of the polled input
+
+    >>> import asyncio
+    >>> info = {"events": deque([create_input_event("a", 0.0)]), "event_ready": threading.Condition(),
+    ...         "reader": "running", "input_queue": deque(), "recording": None}
+    >>> asyncio.run(poll_key_event_async(info))
+    {'key': 'a', 'time': 0.0}
+    """
+    flush_output()
+    discard_input_times()
+    while True:
+        event = poll_input(input_info, 0)
+        if event is not None:
+            accept_input_event(input_info, event)
+            return event
+        await asyncio.sleep(interval)
+        flush_output()
+
+
+def accept_input_event(input_info, event):
+    """
+    Add the polled input <event> to the input queue and the recording.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param event: a dictionary representing an input event from create_input_event()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :precondition: event must be a well-formed input event dictionary
+    :postcondition: the key of <event> is appended to <input_info["input_queue"]>
+    :postcondition: <event> is written to the recording, if one was started with start_input_recording()
+    :postcondition: the next flushed frame records the latency from when <event> was read
+    """
+    mark_input_time(event["time"])
+    if input_info["recording"] is not None:
+        record_input_event(input_info["recording"], event)
+    input_info["input_queue"].append(event["key"])
+
+
+def take_waiting_repeat(input_info, key):
+    """
+    Remove and return the oldest waiting input event if it is another press of <key>.
+
+    Only events already read by the input reader thread are checked, so this never waits.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param key: a string representing the name of the repeated key
+    :precondition: input_info must be a well-formed dictionary of input info
+    :precondition: key must be a string
+    :postcondition: get and remove the oldest waiting event if its key is <key>
+    :return: a dictionary representing the input event, or None if the next event is not a press of <key>
+
+    >>> info = {"events": deque([create_input_event("down", 0.0), create_input_event("q", 0.1)]),
+    ...         "event_ready": threading.Condition()}
+    >>> take_waiting_repeat(info, "down")
+    {'key': 'down', 'time': 0.0}
+    >>> take_waiting_repeat(info, "down") is None, len(info["events"])
+    (True, 1)
+    """
+    with input_info["event_ready"]:
+        if input_info["events"] and input_info["events"][0]["key"] == key:
+            return input_info["events"].popleft()
+    return None
+
+
+def poll_key_repeat(input_info, keys):
+    """
+    Poll the next key press, merging the waiting repeats of it into one event with a count.
+
+    Holding a key down queues presses faster than a scene can redraw, so a scene that can act on
+    several presses at once, like scrolling N lines, can catch up with a single redraw.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param keys: a collection of strings representing the names of the keys whose repeats are merged
+    :precondition: input_info must be a well-formed dictionary of input info with the keys "key_get" and "input_queue"
+    :precondition: keys must be a collection of strings
+    :postcondition: poll the next key press with poll_key_event()
+    :postcondition: if its key is in <keys>, the presses of the same key waiting right after it are removed,
+                    queued and recorded as if each was polled on its own
+    :return: a dictionary representing the input event, with the number of merged presses under "count"
+    """
+    event = dict(poll_key_event(input_info), count=1)
+    if event["key"] not in keys:
+        return event
+    while (repeat := take_waiting_repeat(input_info, event["key"])) is not None:
+        accept_input_event(input_info, repeat)
+        event["count"] += 1
+    return event
+
+
 def poll_key_press(input_info):
     """
     Poll the next key press.
 
+    This is poll_key_event() for callers that only need the key, not the text of a paste.
+
     :param input_info: a dictionary representing the terminal input info created by init_key_input()
     :precondition: input_info must be a well-formed dictionary of input info with the keys "key_get" and "input_queue"
-    :postcondition: poll a key press via <input_info["key_get"]>
-    :postcondition: inputted key code will be appended to <input_info["input_queue"]>
-    :return: the key code of the polled input from <input_info["key_get"]>
+    :postcondition: poll the next key press with poll_key_event()
+    :return: the key code of the polled input
+    """
+    return poll_key_event(input_info)["key"]
+
+
+def start_input_recording(input_info, path):
+    """
+    Start writing every key press polled by poll_key_press() to the file at <path>.
+
+    Each line of the file is a JSON list of form [<seconds since the previous key press>, <key name>],
+    with the first delay counted from when the recording started. Pastes also have their text at the end of the list.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param path: a string or Path representing the file to write the recording to
+    :precondition: input_info must be a well-formed dictionary of input info
+    :precondition: path must be a writable file path
+    :postcondition: the file at <path> is created or emptied
+    :postcondition: <input_info["recording"]> holds the open recording until stop_input_recording() is called
+    """
+    input_info["recording"] = {"file": open(path, "w", encoding="utf-8"), "time": monotonic()}
+
+
+def record_input_event(recording, event):
+    """
+    Write <event> as the next line of <recording>.
+
+    :param recording: a dictionary representing an input recording from start_input_recording()
+    :param event: a dictionary representing an input event from create_input_event()
+    :precondition: recording must be a well-formed dictionary of an input recording with an open file
+    :precondition: event must be a well-formed input event dictionary
+    :postcondition: the line is flushed, so the recording is complete even if the game crashes
+    :postcondition: the recording time moves to the time of <event>
+
+    >>> import io
+    >>> recording = {"file": io.StringIO(), "time": 10.0}
+    >>> record_input_event(recording, create_input_event("up", 10.25))
+    >>> record_input_event(recording, create_input_event("é", 11.0))
+    >>> record_input_event(recording, create_input_event("paste", 11.5, "hi"))
+    >>> print(recording["file"].getvalue(), end="")
+    [0.25,"up"]
+    [0.75,"é"]
+    [0.5,"paste","hi"]
+    """
+    delay = round(max(0.0, event["time"] - recording["time"]), 3)
+    line = [delay, event["key"]] + ([event["text"]] if "text" in event else [])
+    recording["file"].write(json.dumps(line, ensure_ascii=False, separators=(",", ":")) + "\n")
+    recording["file"].flush()
+    recording["time"] = event["time"]
+
+
+def stop_input_recording(input_info):
+    """
+    Stop the recording started by start_input_recording() and close its file.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :precondition: input_info must be a well-formed dictionary of input info
+    :postcondition: key presses are no longer recorded
+    :postcondition: nothing happens if no recording was started
+    """
+    if input_info["recording"] is not None:
+        input_info["recording"]["file"].close()
+        input_info["recording"] = None
+
+
+def load_input_recording(path):
+    """
+    Return the key presses recorded in the file at <path>.
+
+    :param path: a string or Path representing a file written by start_input_recording()
+    :precondition: path must be a readable file of an input recording
+    :postcondition: get the recorded key presses in order, skipping blank lines
+    :return: a list of tuples of form (<float seconds since the previous key press>, <key name string>),
+             with the pasted text string at the end of the tuples of pastes
     """
-    inputted = input_info["key_get"](input_info)
-    input_info["input_queue"].append(inputted)
-    return inputted
+    with open(path, encoding="utf-8") as recording_file:
+        return [tuple(json.loads(line)) for line in recording_file if line.strip()]
+
+
+def start_input_replay(input_info, path, speed=1.0, clock=monotonic, wait=sleep):
+    """
+    Replay the key presses recorded in the file at <path> instead of reading the keyboard.
+
+    The recorded key presses are returned by <input_info["key_get"]>, so they reach the game through
+    the same input reader and polling as typed keys. Once the recording runs out, keys are read from the
+    keyboard again.
+
+    :param input_info: a dictionary representing the terminal input info created by init_key_input()
+    :param path: a string or Path representing a file written by start_input_recording()
+    :param speed: (default 1.0) a float greater than or equal to 0 representing how many times faster than
+                  recorded to replay the key presses, or 0 to replay them without waiting
+    :param clock: (default time.monotonic) a function with no parameters that returns the current time in seconds
+    :param wait: (default time.sleep) a function that waits for the given number of seconds
+    :precondition: input_info must be a well-formed dictionary of input info whose reader is not running
+    :precondition: path must be a readable file of an input recording
+    :precondition: speed must be a float greater than or equal to 0
+    :precondition: clock and wait must be functions
+    :postcondition: <input_info["key_get"]> returns the recorded key presses, each at its recorded delay
+                    after the previous one divided by <speed>
+    """
+    replay = {"events": deque(load_input_recording(path)), "time": clock()}
+    keyboard_key_get = input_info["key_get"]
+
+    def replay_key_get(info):
+        if not replay["events"]:
+            return keyboard_key_get(info)
+        delay, key, *text = replay["events"].popleft()
+        if text:
+            info["pastes"].append(text[0])
+        if speed:
+            replay["time"] += delay / speed
+            wait(max(0.0, replay["time"] - clock()))
+        return key
+
+    input_info["key_get"] = replay_key_get
+
+
+def is_key_waiting(input_info=None, timeout=0):
+    """
+    Return whether a key press is waiting to be read, waiting at most <timeout> seconds for one.
+
+    :param input_info: (default None) a dictionary representing the terminal input info created by init_key_input(),
+                       or None to check the terminal directly
+    :param timeout: (default 0) a float greater than or equal to 0 representing the most seconds to wait
+    :precondition: input_info must be a well-formed dictionary of input info or None
+    :precondition: timeout must be a float greater than or equal to 0
+    :postcondition: get whether the next key read would return right away
+    :postcondition: if the input reader of <input_info> is running, its waiting events are checked instead
+    :return: True if a key press is waiting to be read, otherwise False
+    """
+    if input_info is not None and input_info["reader"] is not None:
+        with input_info["event_ready"]:
+            return input_info["event_ready"].wait_for(lambda: input_info["events"], timeout)
+    if os.name == "nt":
+        from msvcrt import kbhit
+        deadline = monotonic() + timeout
+        while not kbhit():
+            if monotonic() >= deadline:
+                return False
+            sleep(0.01)
+        return True
+    readable, _, _ = select.select([sys.stdin], [], [], timeout)
+    return bool(readable)
 
 
 def pull_input(input_info, amount=1, flush=False):
@@ -158,7 +764,7 @@ def pull_input(input_info, amount=1, flush=False):
     :param input_info: a dictionary representing the terminal input info created by init_key_input()
     :param amount: an integer greater than or equal to -1 representing the number of inputs to pull
     :param flush: a boolean representing whether to clear the queue after getting the input
-    :precondition: input_info must be a dictionary of terminal input info with the key "input_queue"
+    :precondition: input_info must be a dictionary of terminal input info with the key "input_queue" holding a deque
     :precondition: amount must be an integer greater than or equal to -1
     :precondition: flush must be a boolean
     :postcondition: get a list of input names from the queue and pop them
@@ -168,21 +774,21 @@ def pull_input(input_info, amount=1, flush=False):
     :return: a list of string(s) representing the popped input names,
              or None if <amount> is out of range of the input queue
 
-    >>> input_dictionary = {"input_queue": []}
+    >>> input_dictionary = {"input_queue": deque()}
     >>> pull_input(input_dictionary)
 
-    >>> input_dictionary = {"input_queue": [" ", "a", "escape"]}
+    >>> input_dictionary = {"input_queue": deque([" ", "a", "escape"])}
     >>> pull_input(input_dictionary, amount=2, flush=True)
     [' ', 'a']
     >>> input_dictionary["input_queue"]
-    []
+    deque([])
     """
     queue_length = len(input_info["input_queue"])
     if queue_length < amount or amount == 0:
         return None
     if amount == -1:
         amount = queue_length
-    inputs = [input_info["input_queue"].pop(0) for _ in range(amount)]
+    inputs = [input_info["input_queue"].popleft() for _ in range(amount)]
     if flush:
         input_info["input_queue"].clear()
     return inputs
@@ -195,6 +801,10 @@ def start_text_input(column: int, row: int, max_width=None, hide=False) -> Calla
     If not hidden, typing will start at (<column>, <row>), and
     start hiding (clip) characters after <max_width> characters are inputted.
 
+    The input is kept in a gap buffer, so typing costs the same however long the line is.
+    Only the part of the line from the edit point to its end is drawn again after a key press,
+    and only the old and new cursor cells after a cursor motion.
+
     :param column: an integer representing the 1-based horizontal origin of the text input
     :param row: an integer representing the 1-based vertical origin of the text_input
     :param max_width: an integer representing the maximum width of the input area
@@ -210,53 +820,101 @@ def start_text_input(column: int, row: int, max_width=None, hide=False) -> Calla
     """
     if not max_width:
         max_width = get_screen_size()[0] - column - 1
-    text_area = create_text_area(column=column, row=row, width=max_width, height=1)
-    string_input = []
-    # The index being inserted at
-    cursor_at = 0
-    # The number of characters beyond max-width
+    text_buffer = create_gap_buffer()
+    # The index of the first visible character
     draw_index = 0
+    # The draw index and cursor index the input was last drawn with, or None before the first draw
+    drawn_at = None
+
+    def draw_text_cell(offset, underline):
+        """
+        Draw the character <offset> columns into the visible input, underlined if it is the cursor.
+        """
+        character = " "
+        if underline or offset < max_width:
+            character = get_gap_buffer_character(text_buffer, draw_index + offset) or " "
+        cursor.cursor_move_to(column + offset, row)
+        cursor.cursor_write(as_styled_text(style(character, "underline")) if underline else character, 1)
 
-    def update_text_input(key_press: str, flush=False) -> str | None:
+    def draw_text_input(edited_at, flush):
+        """
+        Draw the parts of the input that changed since it was last drawn, and its cursor.
+        """
+        nonlocal draw_index, drawn_at
+        cursor_at = text_buffer["gap_start"]
+        length = get_gap_buffer_length(text_buffer)
+        draw_index = max(cursor_at - max_width, min(draw_index, cursor_at, max(0, length - max_width)))
+        redraw_from = max_width
+        if drawn_at is None or drawn_at[0] != draw_index:
+            redraw_from = 0
+        elif edited_at is not None:
+            redraw_from = max(0, edited_at - draw_index)
+        if redraw_from < max_width:
+            draw_text_box(
+                column + redraw_from, row, max_width - redraw_from, 1,
+                get_gap_buffer_text(text_buffer, draw_index + redraw_from, draw_index + max_width),
+                overwrite=True, flush_output=False)
+        if drawn_at is not None and not redraw_from <= drawn_at[1] - drawn_at[0] < max_width:
+            # The old cursor cell was not drawn over, so take its underline away
+            draw_text_cell(drawn_at[1] - drawn_at[0], False)
+        draw_text_cell(cursor_at - draw_index, True)
+        drawn_at = (draw_index, cursor_at)
+        if flush:
+            flush_output()
+
+    def update_text_input(key_press: str, flush=False, pasted="") -> str | None:
         """
         Get text input from the user.
 
+        Home and End move to the ends of the line, and Ctrl or Alt with Left or Right move by whole words.
+
         :param key_press: a string representing the key code of the pressed key input
         :param flush: (default False) a boolean representing to flush the changes to output right away
+        :param pasted: (default "") a string representing the text of a "paste" key press
         :precondition: key_press must be a valid key code string
         :precondition: flush must be a boolean
+        :precondition: pasted must be a string
         :postcondition: get text input from the user, or continue the prompt
         :postcondition: the prompt is completed when "enter" is passed
+        :postcondition: the printable characters of a "paste" are inserted all at once and drawn once,
+                        with whitespace such as line breaks inserted as spaces
         :return: a string representing the text input from the user,
         """
-        nonlocal string_input, cursor_at, draw_index, text_area
+        cursor_at = text_buffer["gap_start"]
+        # The index of the first character changed by the key press, or None if only the cursor moved
+        edited_at = None
         if key_press == "enter":
             cursor.cursor_set(column, row + 1)
-            return "".join(string_input)
-        elif key_press == "backspace" and len(string_input) > 0 and cursor_at > 0:
-            string_input.pop(cursor_at - 1)
-            cursor_at -= 1
+            return get_gap_buffer_text(text_buffer)
+        elif key_press == "backspace" and cursor_at > 0:
+            delete_from_gap_buffer(text_buffer, -1)
+            edited_at = cursor_at - 1
+        elif key_press == "delete" and cursor_at < get_gap_buffer_length(text_buffer):
+            delete_from_gap_buffer(text_buffer, 1)
+            edited_at = cursor_at
         elif key_press == "right":
-            cursor_at = min(len(string_input), cursor_at + 1)
+            move_gap(text_buffer, cursor_at + 1)
         elif key_press == "left":
-            cursor_at = max(0, cursor_at - 1)
+            move_gap(text_buffer, cursor_at - 1)
+        elif key_press == "home":
+            move_gap(text_buffer, 0)
+        elif key_press == "end":
+            move_gap(text_buffer, get_gap_buffer_length(text_buffer))
+        elif key_press in ("ctrl_left", "alt_left"):
+            move_gap(text_buffer, find_previous_word_start(text_buffer, cursor_at))
+        elif key_press in ("ctrl_right", "alt_right"):
+            move_gap(text_buffer, find_next_word_end(text_buffer, cursor_at))
         elif key_press in printable:
-            string_input.insert(cursor_at, key_press)
-            cursor_at = min(len(string_input), cursor_at + 1)
+            insert_into_gap_buffer(text_buffer, key_press)
+            edited_at = cursor_at
+        elif key_press == "paste":
+            insert_into_gap_buffer(text_buffer, [" " if character in whitespace else character
+                                                 for character in pasted if character in printable])
+            edited_at = cursor_at
         else:
             effects.get_effects()["honk"].play()
         if not hide:
-            draw_index = max(0, min(len(string_input) - max_width, cursor_at - max_width + draw_index))
-            text_area["text"] = "".join(string_input[draw_index:draw_index + min(len(string_input), max_width)])
-            draw_text_box(text_area=text_area, overwrite=True, flush_output=flush)
-            cursor.cursor_set(min(max_width + column, max(column, column + cursor_at - draw_index)), row)
-            cursor_string = ""
-            try:
-                cursor_string = string_input[cursor_at]
-            except IndexError:
-                cursor_string = " "
-            finally:
-                print(style(cursor_string, "underline"), end="", flush=flush)
+            draw_text_input(edited_at, flush)
 
         return None
 
@@ -0,0 +1,150 @@
+"""
+Input-to-photon latency: the time from reading a key press to flushing the frame that shows it.
+"""
+from collections import Counter
+
+BUCKET_SECONDS = 0.0001
+
+_latency_state = {
+    "pending": [],
+    "histograms": {}}
+
+
+def create_latency_histogram():
+    """
+    Return a new latency histogram.
+
+    A latency histogram is a Counter of bucket indexes and how many latencies fell in them,
+    where bucket <index> holds latencies from <index> * BUCKET_SECONDS up to the next bucket.
+
+    :postcondition: get an empty latency histogram
+    :return: a Counter representing an empty latency histogram
+
+    >>> create_latency_histogram()
+    Counter()
+    """
+    return Counter()
+
+
+def add_latency(histogram, seconds):
+    """
+    Count a latency of <seconds> in <histogram>.
+
+    :param histogram: a Counter representing a latency histogram from create_latency_histogram()
+    :param seconds: a float greater than or equal to 0 representing the latency in seconds
+    :precondition: histogram must be a latency histogram
+    :precondition: seconds must be a float greater than or equal to 0
+    :postcondition: the bucket holding <seconds> is counted once more
+
+    >>> histogram = create_latency_histogram()
+    >>> add_latency(histogram, 0.00125)
+    >>> add_latency(histogram, 0.00129)
+    >>> histogram
+    Counter({12: 2})
+    """
+    histogram[int(seconds / BUCKET_SECONDS)] += 1
+
+
+def get_latency_percentile(histogram, percent):
+    """
+    Return the latency that <percent> percent of the latencies in <histogram> are at or below.
+
+    The upper edge of the bucket is returned, so the result never understates the latency.
+
+    :param histogram: a Counter representing a latency histogram from create_latency_histogram()
+    :param percent: a number from 0 to 100 representing the percentile to get
+    :precondition: histogram must be a latency histogram
+    :precondition: percent must be a number from 0 to 100
+    :postcondition: get the nearest-rank percentile of <histogram> in seconds
+    :return: a float representing the percentile latency in seconds, or None if <histogram> is empty
+
+    >>> histogram = create_latency_histogram()
+    >>> for milliseconds in range(1, 101):
+    ...     add_latency(histogram, milliseconds / 1000)
+    >>> [round(get_latency_percentile(histogram, percent) * 1000, 1) for percent in (50, 95, 99)]
+    [50.1, 95.1, 99.1]
+    >>> get_latency_percentile(create_latency_histogram(), 50) is None
+    True
+    """
+    total = histogram.total()
+    if not total:
+        return None
+    rank = max(1, -(-total * percent // 100))
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= rank:
+            return (bucket + 1) * BUCKET_SECONDS
+    return None
+
+
+def mark_input_time(time):
+    """
+    Wait for the next frame to be flushed to measure the latency of an input read at <time>.
+
+    :param time: a float representing the time.monotonic() seconds when the input was read
+    :precondition: time must be a float
+    :postcondition: the next call to record_frame() counts the latency of this input
+    """
+    _latency_state["pending"].append(time)
+
+
+def discard_input_times():
+    """
+    Stop waiting for a frame for the inputs marked so far.
+
+    Inputs that changed nothing on the screen have no frame, so they are discarded before the next input is read.
+
+    :postcondition: inputs marked before this call are not counted by record_frame()
+    """
+    _latency_state["pending"].clear()
+
+
+def record_frame(scene, end_time):
+    """
+    Count the latency of every waiting input towards <scene>, for a frame flushed at <end_time>.
+
+    :param scene: a string representing the name of the scene that flushed the frame, or None
+    :param end_time: a float representing the time.monotonic() seconds when the frame was flushed
+    :precondition: scene must be a string or None
+    :precondition: end_time must be a float
+    :postcondition: the latency of each input marked with mark_input_time() is added to the histogram of <scene>
+    :postcondition: no inputs are waiting for a frame afterwards
+
+    >>> discard_input_times()
+    >>> mark_input_time(1.0)
+    >>> record_frame("doctest", 1.002)
+    >>> record_frame("doctest", 1.5)
+    >>> get_latency_histograms()["doctest"]
+    Counter({20: 1})
+    """
+    if not _latency_state["pending"]:
+        return
+    histogram = _latency_state["histograms"].setdefault(scene, create_latency_histogram())
+    for time in _latency_state["pending"]:
+        add_latency(histogram, max(0.0, end_time - time))
+    _latency_state["pending"].clear()
+
+
+def get_latency_histograms():
+    """
+    Return the latency histogram of every scene.
+
+    :postcondition: get a dictionary of scene names and their latency histograms
+    :return: a dictionary representing the latency histograms of every scene that showed an input
+    """
+    return _latency_state["histograms"]
+
+
+def format_latency_stats():
+    """
+    Return a table of the input-to-photon latency percentiles of every scene, in milliseconds.
+
+    :postcondition: get a string with one line per scene showing its input count and p50, p95 and p99 latencies
+    :return: a string representing the latency statistics table
+    """
+    lines = [f"{'scene':<18}{'inputs':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for scene, histogram in _latency_state["histograms"].items():
+        percentiles = (get_latency_percentile(histogram, percent) * 1000 for percent in (50, 95, 99))
+        lines.append(f"{str(scene):<18}{histogram.total():>8}" + "".join(f"{value:>10.1f}" for value in percentiles))
+    return "\n".join(lines)
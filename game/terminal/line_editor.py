@@ -0,0 +1,234 @@
+"""
+Gap buffer for editing one line of text at a cursor.
+
+A gap buffer dictionary has the form:
+{
+    "characters": <list of the characters, with the slots of the gap holding leftovers that are never read>,
+    "gap_start": <int index of the first slot of the gap, which is also the cursor>,
+    "gap_end": <int index of the first slot after the gap>
+}
+
+Typing at the cursor only fills the gap, so an edit costs the same however long the line is.
+Moving the cursor moves the gap, which only copies the characters it passes over.
+"""
+
+
+def create_gap_buffer(text="", gap_size=16):
+    """
+    Return a gap buffer holding <text>, with the cursor at its end.
+
+    :param text: (default "") a string representing the starting text
+    :param gap_size: (default 16) a positive integer representing the starting number of free slots
+    :precondition: text must be a string
+    :precondition: gap_size must be a positive integer
+    :postcondition: get a gap buffer of <text> whose gap is after the text
+    :return: a dictionary representing the gap buffer
+
+    >>> create_gap_buffer("ab", 2)
+    {'characters': ['a', 'b', '', ''], 'gap_start': 2, 'gap_end': 4}
+    """
+    return {"characters": list(text) + [""] * gap_size, "gap_start": len(text), "gap_end": len(text) + gap_size}
+
+
+def get_gap_buffer_length(gap_buffer):
+    """
+    Return the number of characters in <gap_buffer>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :postcondition: get the length of the text, not counting the gap
+    :return: an integer representing the number of characters
+
+    >>> get_gap_buffer_length(create_gap_buffer("hello"))
+    5
+    """
+    return len(gap_buffer["characters"]) - gap_buffer["gap_end"] + gap_buffer["gap_start"]
+
+
+def get_gap_buffer_text(gap_buffer, start=0, stop=None):
+    """
+    Return the text of <gap_buffer> from index <start> up to <stop>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param start: (default 0) an integer greater than or equal to 0 representing the first index to get
+    :param stop: (default None) an integer representing the index to stop before, or None for the end of the text
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: start must be an integer greater than or equal to 0
+    :precondition: stop must be an integer greater than or equal to <start> or None
+    :postcondition: get the characters from <start> to <stop>, as text[start:stop] would
+    :return: a string representing the text in the range
+
+    >>> buffer = create_gap_buffer("hello")
+    >>> move_gap(buffer, 2)
+    >>> get_gap_buffer_text(buffer), get_gap_buffer_text(buffer, 1, 4), get_gap_buffer_text(buffer, 3)
+    ('hello', 'ell', 'lo')
+    """
+    length = get_gap_buffer_length(gap_buffer)
+    stop = length if stop is None else min(stop, length)
+    gap_start, gap_size = gap_buffer["gap_start"], gap_buffer["gap_end"] - gap_buffer["gap_start"]
+    before = gap_buffer["characters"][min(start, gap_start):min(stop, gap_start)]
+    after = gap_buffer["characters"][max(start, gap_start) + gap_size:max(stop, gap_start) + gap_size]
+    return "".join(before) + "".join(after)
+
+
+def get_gap_buffer_character(gap_buffer, index):
+    """
+    Return the character at <index> of <gap_buffer>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param index: an integer representing the index of the character
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: index must be an integer
+    :postcondition: get the character at <index>, or "" if <index> is outside of the text
+    :return: a string representing the character
+
+    >>> buffer = create_gap_buffer("hey")
+    >>> move_gap(buffer, 1)
+    >>> get_gap_buffer_character(buffer, 0), get_gap_buffer_character(buffer, 2), get_gap_buffer_character(buffer, 3)
+    ('h', 'y', '')
+    """
+    if not 0 <= index < get_gap_buffer_length(gap_buffer):
+        return ""
+    if index >= gap_buffer["gap_start"]:
+        index += gap_buffer["gap_end"] - gap_buffer["gap_start"]
+    return gap_buffer["characters"][index]
+
+
+def move_gap(gap_buffer, index):
+    """
+    Move the gap of <gap_buffer>, and so the cursor, to <index>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param index: an integer representing the index to move the cursor to
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: index must be an integer
+    :postcondition: the gap starts at <index>, limited to the text
+    :postcondition: only the characters between the old and new cursor are copied
+
+    >>> buffer = create_gap_buffer("abc", 2)
+    >>> move_gap(buffer, 1)
+    >>> buffer["gap_start"], buffer["gap_end"], get_gap_buffer_text(buffer)
+    (1, 3, 'abc')
+    """
+    index = max(0, min(index, get_gap_buffer_length(gap_buffer)))
+    characters, gap_start, gap_end = gap_buffer["characters"], gap_buffer["gap_start"], gap_buffer["gap_end"]
+    if index < gap_start:
+        amount = gap_start - index
+        characters[gap_end - amount:gap_end] = characters[index:gap_start]
+    elif index > gap_start:
+        amount = index - gap_start
+        characters[gap_start:index] = characters[gap_end:gap_end + amount]
+    gap_buffer["gap_end"] = gap_end + index - gap_start
+    gap_buffer["gap_start"] = index
+
+
+def insert_into_gap_buffer(gap_buffer, text):
+    """
+    Insert <text> at the cursor of <gap_buffer>, leaving the cursor after it.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param text: a string or list of characters representing the text to insert
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: text must be a string or list of single characters
+    :postcondition: <text> is inserted at the cursor
+    :postcondition: a gap too small for <text> at least doubles, so growing the line stays cheap
+
+    >>> buffer = create_gap_buffer("ad", 1)
+    >>> move_gap(buffer, 1)
+    >>> insert_into_gap_buffer(buffer, "bc")
+    >>> get_gap_buffer_text(buffer), buffer["gap_start"]
+    ('abcd', 3)
+    """
+    gap_start, gap_end = gap_buffer["gap_start"], gap_buffer["gap_end"]
+    if gap_end - gap_start < len(text):
+        growth = max(len(text), len(gap_buffer["characters"]))
+        gap_buffer["characters"][gap_end:gap_end] = [""] * growth
+        gap_end += growth
+    gap_buffer["characters"][gap_start:gap_start + len(text)] = text
+    gap_buffer["gap_start"], gap_buffer["gap_end"] = gap_start + len(text), gap_end
+
+
+def delete_from_gap_buffer(gap_buffer, amount):
+    """
+    Delete <amount> characters next to the cursor of <gap_buffer>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param amount: an integer representing how many characters to delete,
+                   before the cursor if negative and after the cursor if positive
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: amount must be an integer
+    :postcondition: the characters are deleted by widening the gap, limited to the text
+    :return: an integer representing how many characters were deleted
+
+    >>> buffer = create_gap_buffer("abcd")
+    >>> move_gap(buffer, 2)
+    >>> delete_from_gap_buffer(buffer, -5), delete_from_gap_buffer(buffer, 1), get_gap_buffer_text(buffer)
+    (2, 1, 'd')
+    """
+    if amount < 0:
+        amount = min(-amount, gap_buffer["gap_start"])
+        gap_buffer["gap_start"] -= amount
+    else:
+        amount = min(amount, len(gap_buffer["characters"]) - gap_buffer["gap_end"])
+        gap_buffer["gap_end"] += amount
+    return amount
+
+
+def is_word_character(character):
+    """
+    Return whether <character> is part of a word for word-wise cursor motions.
+
+    :param character: a string representing one character
+    :precondition: character must be a string of length 0 or 1
+    :postcondition: get whether <character> is a letter, a digit, or an underscore
+    :return: True if <character> is a word character, otherwise False
+
+    >>> is_word_character("a"), is_word_character("_"), is_word_character("/"), is_word_character("")
+    (True, True, False, False)
+    """
+    return character.isalnum() or character == "_"
+
+
+def find_previous_word_start(gap_buffer, index):
+    """
+    Return the index of the start of the word before <index> in <gap_buffer>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param index: an integer representing the index to search back from
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: index must be an integer from 0 to the length of the text
+    :postcondition: skip the non-word characters before <index>, then the word before them
+    :return: an integer representing the index of the start of the word, or 0 if there is none
+
+    >>> buffer = create_gap_buffer("cd seeds/burrow  ")
+    >>> find_previous_word_start(buffer, 17), find_previous_word_start(buffer, 9), find_previous_word_start(buffer, 3)
+    (9, 3, 0)
+    """
+    while index > 0 and not is_word_character(get_gap_buffer_character(gap_buffer, index - 1)):
+        index -= 1
+    while index > 0 and is_word_character(get_gap_buffer_character(gap_buffer, index - 1)):
+        index -= 1
+    return index
+
+
+def find_next_word_end(gap_buffer, index):
+    """
+    Return the index just past the end of the word after <index> in <gap_buffer>.
+
+    :param gap_buffer: a dictionary representing a gap buffer from create_gap_buffer()
+    :param index: an integer representing the index to search forward from
+    :precondition: gap_buffer must be a well-formed gap buffer dictionary
+    :precondition: index must be an integer from 0 to the length of the text
+    :postcondition: skip the non-word characters after <index>, then the word after them
+    :return: an integer representing the index after the end of the word, or the length of the text if there is none
+
+    >>> buffer = create_gap_buffer("cd seeds/burrow  ")
+    >>> find_next_word_end(buffer, 0), find_next_word_end(buffer, 2), find_next_word_end(buffer, 15)
+    (2, 8, 17)
+    """
+    length = get_gap_buffer_length(gap_buffer)
+    while index < length and not is_word_character(get_gap_buffer_character(gap_buffer, index)):
+        index += 1
+    while index < length and is_word_character(get_gap_buffer_character(gap_buffer, index)):
+        index += 1
+    return index
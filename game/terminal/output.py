@@ -0,0 +1,242 @@
+"""
+Buffered terminal output with explicit flushes and per-scene write accounting.
+"""
+import sys
+from time import monotonic
+
+from game.ansi_actions.styled_text import get_style_transition
+from game.terminal.latency import record_frame
+
+_output_state = {
+    "chunks": [],
+    "stream": None,
+    "scene": None,
+    "budget": None,
+    "stats": {},
+    "mark": 0,
+    "style": ""}
+
+
+def create_output_stats():
+    """
+    Return a new output statistics dictionary.
+
+    An output statistics dictionary has the form:
+    {
+        "bytes": <int of bytes sent to the terminal>,
+        "writes": <int of write_output() calls>,
+        "flushes": <int of writes actually sent to the terminal>,
+        "largest_flush": <int of bytes in the largest single flush>,
+        "over_budget": <int of flushes larger than the output budget>
+    }
+
+    :postcondition: get an output statistics dictionary with every count at 0
+    :return: a dictionary representing empty output statistics
+
+    >>> create_output_stats() == {"bytes": 0, "writes": 0, "flushes": 0, "largest_flush": 0, "over_budget": 0}
+    True
+    """
+    return {"bytes": 0, "writes": 0, "flushes": 0, "largest_flush": 0, "over_budget": 0}
+
+
+def get_scene_output_stats(scene=None):
+    """
+    Return the output statistics of <scene>, creating them if they don't exist yet.
+
+    :param scene: (default None) a string representing the scene name, or None for the current output scene
+    :precondition: scene must be a string or None
+    :postcondition: get the output statistics dictionary of <scene>
+    :return: a dictionary representing the output statistics of <scene>
+    """
+    if scene is None:
+        scene = _output_state["scene"]
+    if scene not in _output_state["stats"]:
+        _output_state["stats"][scene] = create_output_stats()
+    return _output_state["stats"][scene]
+
+
+def get_output_stats():
+    """
+    Return the output statistics of every scene.
+
+    :postcondition: get a dictionary of scene names and their output statistics dictionaries
+    :return: a dictionary representing the output statistics of every scene that wrote output
+    """
+    return _output_state["stats"]
+
+
+def set_output_scene(scene):
+    """
+    Count the following output towards <scene>.
+
+    :param scene: a string representing the name of the scene that is producing output, or None
+    :precondition: scene must be a string or None
+    :postcondition: output written after this call is counted towards <scene>
+    """
+    _output_state["scene"] = scene
+
+
+def set_output_budget(max_bytes):
+    """
+    Set the most bytes a single flush should send before it is counted as over budget.
+
+    :param max_bytes: a positive integer representing the byte budget per flush, or None for no budget
+    :precondition: max_bytes must be a positive integer or None
+    :postcondition: flushes larger than <max_bytes> are counted in the "over_budget" statistic
+    """
+    _output_state["budget"] = max_bytes
+
+
+def set_output_stream(stream):
+    """
+    Send flushed output to <stream> instead of standard output.
+
+    :param stream: a file-like object with write() and flush() representing where to send output,
+                   or None to use standard output
+    :precondition: stream must be a writable file-like object or None
+    :postcondition: the following flushes are sent to <stream>
+    """
+    _output_state["stream"] = stream
+
+
+def write_output(text, keep_style=False):
+    """
+    Add <text> to the output buffer without sending it to the terminal.
+
+    :param text: a string representing the text or escape codes to output
+    :param keep_style: (default False) a boolean representing whether <text> only moves the cursor or changes modes,
+                       so the style left on by write_styled_output() can stay on
+    :precondition: text must be a string
+    :precondition: keep_style must be a boolean
+    :postcondition: <text> is sent to the terminal by the next call to flush_output()
+    :postcondition: <text> is written with the default style unless <keep_style> is True
+
+    >>> write_styled_output((("\\033[1m", "bold"),))
+    >>> write_output(" plain")
+    >>> flush_output()
+    \x1b[1mbold\x1b[0m plain
+    """
+    if _output_state["style"] and not keep_style:
+        _output_state["chunks"].append("\033[0m")
+        _output_state["style"] = ""
+    _output_state["chunks"].append(text)
+    _output_state["mark"] += 1
+    get_scene_output_stats()["writes"] += 1
+
+
+def write_styled_output(styled_text):
+    """
+    Add <styled_text> to the output buffer, switching only the style attributes that change.
+
+    The terminal's current style is tracked between calls, so neighbouring writes in the same style
+    send no style codes at all. The style is reset before the next plain write or flush.
+
+    :param styled_text: a tuple of runs representing the styled text to output
+    :precondition: styled_text must be a well-formed styled text tuple
+    :postcondition: <styled_text> is sent to the terminal by the next call to flush_output()
+    :postcondition: the last style of <styled_text> stays on for the next styled write
+
+    >>> write_styled_output((("\\033[31m", "a"),))
+    >>> write_styled_output((("\\033[31m", "b"), ("\\033[1;31m", "c")))
+    >>> flush_output()
+    \x1b[31mab\x1b[1mc\x1b[0m
+    """
+    for run_style, run_text in styled_text:
+        _output_state["chunks"].append(get_style_transition(_output_state["style"], run_style))
+        _output_state["style"] = run_style
+        _output_state["chunks"].append(run_text)
+    _output_state["mark"] += 1
+    get_scene_output_stats()["writes"] += 1
+
+
+def flush_output():
+    """
+    Send everything in the output buffer to the terminal with a single write.
+
+    :postcondition: send the buffered output to the output stream and flush it
+    :postcondition: the output buffer is emptied
+    :postcondition: the terminal is left in the default style
+    :postcondition: the output mark changes, even if nothing was buffered
+    :postcondition: the bytes and flushes are counted towards the current output scene
+    :postcondition: the latency of the inputs waiting for a frame is recorded, if anything was sent
+
+    >>> write_output("Hello, ")
+    >>> write_output("World")
+    >>> flush_output()
+    Hello, World
+    """
+    _output_state["mark"] += 1
+    if _output_state["style"]:
+        # Leave the terminal in the default style for anything printed outside of the output buffer
+        _output_state["chunks"].append("\033[0m")
+        _output_state["style"] = ""
+    if not _output_state["chunks"]:
+        return
+    text = "".join(_output_state["chunks"])
+    _output_state["chunks"].clear()
+    stream = _output_state["stream"] or sys.stdout
+    if hasattr(stream, "buffer"):
+        # Push out anything print() left in the text layer before writing bytes underneath it
+        stream.flush()
+        data = text.encode(stream.encoding or "utf-8", stream.errors or "strict")
+        stream.buffer.write(data)
+        stream.buffer.flush()
+        byte_count = len(data)
+    else:
+        stream.write(text)
+        stream.flush()
+        byte_count = len(text.encode("utf-8"))
+    record_frame(_output_state["scene"], monotonic())
+    stats = get_scene_output_stats()
+    stats["bytes"] += byte_count
+    stats["flushes"] += 1
+    stats["largest_flush"] = max(stats["largest_flush"], byte_count)
+    if not _output_state["budget"] is None and byte_count > _output_state["budget"]:
+        stats["over_budget"] += 1
+
+
+def get_output_mark():
+    """
+    Return a number that changes every time output is written or flushed.
+
+    Callers that track the terminal state can compare marks to know whether anything else was output in between.
+
+    :postcondition: get the current output mark
+    :return: an integer representing the current output mark
+
+    >>> mark = get_output_mark()
+    >>> write_output("")
+    >>> get_output_mark() == mark
+    False
+    """
+    return _output_state["mark"]
+
+
+def format_output_stats():
+    """
+    Return a table of the output statistics of every scene.
+
+    :postcondition: get a string with one line per scene showing its output statistics
+    :return: a string representing the output statistics table
+    """
+    lines = [f"{'scene':<18}{'bytes':>10}{'writes':>10}{'flushes':>10}{'largest':>10}{'over':>6}"]
+    for scene, stats in _output_state["stats"].items():
+        lines.append(
+            f"{str(scene):<18}{stats['bytes']:>10}{stats['writes']:>10}{stats['flushes']:>10}"
+            f"{stats['largest_flush']:>10}{stats['over_budget']:>6}")
+    return "\n".join(lines)
+
+
+def main():
+    """
+    Drive the program.
+    """
+    set_output_scene("demo")
+    for word in ("Buffered ", "output ", "is ", "sent ", "once\n"):
+        write_output(word)
+    flush_output()
+    print(format_output_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -2,24 +2,147 @@
 Terminal information and manipulation.
 """
 import os
+import signal
+from time import monotonic
+
+from game.terminal.output import write_output, flush_output
+
+_screen_state = {
+    "listeners": [],
+    "size": None,
+    "size_stale": True,
+    "checked_at": 0.0,
+    "watching": False,
+    "polling": False,
+    "override": None,
+    "scroll_region": None}
+
+
+def add_screen_listener(listener):
+    """
+    Register <listener> to be called when the terminal screen changes as a whole.
+
+    Listeners are called with the name of the event, such as "clear".
+
+    :param listener: a function representing the callback to run on screen events
+    :precondition: listener must be a function that takes one string argument
+    :postcondition: <listener> is called on every following screen event
+    """
+    _screen_state["listeners"].append(listener)
+
+
+def notify_screen_listeners(event_name):
+    """
+    Call every screen listener with <event_name>.
+
+    :param event_name: a string representing the screen event that happened
+    :precondition: event_name must be a string
+    :postcondition: call every listener registered with add_screen_listener()
+
+    >>> events = []
+    >>> add_screen_listener(events.append)
+    >>> notify_screen_listeners("clear")
+    >>> events
+    ['clear']
+    >>> remove_screen_listener(events.append)
+    """
+    for listener in tuple(_screen_state["listeners"]):
+        listener(event_name)
+
+
+def remove_screen_listener(listener):
+    """
+    Stop calling <listener> on screen events.
+
+    :param listener: a function representing a callback registered with add_screen_listener()
+    :precondition: listener must be a function
+    :postcondition: <listener> is no longer called on screen events, if it was registered
+    """
+    if listener in _screen_state["listeners"]:
+        _screen_state["listeners"].remove(listener)
+
+
+def get_erase_codes():
+    """
+    Return a dictionary of erase options and their ANSI escape sequences.
+
+    :postcondition: get a dictionary of erase options and their ANSI escape sequences
+    :postcondition: the key-value pairs have the form <name>: <sequence> and both are strings
+    :return: a dictionary representing the available erase options and their ANSI escape sequences
+
+    >>> get_erase_codes() == {
+    ...     "screen": "\\033[2J",
+    ...     "scrollback": "\\033[3J",
+    ...     "line": "\\033[2K",
+    ...     "line_end": "\\033[0K"}
+    True
+    """
+    return {
+        "screen": "\033[2J",
+        "scrollback": "\033[3J",
+        "line": "\033[2K",
+        "line_end": "\033[0K"
+    }
 
 
 def clear_screen():
     """
-    Clear the terminal screen based on the operating system.
+    Clear the terminal screen and move the cursor to the top left corner.
 
-    :precondition: terminal must be run from a Windows or Posix style system
-    :postcondition: clear the terminal screen based on the operating system
+    Uses ANSI erase sequences instead of starting a "clear" or "cls" process.
+
+    :precondition: terminal must support ANSI escape sequences
+    :postcondition: clear the terminal screen and its scrollback
+    :postcondition: the cursor is moved to (1, 1)
+    :postcondition: the whole screen scrolls again if a scroll region was set
+    :postcondition: notify screen listeners of a "clear" event
     """
-    os.system("clear" if os.name == "posix" else "cls")
+    set_scroll_region()
+    erase_codes = get_erase_codes()
+    write_output(f"\033[H{erase_codes["screen"]}{erase_codes["scrollback"]}")
+    flush_output()
+    notify_screen_listeners("clear")
 
 
-def get_screen_size():
+def set_scroll_region(top=None, bottom=None):
     """
-    Get the dimensions of the terminal as a tuple.
+    Limit the rows that scroll when a newline is written on the bottom row of the region.
+
+    Rows outside of the region stay in place while the rows inside of it scroll.
+
+    :param top: (default None) a positive integer representing the 1-based first row of the region,
+                or None to let the whole screen scroll again
+    :param bottom: (default None) a positive integer greater than <top> representing the 1-based last row of the region
+    :precondition: terminal must support the DECSTBM escape sequence
+    :precondition: top and bottom must both be positive integers within the terminal, or both be None
+    :postcondition: the region is sent to the terminal only if it is different from the current one
+    :postcondition: the cursor position is unknown after the region changes
+    """
+    region = None if top is None else (top, bottom)
+    if region == _screen_state["scroll_region"]:
+        return
+    _screen_state["scroll_region"] = region
+    write_output("\033[r" if region is None else f"\033[{top};{bottom}r")
+
+
+def get_scroll_region():
+    """
+    Return the rows that scroll, as set by set_scroll_region().
+
+    :postcondition: get the current scroll region
+    :return: a tuple of two positive integers representing the first and last row of the scroll region,
+             or None if the whole screen scrolls
+    """
+    return _screen_state["scroll_region"]
+
+
+def query_screen_size():
+    """
+    Ask the terminal for its dimensions as a tuple.
 
     :postcondition: get a tuple representing the width and height of the terminal
-    :return: a tuple of two integers representing the width and height of the terminal
+    :return: a tuple of two integers representing the width and height of the terminal,
+             or None if the terminal size cannot be read
     """
     try:
         dimensions = os.get_terminal_size()
@@ -30,6 +153,86 @@ def get_screen_size():
         return (dimensions.columns, dimensions.lines)
 
 
+def handle_resize_signal(_, __):
+    """
+    Mark the cached terminal size as out of date.
+
+    :postcondition: the next call to get_screen_size() asks the terminal for its size
+    """
+    _screen_state["size_stale"] = True
+
+
+def watch_screen_resize():
+    """
+    Start invalidating the cached terminal size whenever the terminal is resized.
+
+    If no SIGWINCH handler can be installed, the size is re-checked at most twice a second instead.
+
+    :postcondition: install a SIGWINCH handler, or fall back to polling the terminal size
+    """
+    _screen_state["watching"] = True
+    try:
+        signal.signal(signal.SIGWINCH, handle_resize_signal)
+    except (AttributeError, ValueError):
+        # Windows has no SIGWINCH, and handlers can only be installed from the main thread
+        _screen_state["polling"] = True
+
+
+def set_screen_size_override(size):
+    """
+    Report <size> as the terminal size instead of asking the terminal.
+
+    :param size: a tuple of two positive integers representing the width and height to report,
+                 or None to use the real terminal size again
+    :precondition: size must be a tuple of two positive integers or None
+    :postcondition: get_screen_size() returns <size> until the override is removed
+    :postcondition: reset the scroll region and notify screen listeners of a "resize" event if the override changed
+
+    >>> set_screen_size_override((40, 10))
+    >>> get_screen_size()
+    (40, 10)
+    >>> set_screen_size_override(None)
+    """
+    previous_override = _screen_state["override"]
+    _screen_state["override"] = size
+    _screen_state["size_stale"] = True
+    if size != previous_override:
+        set_scroll_region()
+        notify_screen_listeners("resize")
+
+
+def get_screen_size():
+    """
+    Get the dimensions of the terminal as a tuple.
+
+    The size is cached and only read from the terminal again after it has been resized.
+    A size set with set_screen_size_override() is returned without asking the terminal.
+    Listeners added with add_screen_listener() receive a "resize" event when the size changes.
+
+    :postcondition: get a tuple representing the width and height of the terminal
+    :postcondition: reset the scroll region and notify screen listeners of a "resize" event
+                    if the size changed since the last call
+    :return: a tuple of two integers representing the width and height of the terminal,
+             or None if the terminal size cannot be read
+    """
+    if not _screen_state["override"] is None:
+        return _screen_state["override"]
+    if not _screen_state["watching"]:
+        watch_screen_resize()
+    if _screen_state["polling"] and monotonic() - _screen_state["checked_at"] > 0.5:
+        _screen_state["size_stale"] = True
+    if _screen_state["size_stale"]:
+        previous_size = _screen_state["size"]
+        _screen_state["size"] = query_screen_size()
+        _screen_state["size_stale"] = _screen_state["size"] is None
+        _screen_state["checked_at"] = monotonic()
+        if not previous_size is None and _screen_state["size"] != previous_size:
+            # A scroll region set for the old size may no longer fit the screen
+            set_scroll_region()
+            notify_screen_listeners("resize")
+    return _screen_state["size"]
+
+
 def point_within_screen(point: tuple | list) -> tuple:
     """
     Return <point> mapped to whether the value is within the terminal.
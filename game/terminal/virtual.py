@@ -0,0 +1,371 @@
+"""
+A headless virtual terminal that interprets the game's escape sequences into an in-memory screen.
+
+Selecting the virtual terminal with use_virtual_terminal() lets draws, menus and whole scenes run
+without a TTY, so benchmarks and tests can check exactly what would be on the screen.
+"""
+import re
+from types import SimpleNamespace
+
+from game.ansi_actions.styled_text import apply_style_code
+from game.terminal.frame import create_frame_buffer
+from game.terminal.output import set_output_stream, flush_output
+from game.terminal.screen import set_screen_size_override
+
+_CONTROL_SEQUENCE = re.compile(r"\033\[([0-?]*)[ -/]*([@-~])")
+_virtual_state = {"terminal": None}
+
+
+def create_virtual_terminal(width, height):
+    """
+    Return a blank virtual terminal dictionary of <width> by <height> cells.
+
+    A virtual terminal dictionary has the form:
+    {
+        "screen": <frame buffer dictionary of the cells on the screen>,
+        "column": <int of the 1-based cursor column>,
+        "row": <int of the 1-based cursor row>,
+        "style": <string of the SGR codes applied to the next printed character>,
+        "scroll_region": <tuple of the 1-based top and bottom rows that scroll>,
+        "cursor_visible": <bool>,
+        "pending": <string of an escape sequence split across writes>
+    }
+
+    :param width: a positive integer greater than 0 representing the columns of the terminal
+    :param height: a positive integer greater than 0 representing the rows of the terminal
+    :precondition: width must be a positive integer greater than 0
+    :precondition: height must be a positive integer greater than 0
+    :postcondition: get a virtual terminal with a blank screen and the cursor at (1, 1)
+    :return: a dictionary representing a blank virtual terminal
+
+    >>> terminal = create_virtual_terminal(4, 2)
+    >>> terminal["column"], terminal["row"], terminal["scroll_region"]
+    (1, 1, (1, 2))
+    >>> get_virtual_screen_rows(terminal)
+    ['', '']
+    """
+    return {
+        "screen": create_frame_buffer(width, height),
+        "column": 1,
+        "row": 1,
+        "style": "",
+        "scroll_region": (1, height),
+        "cursor_visible": True,
+        "pending": ""}
+
+
+def get_sequence_parameters(parameters, default):
+    """
+    Return the numeric parameters of a control sequence.
+
+    :param parameters: a string representing the parameters of a control sequence, such as "5;3"
+    :param default: an integer representing the value of parameters that are left empty
+    :precondition: parameters must be a string of digits separated by ";", optionally starting with "?"
+    :precondition: default must be an integer
+    :postcondition: get the parameters as integers, using <default> for empty ones
+    :return: a list of integers representing the parameters of the control sequence
+
+    >>> get_sequence_parameters("5;3", 1)
+    [5, 3]
+    >>> get_sequence_parameters("", 1)
+    [1]
+    >>> get_sequence_parameters(";7", 1)
+    [1, 7]
+    """
+    return [int(parameter) if parameter else default for parameter in parameters.lstrip("?").split(";")]
+
+
+def erase_virtual_cells(terminal, row, start, stop):
+    """
+    Blank the cells of <row> from column <start> up to but not including column <stop>.
+
+    :param terminal: a dictionary representing the virtual terminal to change
+    :param row: an integer representing the 1-based row to erase in
+    :param start: an integer representing the 1-based first column to erase
+    :param stop: an integer representing the 1-based column to stop erasing at
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :precondition: row must be within the screen of <terminal>
+    :postcondition: the cells from <start> to <stop> in <row> are unstyled spaces
+    """
+    cells = terminal["screen"]["cells"][row - 1]
+    for column_index in range(max(1, start), min(stop, terminal["screen"]["width"] + 1)):
+        cells[column_index - 1] = (" ", "")
+
+
+def line_feed_virtual_terminal(terminal):
+    """
+    Move the cursor of <terminal> down a row, scrolling the scroll region if the cursor is at its bottom.
+
+    :param terminal: a dictionary representing the virtual terminal to change
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :postcondition: the cursor is one row lower, or the scroll region moved up by a row
+
+    >>> terminal = create_virtual_terminal(3, 2)
+    >>> feed_virtual_terminal(terminal, "top\\033[2;1Hend")
+    >>> line_feed_virtual_terminal(terminal)
+    >>> get_virtual_screen_rows(terminal)
+    ['end', '']
+    """
+    top, bottom = terminal["scroll_region"]
+    if terminal["row"] == bottom:
+        cells = terminal["screen"]["cells"]
+        del cells[top - 1]
+        cells.insert(bottom - 1, [(" ", "") for _ in range(terminal["screen"]["width"])])
+    elif terminal["row"] < terminal["screen"]["height"]:
+        terminal["row"] += 1
+
+
+def print_to_virtual_terminal(terminal, text):
+    """
+    Put the characters of <text> on the screen of <terminal> at its cursor.
+
+    Newlines also return the cursor to the first column, like a TTY that translates "\\n" to "\\r\\n".
+    Printing past the last column wraps to the next row.
+
+    :param terminal: a dictionary representing the virtual terminal to print to
+    :param text: a string representing text without escape sequences
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :precondition: text must be a string without escape sequences
+    :postcondition: the characters of <text> are on the screen with the current style
+    :postcondition: the cursor is moved past the printed characters
+
+    >>> terminal = create_virtual_terminal(4, 3)
+    >>> print_to_virtual_terminal(terminal, "abcdef\\nxy\\rz")
+    >>> get_virtual_screen_rows(terminal)
+    ['abcd', 'ef', 'zy']
+    """
+    screen = terminal["screen"]
+    for glyph in text:
+        if glyph == "\n":
+            terminal["column"] = 1
+            line_feed_virtual_terminal(terminal)
+        elif glyph == "\r":
+            terminal["column"] = 1
+        elif glyph == "\b":
+            terminal["column"] = max(1, min(terminal["column"], screen["width"]) - 1)
+        elif glyph == "\t":
+            terminal["column"] = min(screen["width"], (terminal["column"] - 1) // 8 * 8 + 9)
+        elif glyph.isprintable():
+            if terminal["column"] > screen["width"]:
+                terminal["column"] = 1
+                line_feed_virtual_terminal(terminal)
+            screen["cells"][terminal["row"] - 1][terminal["column"] - 1] = (glyph, terminal["style"])
+            terminal["column"] += 1
+
+
+def run_control_sequence(terminal, sequence, parameters, command):
+    """
+    Apply one control sequence to <terminal>.
+
+    Supported sequences are cursor position (H, f), relative cursor moves (A, B, C, D, E, F, G, d),
+    styles (m), screen and line erases (J, K), scroll regions (r), and cursor visibility (?25h, ?25l).
+    Other sequences are ignored.
+
+    :param terminal: a dictionary representing the virtual terminal to change
+    :param sequence: a string representing the whole control sequence
+    :param parameters: a string representing the parameters of the control sequence
+    :param command: a string representing the final character of the control sequence
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :precondition: sequence, parameters, and command must be strings from one control sequence
+    :postcondition: <terminal> is changed the way a real terminal would be by <sequence>
+    """
+    screen = terminal["screen"]
+    values = get_sequence_parameters(parameters, 1)
+    amount = max(1, values[0])
+    if command in "Hf":
+        terminal["row"] = min(max(1, values[0]), screen["height"])
+        terminal["column"] = min(max(1, values[1] if len(values) > 1 else 1), screen["width"])
+    elif command == "A":
+        # Relative moves that start inside of the scroll region stop at its margins
+        top = terminal["scroll_region"][0]
+        terminal["row"] = max(top if terminal["row"] >= top else 1, terminal["row"] - amount)
+    elif command == "B":
+        bottom = terminal["scroll_region"][1]
+        terminal["row"] = min(bottom if terminal["row"] <= bottom else screen["height"], terminal["row"] + amount)
+    elif command == "C":
+        terminal["column"] = min(screen["width"], terminal["column"] + amount)
+    elif command == "D":
+        terminal["column"] = max(1, min(terminal["column"], screen["width"]) - amount)
+    elif command in "EF":
+        direction = 1 if command == "E" else -1
+        terminal["row"] = min(max(1, terminal["row"] + direction * amount), screen["height"])
+        terminal["column"] = 1
+    elif command == "G":
+        terminal["column"] = min(amount, screen["width"])
+    elif command == "d":
+        terminal["row"] = min(amount, screen["height"])
+    elif command == "m":
+        terminal["style"] = apply_style_code(terminal["style"], sequence)
+    elif command == "J":
+        mode = get_sequence_parameters(parameters, 0)[0]
+        if mode in (0, 2):
+            erase_virtual_cells(terminal, terminal["row"], terminal["column"] if mode == 0 else 1, screen["width"] + 1)
+            for row_index in range(terminal["row"] + 1, screen["height"] + 1):
+                erase_virtual_cells(terminal, row_index, 1, screen["width"] + 1)
+        if mode in (1, 2):
+            erase_virtual_cells(terminal, terminal["row"], 1, terminal["column"] + 1 if mode == 1 else 1)
+            for row_index in range(1, terminal["row"]):
+                erase_virtual_cells(terminal, row_index, 1, screen["width"] + 1)
+    elif command == "K":
+        mode = get_sequence_parameters(parameters, 0)[0]
+        start = 1 if mode in (1, 2) else terminal["column"]
+        stop = terminal["column"] + 1 if mode == 1 else screen["width"] + 1
+        erase_virtual_cells(terminal, terminal["row"], start, stop)
+    elif command == "r":
+        top = values[0]
+        bottom = values[1] if len(values) > 1 else screen["height"]
+        if 1 <= top < bottom <= screen["height"]:
+            terminal["scroll_region"] = (top, bottom)
+            terminal["column"], terminal["row"] = 1, 1
+    elif command in "hl" and parameters == "?25":
+        terminal["cursor_visible"] = command == "h"
+
+
+def feed_virtual_terminal(terminal, text):
+    """
+    Interpret <text> as terminal output and apply it to <terminal>.
+
+    An escape sequence cut off at the end of <text> is kept until the next call.
+
+    :param terminal: a dictionary representing the virtual terminal to write to
+    :param text: a string representing terminal output with ANSI escape sequences
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :precondition: text must be a string
+    :postcondition: the screen, cursor, and style of <terminal> are updated by <text>
+
+    >>> terminal = create_virtual_terminal(6, 2)
+    >>> feed_virtual_terminal(terminal, "\\033[2;3H\\033[1mhi\\033[")
+    >>> feed_virtual_terminal(terminal, "0m!")
+    >>> get_virtual_screen_rows(terminal)
+    ['', '  hi!']
+    >>> get_virtual_cell(terminal, 3, 2), get_virtual_cell(terminal, 5, 2)
+    (('h', '\\x1b[1m'), ('!', ''))
+    >>> feed_virtual_terminal(terminal, "\\033[2;4H\\033[K")
+    >>> get_virtual_screen_rows(terminal)
+    ['', '  h']
+    """
+    text = terminal["pending"] + text
+    terminal["pending"] = ""
+    position = 0
+    while position < len(text):
+        escape_index = text.find("\033", position)
+        if escape_index == -1:
+            print_to_virtual_terminal(terminal, text[position:])
+            break
+        print_to_virtual_terminal(terminal, text[position:escape_index])
+        match = _CONTROL_SEQUENCE.match(text, escape_index)
+        if match:
+            run_control_sequence(terminal, match.group(0), match.group(1), match.group(2))
+            position = match.end()
+        elif re.fullmatch(r"\033(\[[0-?]*[ -/]*)?", text[escape_index:]):
+            terminal["pending"] = text[escape_index:]
+            break
+        else:
+            # Two character escapes, such as saving the cursor, are not drawn
+            position = escape_index + 2
+
+
+def get_virtual_cell(terminal, column, row):
+    """
+    Return the glyph and style of the cell at (<column>, <row>) on the screen of <terminal>.
+
+    :param terminal: a dictionary representing the virtual terminal to read
+    :param column: a positive integer representing the 1-based column of the cell
+    :param row: a positive integer representing the 1-based row of the cell
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :precondition: (column, row) must be within the screen of <terminal>
+    :postcondition: get the cell at (<column>, <row>)
+    :return: a tuple of form (<glyph>, <style>) representing the cell
+    """
+    return terminal["screen"]["cells"][row - 1][column - 1]
+
+
+def get_virtual_screen_rows(terminal):
+    """
+    Return the visible text on each row of the screen of <terminal>.
+
+    Styles are left out and trailing spaces are removed from each row.
+
+    :param terminal: a dictionary representing the virtual terminal to read
+    :precondition: terminal must be a well-formed virtual terminal dictionary
+    :postcondition: get one string per row of the screen
+    :return: a list of strings representing the text on each row of the screen
+
+    >>> terminal = create_virtual_terminal(5, 2)
+    >>> feed_virtual_terminal(terminal, "\\033[31mred\\033[0m")
+    >>> get_virtual_screen_rows(terminal)
+    ['red', '']
+    """
+    return ["".join(glyph for glyph, _ in cells).rstrip() for cells in terminal["screen"]["cells"]]
+
+
+def use_virtual_terminal(width=80, height=24):
+    """
+    Send all terminal output to a new virtual terminal of <width> by <height> cells.
+
+    The screen size reported by get_screen_size() becomes (<width>, <height>) until stop_virtual_terminal().
+
+    :param width: (default 80) a positive integer greater than 0 representing the columns of the terminal
+    :param height: (default 24) a positive integer greater than 0 representing the rows of the terminal
+    :precondition: width and height must be positive integers greater than 0
+    :postcondition: flushed output is interpreted by the virtual terminal instead of written to standard output
+    :return: a dictionary representing the virtual terminal now receiving output
+
+    >>> terminal = use_virtual_terminal(10, 2)
+    >>> from game.terminal.output import write_output
+    >>> write_output("\\033[2;5Hok")
+    >>> flush_output()
+    >>> get_virtual_screen_rows(terminal)
+    ['', '    ok']
+    >>> stop_virtual_terminal()
+    """
+    flush_output()
+    terminal = create_virtual_terminal(width, height)
+    _virtual_state["terminal"] = terminal
+    set_output_stream(SimpleNamespace(write=lambda text: feed_virtual_terminal(terminal, text), flush=lambda: None))
+    set_screen_size_override((width, height))
+    return terminal
+
+
+def get_virtual_terminal():
+    """
+    Return the virtual terminal currently receiving output.
+
+    :postcondition: get the virtual terminal selected by use_virtual_terminal()
+    :return: a dictionary representing the virtual terminal, or None if output goes to a real terminal
+    """
+    return _virtual_state["terminal"]
+
+
+def stop_virtual_terminal():
+    """
+    Send terminal output to standard output again.
+
+    :postcondition: buffered output is sent to the virtual terminal first
+    :postcondition: output and the screen size come from the real terminal afterward
+    """
+    flush_output()
+    _virtual_state["terminal"] = None
+    set_output_stream(None)
+    set_screen_size_override(None)
+
+
+def main():
+    """
+    Drive the program.
+    """
+    from timeit import timeit
+    from game.terminal.draw import draw_text_box, draw_rectangle
+
+    terminal = use_virtual_terminal(30, 6)
+    draw_rectangle(1, 1, 30, 6)
+    draw_text_box(3, 3, 26, 2, "\033[32mRendered without a TTY\033[0m\nin memory")
+    calls = 2000
+    seconds = timeit(lambda: draw_text_box(3, 3, 26, 2, "\033[1mBenchmark\033[0m", overwrite=True), number=calls)
+    stop_virtual_terminal()
+    print("\n".join(get_virtual_screen_rows(terminal)))
+    print(f"draw_text_box() takes {seconds / calls * 1e6:.1f} µs per call")
+
+
+if __name__ == '__main__':
+    main()
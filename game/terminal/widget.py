@@ -0,0 +1,397 @@
+"""
+Retained-mode widgets that remember their layout and only repaint when something changed.
+
+A widget dictionary has the form:
+{
+    "kind": <"pane", "box", "text", or "menu">,
+    "layout": <function taking the parent area and the content, returning the widget's area>,
+    "content": <string or styled text drawn inside the widget>,
+    "children": <list of widget dictionaries drawn on top of the widget>,
+    "area": <cached (<column>, <row>, <width>, <height>) tuple, or None before the first layout>,
+    "parent_area": <the parent area the cached area was computed from>,
+    "dirty": <bool of whether the widget has to be repainted>,
+    "layout_generation": <int of the screen layout the cached area belongs to>,
+    "paint_generation": <int of the screen contents the widget was last painted on>
+}
+
+Menu widgets also have "options": <tuple of strings> and "selected": <int index of the highlighted option>.
+"""
+from game.ansi_actions.cursor import cursor_move_to
+from game.ansi_actions.styled_text import as_styled_text, join_styled_text, pad_styled_text, split_styled_text
+from game.terminal import output
+from game.terminal.draw import (
+    create_text_area, draw_batch, draw_rectangle, draw_text_box, get_draw_batch)
+from game.terminal.frame import get_active_frame, get_presented_frame, scroll_frame
+from game.terminal.screen import add_screen_listener, get_screen_size, set_scroll_region
+
+_widget_state = {"layout_generation": 0, "paint_generation": 0}
+
+
+def create_widget(kind, layout, content="", children=()):
+    """
+    Return a new widget dictionary.
+
+    :param kind: a string representing how the widget is painted: "pane", "box", "text", or "menu"
+    :param layout: a function that takes the parent area and the content and returns the widget's area,
+                   where areas are tuples of form (<column>, <row>, <width>, <height>)
+    :param content: (default "") a string or styled text representing what to draw inside the widget
+    :param children: (default ()) an iterable of widget dictionaries drawn on top of the widget
+    :precondition: kind must be "pane", "box", "text", or "menu"
+    :precondition: layout must be a function that returns a tuple of four integers
+    :precondition: content must be a string or styled text
+    :precondition: children must be an iterable of well-formed widget dictionaries
+    :postcondition: get a widget that is laid out and painted on the next call to draw_widgets()
+    :return: a dictionary representing the widget
+
+    >>> widget = create_widget("text", lambda parent, content: (1, 1, 5, 1), "hi")
+    >>> widget["kind"], widget["dirty"], widget["area"]
+    ('text', True, None)
+    """
+    return {
+        "kind": kind,
+        "layout": layout,
+        "content": content,
+        "children": list(children),
+        "area": None,
+        "parent_area": None,
+        "dirty": True,
+        "layout_generation": -1,
+        "paint_generation": -1}
+
+
+def create_pane(layout, *children):
+    """
+    Return a pane widget that groups <children> without painting anything itself.
+
+    :param layout: a function that takes the parent area and the content and returns the pane's area
+    :param children: widget dictionaries representing the widgets laid out inside the pane
+    :precondition: layout must be a function that returns a tuple of four integers
+    :precondition: children must be well-formed widget dictionaries
+    :postcondition: get a pane widget holding <children>
+    :return: a dictionary representing the pane widget
+    """
+    return create_widget("pane", layout, children=children)
+
+
+def create_box(layout, content=""):
+    """
+    Return a box widget that paints a border with <content> inside of it.
+
+    :param layout: a function that takes the parent area and the content and returns the box's area, border included
+    :param content: (default "") a string or styled text representing the text inside the border
+    :precondition: layout must be a function that returns a tuple of four integers, with a width and height of at least 2
+    :precondition: content must be a string or styled text
+    :postcondition: get a box widget
+    :return: a dictionary representing the box widget
+    """
+    return create_widget("box", layout, content)
+
+
+def create_text_widget(layout, content=""):
+    """
+    Return a text widget that fills its area with <content>.
+
+    :param layout: a function that takes the parent area and the content and returns the text's area
+    :param content: (default "") a string or styled text representing the text to draw
+    :precondition: layout must be a function that returns a tuple of four integers
+    :precondition: content must be a string or styled text
+    :postcondition: get a text widget
+    :return: a dictionary representing the text widget
+    """
+    return create_widget("text", layout, content)
+
+
+def create_menu_widget(layout, options, selected=0):
+    """
+    Return a menu widget that lists <options> with the <selected> option highlighted.
+
+    :param layout: a function that takes the parent area and the content and returns the menu's area
+    :param options: an iterable of strings representing the names of the menu options
+    :param selected: (default 0) an integer representing the index of the highlighted option
+    :precondition: layout must be a function that returns a tuple of four integers
+    :precondition: options must be an iterable of strings
+    :precondition: selected must be a valid index of <options>
+    :postcondition: get a menu widget
+    :return: a dictionary representing the menu widget
+    """
+    widget = create_widget("menu", layout)
+    widget["options"] = tuple(options)
+    widget["selected"] = selected
+    return widget
+
+
+def fill_layout(parent_area, _):
+    """
+    Return <parent_area>, for widgets that cover all of their parent.
+
+    :param parent_area: a tuple of four integers representing the area of the parent widget
+    :precondition: parent_area must be a tuple of form (<column>, <row>, <width>, <height>)
+    :postcondition: get the area of the parent
+    :return: a tuple of four integers representing <parent_area>
+
+    >>> fill_layout((1, 1, 80, 24), "")
+    (1, 1, 80, 24)
+    """
+    return parent_area
+
+
+def get_screen_area():
+    """
+    Return the area of the whole terminal screen.
+
+    :postcondition: get the screen as an area, or an 80 by 24 area if the size cannot be read
+    :return: a tuple of form (1, 1, <width>, <height>) representing the screen
+    """
+    screen_width, screen_height = get_screen_size() or (80, 24)
+    return 1, 1, screen_width, screen_height
+
+
+def set_widget_content(widget, content):
+    """
+    Change what <widget> shows, marking it to be repainted only if the content is different.
+
+    :param widget: a dictionary representing the widget to change
+    :param content: a string or styled text representing the new content
+    :precondition: widget must be a well-formed widget dictionary
+    :precondition: content must be a string or styled text
+    :postcondition: <widget> is repainted and laid out again on the next draw if <content> changed
+
+    >>> widget = create_text_widget(fill_layout, "same")
+    >>> widget["dirty"] = False
+    >>> set_widget_content(widget, "same")
+    >>> widget["dirty"]
+    False
+    >>> set_widget_content(widget, "new")
+    >>> widget["dirty"]
+    True
+    """
+    if widget["content"] == content:
+        return
+    widget["content"] = content
+    widget["dirty"] = True
+    # The layout may depend on the content, such as a box sized to its text
+    widget["layout_generation"] = -1
+
+
+def set_menu_options(widget, options, selected):
+    """
+    Change the options and highlighted option of the menu <widget>, marking it dirty only if they changed.
+
+    :param widget: a dictionary representing the menu widget to change
+    :param options: an iterable of strings representing the names of the menu options
+    :param selected: an integer representing the index of the highlighted option
+    :precondition: widget must be a well-formed menu widget dictionary
+    :precondition: options must be an iterable of strings
+    :precondition: selected must be a valid index of <options>
+    :postcondition: <widget> is repainted on the next draw if its options or selection changed
+    """
+    options = tuple(options)
+    if (widget["options"], widget["selected"]) == (options, selected):
+        return
+    widget["options"], widget["selected"] = options, selected
+    widget["dirty"] = True
+
+
+def mark_widget_dirty(widget):
+    """
+    Repaint <widget> on the next draw even if it has not changed.
+
+    :param widget: a dictionary representing the widget to repaint
+    :precondition: widget must be a well-formed widget dictionary
+    :postcondition: <widget> and its children are repainted on the next call to draw_widgets()
+    """
+    widget["dirty"] = True
+
+
+def get_widget_area(widget, parent_area):
+    """
+    Return the area of <widget> inside <parent_area>, laying it out only when needed.
+
+    The area is computed again only after the screen is resized, the content changes, or <parent_area> changes.
+
+    :param widget: a dictionary representing the widget to lay out
+    :param parent_area: a tuple of four integers representing the area of the parent widget
+    :precondition: widget must be a well-formed widget dictionary
+    :precondition: parent_area must be a tuple of form (<column>, <row>, <width>, <height>)
+    :postcondition: get the cached area of <widget>, computing it first if it is out of date
+    :postcondition: <widget> is marked dirty if its area moved
+    :return: a tuple of form (<column>, <row>, <width>, <height>) representing the area of <widget>
+
+    >>> calls = []
+    >>> widget = create_text_widget(lambda parent, content: calls.append(parent) or (2, 2, 3, 1))
+    >>> get_widget_area(widget, (1, 1, 10, 5)), get_widget_area(widget, (1, 1, 10, 5))
+    ((2, 2, 3, 1), (2, 2, 3, 1))
+    >>> len(calls)
+    1
+    """
+    if widget["layout_generation"] != _widget_state["layout_generation"] or widget["parent_area"] != parent_area:
+        area = widget["layout"](parent_area, widget["content"])
+        if area != widget["area"]:
+            widget["dirty"] = True
+        widget["area"] = area
+        widget["parent_area"] = parent_area
+        widget["layout_generation"] = _widget_state["layout_generation"]
+    return widget["area"]
+
+
+def paint_widget(widget):
+    """
+    Draw <widget> in its cached area without flushing the output.
+
+    :param widget: a dictionary representing the widget to paint
+    :precondition: widget must be a well-formed widget dictionary that has been laid out
+    :postcondition: draw <widget> to the terminal, or to the active frame if one is being composited
+    :postcondition: panes draw nothing themselves
+    """
+    column, row, width, height = widget["area"]
+    if widget["kind"] == "box":
+        draw_rectangle(column, row, width, height, flush_output=False)
+        draw_text_box(
+            column + 1, row + 1, width - 2, height - 2, widget["content"], overwrite=True, flush_output=False)
+    elif widget["kind"] == "text":
+        draw_text_box(column, row, width, height, widget["content"], overwrite=True, flush_output=False)
+    elif widget["kind"] == "menu":
+        options = list(map(as_styled_text, widget["options"]))
+        options[widget["selected"]] = join_styled_text("", ("< ", options[widget["selected"]], " >"))
+        draw_text_box(
+            text_area=create_text_area(
+                column, row, width, height,
+                join_styled_text("\n", (pad_styled_text(option, width) for option in options))),
+            overwrite=True, flush_output=False)
+
+
+def draw_widgets(widget, parent_area=None, force=False):
+    """
+    Draw the widgets in the tree of <widget> that changed since they were last painted, with a single flush.
+
+    When a frame is being composited every widget is painted into it, since each frame starts blank.
+
+    :param widget: a dictionary representing the root of the widget tree to draw
+    :param parent_area: (default None) a tuple of four integers representing the area <widget> is laid out in,
+                        or None to lay it out in the whole screen
+    :param force: (default False) a boolean representing whether to paint every widget in the tree
+    :precondition: widget must be a well-formed widget dictionary
+    :precondition: parent_area must be a tuple of form (<column>, <row>, <width>, <height>) or None
+    :precondition: force must be a boolean
+    :postcondition: paint the widgets that are dirty, moved, or were cleared off the screen, and their children
+    :postcondition: the painted widgets are drawn as one draw_batch(), so overlapping widgets send each cell once
+    :return: True if any widget was painted, otherwise False
+
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> terminal = use_virtual_terminal(12, 4)
+    >>> status = create_box(lambda parent, content: (1, 1, len(content) + 2, 3), "HP 9")
+    >>> draw_widgets(status), draw_widgets(status)
+    (True, False)
+    >>> get_virtual_screen_rows(terminal)
+    ['.----.', '|HP 9|', '`----´', '']
+    >>> set_widget_content(status, "HP 10")
+    >>> draw_widgets(status)
+    True
+    >>> get_virtual_screen_rows(terminal)
+    ['.-----.', '|HP 10|', '`-----´', '']
+    >>> stop_virtual_terminal()
+    """
+    with draw_batch():
+        return draw_widget_tree(widget, parent_area or get_screen_area(), force or get_active_frame() is not None)
+
+
+def draw_widget_tree(widget, parent_area, force):
+    """
+    Paint <widget> if it needs it, then its children, without flushing the output.
+
+    :param widget: a dictionary representing the widget to draw
+    :param parent_area: a tuple of four integers representing the area <widget> is laid out in
+    :param force: a boolean representing whether to paint <widget> even if it has not changed
+    :precondition: widget must be a well-formed widget dictionary
+    :precondition: parent_area must be a tuple of form (<column>, <row>, <width>, <height>)
+    :precondition: force must be a boolean
+    :postcondition: paint <widget> and the children that need it
+    :return: True if any widget was painted, otherwise False
+    """
+    area = get_widget_area(widget, parent_area)
+    repaint = force or widget["dirty"] or widget["paint_generation"] != _widget_state["paint_generation"]
+    if repaint:
+        paint_widget(widget)
+        widget["dirty"] = False
+        widget["paint_generation"] = _widget_state["paint_generation"]
+    painted = repaint
+    for child in widget["children"]:
+        # Children are painted over their parent, so they have to be painted again after it
+        painted = draw_widget_tree(child, area, repaint) or painted
+    return painted
+
+
+def scroll_text_widget(widget, content, parent_area=None):
+    """
+    Show <content> in the text <widget> by scrolling its rows with the terminal, if <content> is its text moved up.
+
+    The rows of <widget> become the terminal's scroll region, so moving the text up by a few rows only costs
+    the newlines that scroll it and the rows that come in at the bottom, instead of repainting every row.
+    The scroll region spans the whole width of the screen, so nothing else should be drawn beside <widget>.
+
+    :param widget: a dictionary representing the text widget to update
+    :param content: a string or styled text representing the new content, with one line per row of the widget
+    :param parent_area: (default None) a tuple of four integers representing the area <widget> is laid out in,
+                        or None to lay it out in the whole screen
+    :precondition: widget must be a well-formed text widget dictionary
+    :precondition: content must be a string or styled text
+    :precondition: parent_area must be a tuple of form (<column>, <row>, <width>, <height>) or None
+    :precondition: terminal must support the DECSTBM escape sequence
+    :postcondition: scroll <widget> and draw the new rows with one flush if <content> is its text moved up
+    :postcondition: nothing is drawn if the terminal may not show the current text of <widget>,
+                    such as while a frame or draw_batch() is open, or after it was cleared or moved
+    :return: True if <widget> now shows <content>, or False if it has to be drawn with draw_widgets()
+
+    >>> from game.terminal.virtual import use_virtual_terminal, get_virtual_screen_rows, stop_virtual_terminal
+    >>> from game.terminal.screen import set_scroll_region
+    >>> terminal = use_virtual_terminal(6, 4)
+    >>> log = create_text_widget(lambda parent, content: (1, 1, 6, 3), "a\\nb\\nc")
+    >>> draw_widgets(log)
+    True
+    >>> scroll_text_widget(log, "b\\nc\\nd"), get_virtual_screen_rows(terminal)
+    (True, ['b', 'c', 'd', ''])
+    >>> scroll_text_widget(log, "x\\ny\\nz")
+    False
+    >>> set_scroll_region()
+    >>> stop_virtual_terminal()
+    """
+    if get_active_frame() or get_draw_batch():
+        return False
+    column, row, width, height = get_widget_area(widget, parent_area or get_screen_area())
+    if widget["dirty"] or widget["paint_generation"] != _widget_state["paint_generation"] or height < 2:
+        return False
+    old_rows = split_styled_text(as_styled_text(widget["content"]))
+    new_rows = split_styled_text(as_styled_text(content))
+    if not len(old_rows) == len(new_rows) == height:
+        return False
+    lines = next((lines for lines in range(1, height) if old_rows[lines:] == new_rows[:-lines]), None)
+    if lines is None:
+        return False
+    bottom = row + height - 1
+    set_scroll_region(row, bottom)
+    cursor_move_to(column, bottom)
+    # A newline on the bottom row of the scroll region scrolls it up, and the style is reset so new rows are blank
+    output.write_output("\n" * lines)
+    presented = get_presented_frame()
+    if presented:
+        scroll_frame(presented, row, bottom, lines)
+    widget["content"] = content
+    draw_text_box(column, bottom - lines + 1, width, lines, join_styled_text("\n", new_rows[-lines:]))
+    return True
+
+
+def handle_screen_event(event_name):
+    """
+    Keep widgets in sync with screen wide changes.
+
+    :param event_name: a string representing the screen event that happened
+    :precondition: event_name must be a string
+    :postcondition: every widget is laid out again after a "resize" event
+    :postcondition: every widget is repainted on its next draw after any screen event
+    """
+    if event_name == "resize":
+        _widget_state["layout_generation"] += 1
+    _widget_state["paint_generation"] += 1
+
+
+add_screen_listener(handle_screen_event)
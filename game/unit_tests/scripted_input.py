@@ -0,0 +1,49 @@
+"""
+Terminal input fed from a script of keys, shared by the input tests.
+"""
+import threading
+from collections import deque
+
+from game.terminal.input import init_key_input, start_input_reader, stop_input_reader
+
+
+def start_scripted_input(keys):
+    """
+    Return terminal input info whose running reader thread has read <keys>, and an Event that releases it.
+
+    :param keys: an iterable of strings representing the names of the keys to press, in order
+    :precondition: keys must be an iterable of strings
+    :postcondition: get input info from init_key_input() with an input reader started on it
+    :postcondition: every key in <keys> is waiting in the input info's "events" when this returns
+    :postcondition: the reader waits on the returned Event once <keys> run out
+    :return: a tuple of form (<input info dictionary>, <threading.Event ending the script>)
+    """
+    finished = threading.Event()
+    keys = deque(keys)
+    key_count = len(keys)
+
+    def key_get(_):
+        if keys:
+            return keys.popleft()
+        finished.wait()
+        return "done"
+
+    input_info = init_key_input()
+    input_info["key_get"] = key_get
+    start_input_reader(input_info)
+    with input_info["event_ready"]:
+        input_info["event_ready"].wait_for(lambda: len(input_info["events"]) == key_count, 1)
+    return input_info, finished
+
+
+def stop_scripted_input(input_info, finished):
+    """
+    Stop the reader of input info from start_scripted_input().
+
+    :param input_info: a dictionary representing the input info from start_scripted_input()
+    :param finished: a threading.Event representing the Event from start_scripted_input()
+    :precondition: input_info and finished must come from the same start_scripted_input() call
+    :postcondition: the reader is stopped and released from waiting for another key
+    """
+    stop_input_reader(input_info)
+    finished.set()
@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from game.terminal.input import build_key_trie, decode_key, get_key_codes
+
+
+def create_reader(text):
+    characters = list(text)
+    return lambda timeout: characters.pop(0) if characters else None
+
+
+class TestDecodeKey(TestCase):
+    def setUp(self):
+        self.key_trie = build_key_trie(get_key_codes("posix"))
+
+    def test_arrow(self):
+        expected = ("up", "")
+        actual = decode_key(self.key_trie, create_reader("\033[A"))
+        self.assertEqual(expected, actual)
+
+    def test_ss3_arrow(self):
+        expected = ("left", "")
+        actual = decode_key(self.key_trie, create_reader("\033OD"))
+        self.assertEqual(expected, actual)
+
+    def test_lone_escape(self):
+        expected = ("escape", "")
+        actual = decode_key(self.key_trie, create_reader("\033"))
+        self.assertEqual(expected, actual)
+
+    def test_escape_then_letter(self):
+        expected = ("escape", "q")
+        actual = decode_key(self.key_trie, create_reader("\033q"))
+        self.assertEqual(expected, actual)
+
+    def test_tilde_key(self):
+        expected = ("page_down", "")
+        actual = decode_key(self.key_trie, create_reader("\033[6~"))
+        self.assertEqual(expected, actual)
+
+    def test_unknown_sequence_read_whole(self):
+        expected = ("\033[42;7~", "")
+        actual = decode_key(self.key_trie, create_reader("\033[42;7~"))
+        self.assertEqual(expected, actual)
+
+    def test_plain_character(self):
+        expected = ("a", "")
+        actual = decode_key(self.key_trie, create_reader("a"))
+        self.assertEqual(expected, actual)
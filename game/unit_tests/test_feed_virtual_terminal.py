@@ -0,0 +1,48 @@
+from unittest import TestCase
+
+from game.terminal.virtual import create_virtual_terminal, feed_virtual_terminal, get_virtual_screen_rows, \
+    get_virtual_cell
+
+
+class TestFeedVirtualTerminal(TestCase):
+    def test_cursor_position(self):
+        terminal = create_virtual_terminal(6, 3)
+        feed_virtual_terminal(terminal, "\033[3;4Hab\033[1;1Hc")
+        expected = ["c", "", "   ab"]
+        actual = get_virtual_screen_rows(terminal)
+        self.assertEqual(expected, actual)
+
+    def test_relative_moves(self):
+        terminal = create_virtual_terminal(6, 3)
+        feed_virtual_terminal(terminal, "\033[2B\033[3Cx\033[A\033[2Dy\033[1Ez")
+        expected = ["", "  y", "z  x"]
+        actual = get_virtual_screen_rows(terminal)
+        self.assertEqual(expected, actual)
+
+    def test_style_kept_with_cell(self):
+        terminal = create_virtual_terminal(4, 1)
+        feed_virtual_terminal(terminal, "\033[31m\033[1mA\033[0mB")
+        expected = [("A", "\033[1;31m"), ("B", "")]
+        actual = [get_virtual_cell(terminal, 1, 1), get_virtual_cell(terminal, 2, 1)]
+        self.assertEqual(expected, actual)
+
+    def test_erase_screen(self):
+        terminal = create_virtual_terminal(4, 2)
+        feed_virtual_terminal(terminal, "abcd\nefgh\033[H\033[2J")
+        expected = ["", ""]
+        actual = get_virtual_screen_rows(terminal)
+        self.assertEqual(expected, actual)
+
+    def test_erase_line_from_cursor(self):
+        terminal = create_virtual_terminal(4, 1)
+        feed_virtual_terminal(terminal, "abcd\033[1;3H\033[0K")
+        expected = ["ab"]
+        actual = get_virtual_screen_rows(terminal)
+        self.assertEqual(expected, actual)
+
+    def test_scroll_region(self):
+        terminal = create_virtual_terminal(3, 4)
+        feed_virtual_terminal(terminal, "top\033[2;3r\033[2;1Hone\ntwo\nsix\033[4;1Hend")
+        expected = ["top", "two", "six", "end"]
+        actual = get_virtual_screen_rows(terminal)
+        self.assertEqual(expected, actual)
@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from game.ansi_actions.cursor import get_cursor_move
+from game.terminal.output import flush_output
+from game.terminal.screen import set_scroll_region
+from game.terminal.virtual import use_virtual_terminal, stop_virtual_terminal
+
+
+class TestGetCursorMove(TestCase):
+    def setUp(self):
+        use_virtual_terminal(20, 10)
+
+    def tearDown(self):
+        set_scroll_region()
+        flush_output()
+        stop_virtual_terminal()
+
+    def test_next_row(self):
+        expected = "\r\n"
+        actual = get_cursor_move((8, 5), 1, 6)
+        self.assertEqual(expected, actual)
+
+    def test_next_row_inside_scroll_region(self):
+        set_scroll_region(2, 6)
+        expected = "\r\n"
+        actual = get_cursor_move((8, 5), 1, 6)
+        self.assertEqual(expected, actual)
+
+    def test_below_scroll_region_bottom(self):
+        set_scroll_region(2, 5)
+        expected = "\033[6H"
+        actual = get_cursor_move((8, 5), 1, 6)
+        self.assertEqual(expected, actual)
+
+    def test_above_scroll_region_top(self):
+        set_scroll_region(3, 5)
+        expected = "\033[2;8H"
+        actual = get_cursor_move((8, 3), 8, 2)
+        self.assertEqual(expected, actual)
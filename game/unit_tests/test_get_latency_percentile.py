@@ -0,0 +1,31 @@
+from unittest import TestCase
+
+from game.terminal.latency import add_latency, create_latency_histogram, get_latency_percentile
+
+
+class TestGetLatencyPercentile(TestCase):
+    def setUp(self):
+        self.histogram = create_latency_histogram()
+
+    def test_empty_histogram(self):
+        actual = get_latency_percentile(self.histogram, 50)
+        self.assertIsNone(actual)
+
+    def test_single_latency(self):
+        add_latency(self.histogram, 0.005)
+        expected = 0.0051
+        actual = get_latency_percentile(self.histogram, 99)
+        self.assertAlmostEqual(expected, actual)
+
+    def test_tail_is_slowest(self):
+        for seconds in [0.001] * 98 + [0.2, 0.2]:
+            add_latency(self.histogram, seconds)
+        expected = (0.0011, 0.0011, 0.2001)
+        actual = tuple(get_latency_percentile(self.histogram, percent) for percent in (50, 95, 99))
+        for expected_value, actual_value in zip(expected, actual):
+            self.assertAlmostEqual(expected_value, actual_value)
+
+    def test_never_understates(self):
+        add_latency(self.histogram, 0.01234)
+        actual = get_latency_percentile(self.histogram, 50)
+        self.assertGreaterEqual(actual, 0.01234)
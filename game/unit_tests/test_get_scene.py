@@ -0,0 +1,42 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from game.scene.scene import _scene_registry, get_scene, register_scene
+
+
+@patch.dict(_scene_registry["factories"])
+@patch.dict(_scene_registry["scenes"])
+class TestGetScene(TestCase):
+    def test_builds_once(self):
+        built = []
+        register_scene("test_builds_once", lambda: built.append(1) or {"name": "test_builds_once"})
+        get_scene("test_builds_once")
+        get_scene("test_builds_once")
+        expected = 1
+        actual = len(built)
+        self.assertEqual(expected, actual)
+
+    def test_not_built_until_used(self):
+        built = []
+        register_scene("test_not_built_until_used", lambda: built.append(1) or {})
+        expected = []
+        actual = built
+        self.assertEqual(expected, actual)
+
+    def test_reregister_rebuilds(self):
+        register_scene("test_reregister", lambda: {"name": "old"})
+        get_scene("test_reregister")
+        register_scene("test_reregister", lambda: {"name": "new"})
+        expected = "new"
+        actual = get_scene("test_reregister")["name"]
+        self.assertEqual(expected, actual)
+
+    def test_unknown_scene(self):
+        with self.assertRaises(KeyError):
+            get_scene("test_unknown_scene")
+
+    def test_build_error_passed_on(self):
+        register_scene("test_build_error", lambda: {}["missing"])
+        with self.assertRaises(KeyError) as caught:
+            get_scene("test_build_error")
+        self.assertEqual(("missing",), caught.exception.args)
@@ -0,0 +1,51 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from game.terminal.screen import get_screen_size, handle_resize_signal
+
+
+@patch.dict("game.terminal.screen._screen_state", {
+    "listeners": [], "size": None, "size_stale": True, "checked_at": 0.0, "watching": True, "polling": False})
+class TestGetScreenSize(TestCase):
+    @patch("game.terminal.screen.query_screen_size", side_effect=[(80, 24)])
+    def test_size_is_cached(self, query_mock):
+        expected = ((80, 24), (80, 24))
+        actual = (get_screen_size(), get_screen_size())
+        self.assertEqual(expected, actual)
+        self.assertEqual(1, query_mock.call_count)
+
+    @patch("game.terminal.screen.query_screen_size", side_effect=[(80, 24), (100, 30)])
+    def test_size_read_again_after_resize_signal(self, _):
+        get_screen_size()
+        handle_resize_signal(None, None)
+        expected = (100, 30)
+        actual = get_screen_size()
+        self.assertEqual(expected, actual)
+
+    @patch("game.terminal.screen.query_screen_size", side_effect=[(80, 24), (100, 30)])
+    def test_resize_event_published(self, _):
+        events = []
+        get_screen_size()
+        with patch.dict("game.terminal.screen._screen_state", {"listeners": [events.append]}):
+            handle_resize_signal(None, None)
+            get_screen_size()
+        expected = ["resize"]
+        actual = events
+        self.assertEqual(expected, actual)
+
+    @patch("game.terminal.screen.query_screen_size", side_effect=[(80, 24), (80, 24)])
+    def test_no_resize_event_for_same_size(self, _):
+        events = []
+        get_screen_size()
+        with patch.dict("game.terminal.screen._screen_state", {"listeners": [events.append]}):
+            handle_resize_signal(None, None)
+            get_screen_size()
+        expected = []
+        actual = events
+        self.assertEqual(expected, actual)
+
+    @patch("game.terminal.screen.query_screen_size", side_effect=[None, (80, 24)])
+    def test_unreadable_size_not_cached(self, _):
+        expected = (None, (80, 24))
+        actual = (get_screen_size(), get_screen_size())
+        self.assertEqual(expected, actual)
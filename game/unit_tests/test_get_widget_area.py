@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from game.terminal.screen import notify_screen_listeners
+from game.terminal.widget import create_text_widget, get_widget_area, set_widget_content
+
+
+def create_counted_widget(layouts):
+    def layout(parent, content):
+        layouts.append(content)
+        return parent[0] + 1, parent[1], len(content), 1
+
+    return create_text_widget(layout, "abc")
+
+
+class TestGetWidgetArea(TestCase):
+    def test_layout_cached(self):
+        layouts = []
+        widget = create_counted_widget(layouts)
+        get_widget_area(widget, (1, 1, 10, 5))
+        get_widget_area(widget, (1, 1, 10, 5))
+        expected = ["abc"]
+        actual = layouts
+        self.assertEqual(expected, actual)
+
+    def test_layout_after_content_change(self):
+        widget = create_counted_widget([])
+        get_widget_area(widget, (1, 1, 10, 5))
+        set_widget_content(widget, "abcdef")
+        expected = (2, 1, 6, 1)
+        actual = get_widget_area(widget, (1, 1, 10, 5))
+        self.assertEqual(expected, actual)
+
+    def test_layout_after_parent_change(self):
+        widget = create_counted_widget([])
+        get_widget_area(widget, (1, 1, 10, 5))
+        expected = (4, 2, 3, 1)
+        actual = get_widget_area(widget, (3, 2, 10, 5))
+        self.assertEqual(expected, actual)
+
+    def test_layout_after_resize(self):
+        layouts = []
+        widget = create_counted_widget(layouts)
+        get_widget_area(widget, (1, 1, 10, 5))
+        notify_screen_listeners("resize")
+        get_widget_area(widget, (1, 1, 10, 5))
+        expected = ["abc", "abc"]
+        actual = layouts
+        self.assertEqual(expected, actual)
+
+    def test_moved_widget_dirty(self):
+        widget = create_counted_widget([])
+        get_widget_area(widget, (1, 1, 10, 5))
+        widget["dirty"] = False
+        get_widget_area(widget, (2, 1, 10, 5))
+        expected = True
+        actual = widget["dirty"]
+        self.assertEqual(expected, actual)
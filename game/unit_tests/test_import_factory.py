@@ -0,0 +1,31 @@
+import subprocess
+import sys
+from pathlib import Path
+from unittest import TestCase
+
+from game.import_report import format_import_report
+
+
+class TestImportFactory(TestCase):
+    def get_modules_after(self, code):
+        result = subprocess.run(
+            [sys.executable, "-c", f"import sys\n{code}\nprint(' '.join(sys.modules))"],
+            cwd=Path(__file__).resolve().parents[2], capture_output=True, text=True, check=True)
+        return set(result.stdout.split())
+
+    def test_startup_skips_heavy_modules(self):
+        modules = self.get_modules_after("import game.game")
+        expected = set()
+        actual = modules & {"dill", "audioplayer", "game.seedOS", "game.seedOS.commands", "game.scene.scenes.startup"}
+        self.assertEqual(expected, actual)
+
+    def test_factory_is_lazy(self):
+        modules = self.get_modules_after(
+            "from game.scene.scene import import_factory\n"
+            "import_factory('game.scene.scenes.quit', 'qet_quit_scene')")
+        self.assertNotIn("game.scene.scenes.quit", modules)
+
+    def test_import_report_layout(self):
+        expected = "import time:      2500 |       2500 | game.module"
+        actual = format_import_report([("game.module", 0.0025, 0.0025, 0)]).split("\n")[1]
+        self.assertEqual(expected, actual)
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from game.terminal.line_editor import create_gap_buffer, get_gap_buffer_text, insert_into_gap_buffer, move_gap
+
+
+class TestInsertIntoGapBuffer(TestCase):
+    def test_insert_at_end(self):
+        gap_buffer = create_gap_buffer("ls")
+        insert_into_gap_buffer(gap_buffer, " -a")
+        expected = "ls -a"
+        actual = get_gap_buffer_text(gap_buffer)
+        self.assertEqual(expected, actual)
+
+    def test_insert_at_start(self):
+        gap_buffer = create_gap_buffer("seeds")
+        move_gap(gap_buffer, 0)
+        insert_into_gap_buffer(gap_buffer, "cd ")
+        expected = "cd seeds"
+        actual = get_gap_buffer_text(gap_buffer)
+        self.assertEqual(expected, actual)
+
+    def test_insert_in_middle_moves_cursor(self):
+        gap_buffer = create_gap_buffer("lok")
+        move_gap(gap_buffer, 2)
+        insert_into_gap_buffer(gap_buffer, "o")
+        expected = ("look", 3)
+        actual = (get_gap_buffer_text(gap_buffer), gap_buffer["gap_start"])
+        self.assertEqual(expected, actual)
+
+    def test_insert_grows_full_gap(self):
+        gap_buffer = create_gap_buffer("ab", 1)
+        move_gap(gap_buffer, 1)
+        insert_into_gap_buffer(gap_buffer, "x" * 100)
+        expected = "a" + "x" * 100 + "b"
+        actual = get_gap_buffer_text(gap_buffer)
+        self.assertEqual(expected, actual)
+
+    def test_insert_nothing(self):
+        gap_buffer = create_gap_buffer("cat")
+        move_gap(gap_buffer, 1)
+        insert_into_gap_buffer(gap_buffer, "")
+        expected = ("cat", 1)
+        actual = (get_gap_buffer_text(gap_buffer), gap_buffer["gap_start"])
+        self.assertEqual(expected, actual)
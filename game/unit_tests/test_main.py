@@ -0,0 +1,58 @@
+import os
+import select
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+
+@skipUnless(os.name == "posix", "the game is driven through a pseudo-terminal")
+class TestMain(TestCase):
+    def setUp(self):
+        import pty
+        self.terminal, self.game_terminal = pty.openpty()
+        self.game = None
+        self.output = b""
+
+    def start_game(self, columns, rows):
+        import fcntl
+        import struct
+        import termios
+        fcntl.ioctl(self.game_terminal, termios.TIOCSWINSZ, struct.pack("HHHH", rows, columns, 0, 0))
+        self.game = subprocess.Popen(
+            [sys.executable, "-m", "game.game"],
+            stdin=self.game_terminal, stdout=self.game_terminal, stderr=self.game_terminal,
+            cwd=Path(__file__).resolve().parents[2], start_new_session=True)
+        os.close(self.game_terminal)
+
+    def tearDown(self):
+        if self.game is None:
+            os.close(self.game_terminal)
+        else:
+            self.game.kill()
+            self.game.wait()
+        os.close(self.terminal)
+
+    def read_until(self, text, seconds=10):
+        deadline = time.monotonic() + seconds
+        while text not in self.output and time.monotonic() < deadline:
+            if select.select([self.terminal], [], [], 0.1)[0]:
+                try:
+                    self.output += os.read(self.terminal, 65536)
+                except OSError:
+                    break
+        return text in self.output
+
+    def test_gets_past_startup(self):
+        self.start_game(100, 35)
+        self.assertTrue(self.read_until(b"> "))
+        os.write(self.terminal, b"y\r")
+        self.assertTrue(self.read_until(b"Start"))
+
+    def test_startup_prompt_below_wrapped_lines(self):
+        self.start_game(60, 20)
+        self.assertTrue(self.read_until(b"> "))
+        os.write(self.terminal, b"x")
+        # Both lines above the blank line wrap onto 2 rows, so the prompt is on row 6
+        self.assertTrue(self.read_until(b"\x1b[6;3Hx"))
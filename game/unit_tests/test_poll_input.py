@@ -0,0 +1,49 @@
+from unittest import TestCase
+
+from game.terminal.input import poll_input, drain_input, stop_input_reader
+from game.unit_tests.scripted_input import start_scripted_input, stop_scripted_input
+
+
+class TestPollInput(TestCase):
+    def setUp(self):
+        self.input_info, self.finished = start_scripted_input(["a", "up", "enter"])
+
+    def tearDown(self):
+        stop_scripted_input(self.input_info, self.finished)
+
+    def test_events_in_order(self):
+        expected = ["a", "up", "enter"]
+        actual = [poll_input(self.input_info, 1)["key"] for _ in range(3)]
+        self.assertEqual(expected, actual)
+
+    def test_events_timestamped_in_order(self):
+        events = [poll_input(self.input_info, 1) for _ in range(3)]
+        expected = sorted(event["time"] for event in events)
+        actual = [event["time"] for event in events]
+        self.assertEqual(expected, actual)
+
+    def test_poll_timeout(self):
+        for _ in range(3):
+            poll_input(self.input_info, 1)
+        expected = None
+        actual = poll_input(self.input_info, 0.01)
+        self.assertEqual(expected, actual)
+
+    def test_drain(self):
+        poll_input(self.input_info, 1)
+        with self.input_info["event_ready"]:
+            self.input_info["event_ready"].wait_for(lambda: len(self.input_info["events"]) == 2, 1)
+        expected = ["up", "enter"]
+        actual = [event["key"] for event in drain_input(self.input_info)]
+        self.assertEqual(expected, actual)
+
+    def test_key_read_after_stop_dropped(self):
+        for _ in range(3):
+            poll_input(self.input_info, 1)
+        reader = self.input_info["reader"]
+        stop_input_reader(self.input_info)
+        self.finished.set()
+        reader.join(1)
+        expected = []
+        actual = list(self.input_info["events"])
+        self.assertEqual(expected, actual)
@@ -0,0 +1,59 @@
+import asyncio
+from collections import deque
+from unittest import TestCase
+
+from game.terminal.input import create_input_event, poll_key_event_async
+from game.unit_tests.scripted_input import start_scripted_input, stop_scripted_input
+
+
+class TestPollKeyEventAsync(TestCase):
+    def setUp(self):
+        self.input_info, self.finished = start_scripted_input([])
+
+    def tearDown(self):
+        stop_scripted_input(self.input_info, self.finished)
+
+    def test_returns_waiting_key(self):
+        self.input_info["events"].append(create_input_event("a"))
+        expected = "a"
+        actual = asyncio.run(poll_key_event_async(self.input_info))["key"]
+        self.assertEqual(expected, actual)
+
+    def test_queues_key(self):
+        self.input_info["events"].append(create_input_event("a"))
+        asyncio.run(poll_key_event_async(self.input_info))
+        expected = deque(["a"])
+        actual = self.input_info["input_queue"]
+        self.assertEqual(expected, actual)
+
+    def test_other_tasks_run_while_waiting(self):
+        ticks = []
+
+        async def press_key_later():
+            for tick in range(3):
+                ticks.append(tick)
+                await asyncio.sleep(0)
+            self.input_info["events"].append(create_input_event("b"))
+
+        async def run():
+            presser = asyncio.create_task(press_key_later())
+            event = await poll_key_event_async(self.input_info, 0)
+            await presser
+            return event["key"]
+
+        expected = ("b", [0, 1, 2])
+        actual = (asyncio.run(run()), ticks)
+        self.assertEqual(expected, actual)
+
+    def test_cancel_takes_no_key(self):
+        async def run():
+            poller = asyncio.create_task(poll_key_event_async(self.input_info, 0))
+            await asyncio.sleep(0)
+            poller.cancel()
+            await asyncio.wait((poller,))
+            self.input_info["events"].append(create_input_event("c"))
+
+        asyncio.run(run())
+        expected = (["c"], deque())
+        actual = ([event["key"] for event in self.input_info["events"]], self.input_info["input_queue"])
+        self.assertEqual(expected, actual)
@@ -0,0 +1,45 @@
+from collections import deque
+from unittest import TestCase
+
+from game.terminal.input import poll_key_repeat
+from game.unit_tests.scripted_input import start_scripted_input, stop_scripted_input
+
+
+class TestPollKeyRepeat(TestCase):
+    def tearDown(self):
+        stop_scripted_input(self.input_info, self.finished)
+
+    def test_merges_held_key(self):
+        self.input_info, self.finished = start_scripted_input(["down", "down", "down", "q"])
+        expected = ("down", 3)
+        event = poll_key_repeat(self.input_info, ("up", "down"))
+        actual = (event["key"], event["count"])
+        self.assertEqual(expected, actual)
+
+    def test_leaves_next_key_waiting(self):
+        self.input_info, self.finished = start_scripted_input(["down", "down", "q"])
+        poll_key_repeat(self.input_info, ("up", "down"))
+        expected = ["q"]
+        actual = [event["key"] for event in self.input_info["events"]]
+        self.assertEqual(expected, actual)
+
+    def test_queues_every_press(self):
+        self.input_info, self.finished = start_scripted_input(["up", "up"])
+        poll_key_repeat(self.input_info, ("up", "down"))
+        expected = deque(["up", "up"])
+        actual = self.input_info["input_queue"]
+        self.assertEqual(expected, actual)
+
+    def test_does_not_merge_other_keys(self):
+        self.input_info, self.finished = start_scripted_input(["a", "a"])
+        expected = ("a", 1)
+        event = poll_key_repeat(self.input_info, ("up", "down"))
+        actual = (event["key"], event["count"])
+        self.assertEqual(expected, actual)
+
+    def test_does_not_merge_different_keys(self):
+        self.input_info, self.finished = start_scripted_input(["up", "down", "up"])
+        expected = ("up", 1)
+        event = poll_key_repeat(self.input_info, ("up", "down"))
+        actual = (event["key"], event["count"])
+        self.assertEqual(expected, actual)
@@ -0,0 +1,52 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from game.terminal.input import (create_input_event, record_input_event, start_input_recording,
+                                 stop_input_recording, start_input_replay)
+
+
+class TestStartInputReplay(TestCase):
+    def setUp(self):
+        descriptor, self.path = tempfile.mkstemp(suffix=".keys")
+        os.close(descriptor)
+        self.input_info = {"key_get": lambda _: "keyboard", "recording": None}
+        start_input_recording(self.input_info, self.path)
+        start = self.input_info["recording"]["time"]
+        for offset, key in ((0.5, "a"), (0.75, "up"), (2.0, "enter")):
+            record_input_event(self.input_info["recording"], create_input_event(key, start + offset))
+        stop_input_recording(self.input_info)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_replays_keys_in_order(self):
+        start_input_replay(self.input_info, self.path, speed=0)
+        expected = ["a", "up", "enter"]
+        actual = [self.input_info["key_get"](self.input_info) for _ in range(3)]
+        self.assertEqual(expected, actual)
+
+    def test_reads_keyboard_after_recording(self):
+        start_input_replay(self.input_info, self.path, speed=0)
+        for _ in range(3):
+            self.input_info["key_get"](self.input_info)
+        expected = "keyboard"
+        actual = self.input_info["key_get"](self.input_info)
+        self.assertEqual(expected, actual)
+
+    def test_replays_at_recorded_speed(self):
+        now = [0.0]
+        waits = []
+
+        def wait(seconds):
+            waits.append(seconds)
+            now[0] += seconds
+
+        start_input_replay(self.input_info, self.path, speed=10, clock=lambda: now[0], wait=wait)
+        for _ in range(3):
+            self.input_info["key_get"](self.input_info)
+        expected = [0.05, 0.025, 0.125]
+        actual = waits
+        self.assertEqual(len(expected), len(actual))
+        for expected_seconds, actual_seconds in zip(expected, actual):
+            self.assertAlmostEqual(expected_seconds, actual_seconds)
@@ -2,8 +2,46 @@
 Miscellaneous tools.
 """
 import re
+from functools import lru_cache
 from typing import Any
 
+_ANSI_ESCAPE = re.compile(r'\033(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+
+@lru_cache(maxsize=1024)
+def tokenize_escape_codes(text: str) -> tuple[str, tuple]:
+    """
+    Split <text> into its visible characters and its ANSI escape codes in a single pass.
+
+    Results are cached by <text>, so repeated strings are only parsed once.
+
+    Return in form:
+    (<visible text>, ( (<index in visible text>, <code>), ... ))
+
+    :param text: a string representing the text to tokenize
+    :precondition: text must be a string
+    :postcondition: get <text> without escape codes and the escape codes with their visible text indices
+    :return: a tuple of a string representing the visible text of <text>,
+             and a tuple of tuples representing the escape codes and their indices in the visible text
+
+    >>> tokenize_escape_codes("No codes")
+    ('No codes', ())
+    >>> tokenize_escape_codes("\033[1mMany\033[5;3H codes\033[0m")
+    ('Many codes', ((0, '\\x1b[1m'), (4, '\\x1b[5;3H'), (10, '\\x1b[0m')))
+    """
+    visible_parts = []
+    codes = []
+    visible_length = 0
+    previous_end = 0
+    for matched in _ANSI_ESCAPE.finditer(text):
+        visible_part = text[previous_end:matched.start()]
+        visible_parts.append(visible_part)
+        visible_length += len(visible_part)
+        codes.append((visible_length, matched.group(0)))
+        previous_end = matched.end()
+    visible_parts.append(text[previous_end:])
+    return ("".join(visible_parts), tuple(codes))
+
 
 def get_escape_codes_indices(text: str) -> list:
     """
@@ -25,12 +63,7 @@ def get_escape_codes_indices(text: str) -> list:
     >>> get_escape_codes_indices("\033[1mMany\033[5;3H codes\033[0m")
     [(0, '\\x1b[1m'), (4, '\\x1b[5;3H'), (10, '\\x1b[0m')]
     """
-    ansi_escape = re.compile(r'\033(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    codes = []
-    while not (matched := ansi_escape.search(text)) is None:
-        codes.append((matched.start(), matched.group(0)))
-        text = text[:matched.start()] + text[matched.end():]
-    return codes
+    return list(tokenize_escape_codes(text)[1])
 
 
 def remove_escape_codes(text: str) -> str:
@@ -49,8 +82,7 @@ def remove_escape_codes(text: str) -> str:
     >>> remove_escape_codes("\033[1mMany\033[5;3H codes\033[0m")
     'Many codes'
     """
-    ansi_escape = re.compile(r'\033(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
-    return ansi_escape.sub('', text)
+    return tokenize_escape_codes(text)[0]
 
 
 def longest_string(string_list: list | tuple) -> tuple[str, int] | None: